@@ -31,6 +31,9 @@ from src.infrastructure.utils.cli_colors import (
     Colors, dim, draw_separator
 )
 from src.skills.initialize import initialize_all_tools
+from src.core.skills.tool_registry import get_tool_registry
+from src.infrastructure.llm.client_pool import get_llm_client_pool
+from src.core.utils.performance_tracker import PerformanceTracker
 
 
 class ChatInterface:
@@ -114,6 +117,19 @@ class ChatInterface:
         print(f"\n📊 会话统计：")
         print(f"  会话 ID: {str(self.session_id)[:8]}..." if self.session_id else "  会话 ID: 未创建")
         print(f"  消息数量: {self.message_count}")
+        for cache_name, stats in PerformanceTracker.get_cache_stats().items():
+            print(
+                f"  {cache_name}缓存: 命中率 {stats['hit_rate']:.0%} "
+                f"({stats['hits']}/{stats['hits'] + stats['misses']})，节省 {stats['saved_seconds']:.1f}s"
+            )
+        from src.core.memory.embedding_cache import get_embedding_cache
+        embedding_stats = get_embedding_cache().stats()
+        if embedding_stats["api_calls"] or embedding_stats["memory_hits"] or embedding_stats["disk_hits"]:
+            print(
+                f"  向量缓存: 命中率 {embedding_stats['hit_rate']:.0%} "
+                f"(内存 {embedding_stats['memory_hits']} / 磁盘 {embedding_stats['disk_hits']} / "
+                f"未命中 {embedding_stats['misses']})，节省 {embedding_stats['saved_seconds']:.1f}s"
+            )
         print()
 
     async def process_command(self, command: str) -> bool:
@@ -153,6 +169,14 @@ class ChatInterface:
             print("输入 /help 查看可用命令\n")
             return True
 
+    async def run(self):
+        """Run the chat loop, closing pooled LLM connections on exit."""
+        try:
+            await self.chat_loop()
+        finally:
+            # 关闭共享的 LLM 客户端（须在事件循环内关闭）
+            await get_llm_client_pool().aclose()
+
     async def chat_loop(self):
         """Main chat loop."""
         self.print_welcome()
@@ -282,9 +306,12 @@ def main():
 
     chat = ChatInterface(use_reasoner=args.reasoner, fixed_skill_id=args.skill)
     try:
-        asyncio.run(chat.chat_loop())
+        asyncio.run(chat.run())
     except KeyboardInterrupt:
         print("\n\n👋 再见！\n")
+    finally:
+        # 关闭工具执行池（线程池/进程池）
+        get_tool_registry().shutdown()
 
 
 if __name__ == "__main__":
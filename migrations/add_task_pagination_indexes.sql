@@ -0,0 +1,31 @@
+-- Migration: Add composite partial indexes for task listing
+-- Date: 2026-10-17
+-- Description: Indexes matching TaskRepository listing queries
+--                WHERE [status = ? | priority = ?] AND deleted_at IS NULL
+--                ORDER BY created_at DESC, id DESC
+--              so a page is read straight off the index in order. Keyset pagination
+--              (get_page / get_page_by_status / get_page_by_priority) continues with
+--              (created_at, id) < (cursor values), which the same indexes serve, so deep
+--              pages cost the same as the first. id is the tie-breaker for equal created_at.
+--
+-- On a large, live tasks table build the indexes without blocking writes instead:
+--   CREATE INDEX CONCURRENTLY ... (run outside a transaction, e.g. psql without -1)
+
+CREATE INDEX IF NOT EXISTS idx_tasks_created_id
+ON tasks (created_at DESC, id DESC)
+WHERE deleted_at IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_tasks_status_created_id
+ON tasks (status, created_at DESC, id DESC)
+WHERE deleted_at IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_tasks_priority_created_id
+ON tasks (priority, created_at DESC, id DESC)
+WHERE deleted_at IS NULL;
+
+ANALYZE tasks;
+
+-- Add comments
+COMMENT ON INDEX idx_tasks_created_id IS 'Keyset pagination of non-deleted tasks, newest first';
+COMMENT ON INDEX idx_tasks_status_created_id IS 'Keyset pagination of non-deleted tasks by status, newest first';
+COMMENT ON INDEX idx_tasks_priority_created_id IS 'Keyset pagination of non-deleted tasks by priority, newest first';
@@ -0,0 +1,24 @@
+-- Migration: Add trigram indexes for keyword / hybrid task search
+-- Date: 2026-10-17
+-- Description: pg_trgm GIN indexes on task title and description (non-deleted tasks only).
+--              They back ILIKE '%term%' and word-similarity (<%) matching in
+--              SearchService.search_tasks, which fuses keyword and vector rankings.
+--              Trigrams are used instead of to_tsvector because PostgreSQL has no
+--              built-in Chinese text search parser. Chinese characters are only
+--              indexed when the database LC_CTYPE is not "C" (e.g. en_US.UTF-8, zh_CN.UTF-8).
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_tasks_title_trgm
+ON tasks USING gin (title gin_trgm_ops)
+WHERE deleted_at IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_tasks_description_trgm
+ON tasks USING gin (description gin_trgm_ops)
+WHERE deleted_at IS NULL;
+
+ANALYZE tasks;
+
+-- Add comments
+COMMENT ON INDEX idx_tasks_title_trgm IS 'Trigram index for keyword / hybrid task search';
+COMMENT ON INDEX idx_tasks_description_trgm IS 'Trigram index for keyword / hybrid task search';
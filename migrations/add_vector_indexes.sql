@@ -0,0 +1,27 @@
+-- Migration: Add HNSW vector indexes for tasks and skills
+-- Date: 2026-10-17
+-- Description: Cosine-distance HNSW indexes so semantic search no longer scans every row.
+--              The tasks index is partial (deleted_at IS NULL), matching SearchService queries.
+--              Requires pgvector >= 0.5.0.
+--
+-- On a large, live tasks table build the index without blocking writes instead:
+--   CREATE INDEX CONCURRENTLY ... (run outside a transaction, e.g. psql without -1)
+
+-- HNSW builds are much faster when the graph fits in maintenance_work_mem
+SET maintenance_work_mem = '1GB';
+
+CREATE INDEX IF NOT EXISTS idx_tasks_embedding_hnsw
+ON tasks USING hnsw (embedding vector_cosine_ops)
+WITH (m = 16, ef_construction = 64)
+WHERE deleted_at IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_skills_embedding_hnsw
+ON skills USING hnsw (embedding vector_cosine_ops)
+WITH (m = 16, ef_construction = 64);
+
+ANALYZE tasks;
+ANALYZE skills;
+
+-- Add comments
+COMMENT ON INDEX idx_tasks_embedding_hnsw IS 'HNSW cosine index for semantic task search (hnsw.ef_search set per query)';
+COMMENT ON INDEX idx_skills_embedding_hnsw IS 'HNSW cosine index for skill retrieval';
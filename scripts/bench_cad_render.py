@@ -0,0 +1,176 @@
+"""
+CAD 区域渲染基准
+
+生成一个约 10 万实体的合成 DXF（线段、多段线、圆、圆弧，分布在多个图层），
+分别用旧版逐实体 ax.plot / add_patch 渲染和新版按颜色批量 LineCollection /
+PatchCollection 渲染整张图，对比耗时和峰值内存（RSS）。
+
+每种方式在独立子进程中运行，峰值 RSS 互不干扰。
+
+Usage:
+    python scripts/bench_cad_render.py [--entities 100000] [--dxf /tmp/bench_100k.dxf]
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+LAYERS = ["WALL", "COLUMN", "WINDOW", "DIM", "AXIS", "STAIR", "FURNITURE"]
+
+
+def generate_dxf(path: str, entity_count: int, seed: int = 42):
+    """生成合成 DXF：实体均匀分布在 200m × 120m 的范围内"""
+    import ezdxf
+
+    rng = random.Random(seed)
+    doc = ezdxf.new()
+    msp = doc.modelspace()
+    for layer in LAYERS:
+        doc.layers.add(layer)
+
+    width, height = 200_000, 120_000
+    for i in range(entity_count):
+        layer = LAYERS[i % len(LAYERS)]
+        x, y = rng.uniform(0, width), rng.uniform(0, height)
+        kind = rng.random()
+        if kind < 0.6:
+            msp.add_line((x, y), (x + rng.uniform(-800, 800), y + rng.uniform(-800, 800)),
+                         dxfattribs={"layer": layer})
+        elif kind < 0.8:
+            points = [(x + rng.uniform(-600, 600), y + rng.uniform(-600, 600)) for _ in range(rng.randint(3, 8))]
+            msp.add_lwpolyline(points, close=rng.random() < 0.5, dxfattribs={"layer": layer})
+        elif kind < 0.9:
+            msp.add_circle((x, y), rng.uniform(50, 400), dxfattribs={"layer": layer})
+        else:
+            start = rng.uniform(0, 360)
+            msp.add_arc((x, y), rng.uniform(50, 400), start, start + rng.uniform(30, 270),
+                        dxfattribs={"layer": layer})
+
+    doc.saveas(path)
+
+
+def legacy_render_entities(ax, entities, bbox, layers, color_mode):
+    """旧版渲染：每个实体一个 Line2D / Patch"""
+    import matplotlib.patches as patches
+    from src.services.cad_renderer import get_layer_color, DEFAULT_COLOR, RENDER_MARGIN
+
+    x_min, x_max = bbox['x'], bbox['x'] + bbox['width']
+    y_min, y_max = bbox['y'], bbox['y'] + bbox['height']
+
+    def in_bbox(x, y, margin):
+        return x_min - margin <= x <= x_max + margin and y_min - margin <= y <= y_max + margin
+
+    for entity in entities:
+        if layers and entity.dxf.layer not in layers:
+            continue
+        color = get_layer_color(entity.dxf.layer) if color_mode == "by_layer" else DEFAULT_COLOR
+        entity_type = entity.dxftype()
+
+        if entity_type == "LINE":
+            x1, y1 = entity.dxf.start.x, entity.dxf.start.y
+            x2, y2 = entity.dxf.end.x, entity.dxf.end.y
+            if in_bbox(x1, y1, RENDER_MARGIN) or in_bbox(x2, y2, RENDER_MARGIN):
+                ax.plot([x1, x2], [y1, y2], color=color, linewidth=0.5)
+        elif entity_type in ("CIRCLE", "ARC"):
+            cx, cy, r = entity.dxf.center.x, entity.dxf.center.y, entity.dxf.radius
+            if not in_bbox(cx, cy, r):
+                continue
+            if entity_type == "CIRCLE":
+                ax.add_patch(patches.Circle((cx, cy), r, fill=False, edgecolor=color, linewidth=0.5))
+            else:
+                ax.add_patch(patches.Arc((cx, cy), 2 * r, 2 * r, angle=0,
+                                         theta1=entity.dxf.start_angle, theta2=entity.dxf.end_angle,
+                                         edgecolor=color, linewidth=0.5))
+        elif entity_type == "LWPOLYLINE":
+            points = list(entity.get_points())
+            xs = [p[0] for p in points]
+            ys = [p[1] for p in points]
+            if any(in_bbox(x, y, RENDER_MARGIN) for x, y in zip(xs, ys)):
+                if entity.closed and len(points) > 2:
+                    xs.append(xs[0])
+                    ys.append(ys[0])
+                ax.plot(xs, ys, color=color, linewidth=0.5)
+
+
+def run_worker(mode: str, dxf_path: str):
+    """子进程：渲染整张图并输出 JSON 结果"""
+    from src.services import cad_renderer
+    from src.services.dxf_cache import read_dxf
+    from src.services.dxf_columnar import get_entity_store, get_drawing_extents
+
+    # 预先解析文档并构建列式存储，计时只包含渲染
+    entities = list(read_dxf(dxf_path).modelspace())
+    get_entity_store(dxf_path)
+    min_x, min_y, max_x, max_y = get_drawing_extents(dxf_path)
+    bbox = {"x": min_x, "y": min_y, "width": max_x - min_x, "height": max_y - min_y}
+
+    if mode == "legacy":
+        # 存储行号与 modelspace 顺序一致，换回实体对象后按旧方式逐个渲染
+        def render_legacy(ax, store, rows, bbox, layers, color_mode):
+            legacy_render_entities(ax, [entities[i] for i in rows], bbox, layers, color_mode)
+
+        cad_renderer._render_entities = render_legacy
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    result = cad_renderer.render_drawing_region(
+        dxf_path, bbox, output_path=f"/tmp/bench_render_{mode}.png"
+    )
+    elapsed = time.perf_counter() - start
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    print(json.dumps({
+        "success": result.get("success"),
+        "error": result.get("error"),
+        "seconds": elapsed,
+        # Linux 下 ru_maxrss 单位为 KB
+        "peak_rss_mb": rss_after / 1024,
+        "render_rss_mb": (rss_after - rss_before) / 1024
+    }))
+
+
+def main(entity_count: int, dxf_path: str):
+    if not os.path.exists(dxf_path):
+        print(f"生成合成 DXF（{entity_count} 个实体）: {dxf_path}")
+        generate_dxf(dxf_path, entity_count)
+
+    print("=" * 60)
+    print(f"CAD 整图渲染基准: {dxf_path}")
+    print("=" * 60)
+
+    results = {}
+    for mode in ("legacy", "batched"):
+        output = subprocess.run(
+            [sys.executable, __file__, "--worker", mode, "--dxf", dxf_path],
+            capture_output=True, text=True, check=True
+        ).stdout
+        results[mode] = json.loads(output.strip().splitlines()[-1])
+        r = results[mode]
+        if not r["success"]:
+            print(f"  {mode}: 渲染失败 {r['error']}")
+            return
+        print(f"  {mode:<10} 耗时 {r['seconds']:7.2f}s  峰值 RSS {r['peak_rss_mb']:8.1f} MB"
+              f"  渲染增量 {r['render_rss_mb']:8.1f} MB")
+
+    print(f"\n  加速比: {results['legacy']['seconds'] / results['batched']['seconds']:.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CAD 区域渲染基准")
+    parser.add_argument("--entities", type=int, default=100000)
+    parser.add_argument("--dxf", default="/tmp/bench_cad_100k.dxf")
+    parser.add_argument("--worker", choices=["legacy", "batched"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.dxf)
+    else:
+        main(args.entities, args.dxf)
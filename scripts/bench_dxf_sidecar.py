@@ -0,0 +1,94 @@
+"""
+DXF 磁盘索引启动基准
+
+模拟进程重启：在全新子进程中分别测量
+- 冷启动：没有磁盘索引，解析 DXF 文本、构建列式存储并写入索引
+- 热启动：内存映射加载已有磁盘索引
+
+每次测量获取实体存储、精确范围，并执行一次区域查询（不含渲染）。
+
+Usage:
+    python scripts/bench_dxf_sidecar.py path/to/drawing.dxf [--runs 3]
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+
+def run_worker(dxf_path: str):
+    """子进程：加载实体存储并执行一次区域查询，输出各阶段耗时"""
+    from src.services.dxf_columnar import get_entity_store, get_drawing_extents
+    from src.services.dxf_cache import get_dxf_cache
+
+    start = time.perf_counter()
+    store = get_entity_store(dxf_path)
+    min_x, min_y, max_x, max_y = get_drawing_extents(dxf_path)
+    load_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    bbox = {
+        "x": min_x + (max_x - min_x) * 0.4,
+        "y": min_y + (max_y - min_y) * 0.4,
+        "width": (max_x - min_x) * 0.1,
+        "height": (max_y - min_y) * 0.1
+    }
+    hits = len(store.spatial_index.query(bbox))
+    query_seconds = time.perf_counter() - start
+
+    print(json.dumps({
+        "load_ms": load_seconds * 1000,
+        "query_ms": query_seconds * 1000,
+        "entities": len(store),
+        "hits": hits,
+        "dxf_parses": get_dxf_cache().stats()["misses"]
+    }))
+
+
+def measure(dxf_path: str, index_dir: str) -> dict:
+    env = dict(os.environ, DXF_INDEX_DIR=index_dir)
+    output = subprocess.run(
+        [sys.executable, __file__, dxf_path, "--worker"],
+        capture_output=True, text=True, check=True, env=env
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(dxf_path: str, runs: int):
+    index_dir = tempfile.mkdtemp(prefix="dxfidx_")
+    try:
+        print("=" * 60)
+        print(f"DXF 磁盘索引启动基准: {dxf_path}")
+        print("=" * 60)
+
+        for label, clear in (("冷启动（解析 DXF）", True), ("热启动（mmap 索引）", False)):
+            print(f"\n{label}:")
+            for _ in range(runs):
+                if clear:
+                    shutil.rmtree(index_dir, ignore_errors=True)
+                r = measure(dxf_path, index_dir)
+                print(f"  加载 {r['load_ms']:9.1f} ms  查询 {r['query_ms']:7.2f} ms  "
+                      f"实体 {r['entities']}  命中 {r['hits']}  DXF 解析次数 {r['dxf_parses']}")
+    finally:
+        shutil.rmtree(index_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="DXF 磁盘索引启动基准")
+    parser.add_argument("dxf_path")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.dxf_path)
+    else:
+        main(args.dxf_path, args.runs)
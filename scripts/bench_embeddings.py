@@ -0,0 +1,169 @@
+"""
+Embedding 后端基准
+
+直接调用后端（绕过缓存和请求合并），对比 DashScope 与本地 sentence-transformers 模型：
+1. 模型加载耗时（本地后端）
+2. 单条查询延迟（p50 / p95）
+3. 批量吞吐（条/秒）
+4. 技能检索：用 skills/*/skill.md 作为文档，统计每条查询的 Top-1 技能；
+   同时测试两个后端时输出 Top-1 一致率
+
+查询文件为纯文本，每行一条；未指定时使用内置示例查询。
+只测本地后端时不需要网络（模型需已下载到本地缓存）。
+
+Usage:
+    python scripts/bench_embeddings.py --backend local [--onnx] [--queries queries.txt]
+    python scripts/bench_embeddings.py --backend both --rounds 20
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.core.memory.embedding_backends import (
+    BACKEND_DASHSCOPE,
+    BACKEND_LOCAL,
+    DashScopeBackend,
+    EmbeddingBackend,
+    LocalEmbeddingBackend
+)
+
+
+SAMPLE_QUERIES = [
+    "帮我建一个明天下午三点开会的任务",
+    "把周报那个任务标记为完成",
+    "我今天精力不太好，有什么轻松的事可以做",
+    "列出所有高优先级的待办",
+    "这张图纸的工程量大概是多少",
+    "帮我算一下这个项目的造价",
+    "看一下 CAD 图纸里有哪些构件",
+    "现场监理日志怎么写",
+    "检查一下施工进度是否符合计划",
+    "删除昨天创建的重复任务",
+]
+
+
+def load_queries(path: str) -> List[str]:
+    """读取查询文件"""
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def load_skill_documents() -> Dict[str, str]:
+    """读取 skills/ 下各技能的 prompt"""
+    documents = {}
+    for skill_md in sorted((project_root / "skills").glob("*/skill.md")):
+        documents[skill_md.parent.name] = skill_md.read_text(encoding="utf-8")
+    return documents
+
+
+def create_backend(name: str, args) -> EmbeddingBackend:
+    if name == BACKEND_LOCAL:
+        return LocalEmbeddingBackend(
+            model_name=args.model,
+            device=args.device,
+            batch_size=args.batch_size,
+            onnx=args.onnx,
+            onnx_file=args.onnx_file
+        )
+    return DashScopeBackend()
+
+
+async def bench_backend(name: str, args, queries: List[str], documents: Dict[str, str]) -> List[str]:
+    """测试一个后端，返回每条查询的 Top-1 技能"""
+    backend = create_backend(name, args)
+    print(f"\n{name} ({backend.name}):")
+
+    try:
+        if isinstance(backend, LocalEmbeddingBackend):
+            start = time.perf_counter()
+            await asyncio.to_thread(backend.warmup)
+            print(f"  模型加载: {time.perf_counter() - start:.2f}s")
+
+        # 预热
+        await backend.embed(queries[:1])
+
+        # 单条延迟
+        latencies = []
+        for _ in range(args.rounds):
+            for query in queries:
+                start = time.perf_counter()
+                await backend.embed([query])
+                latencies.append((time.perf_counter() - start) * 1000)
+        latencies.sort()
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        print(f"  单条延迟: p50 {statistics.median(latencies):.1f}ms  p95 {p95:.1f}ms")
+
+        # 批量吞吐
+        texts = (queries * (args.batch_texts // len(queries) + 1))[:args.batch_texts]
+        start = time.perf_counter()
+        for i in range(0, len(texts), backend.max_batch_size):
+            await backend.embed(texts[i:i + backend.max_batch_size])
+        elapsed = time.perf_counter() - start
+        print(f"  批量吞吐: {len(texts) / elapsed:.1f} 条/秒（批大小 {backend.max_batch_size}）")
+
+        # 技能检索
+        query_vectors = np.asarray(await backend.embed(queries[:backend.max_batch_size]), dtype=np.float32)
+        for i in range(backend.max_batch_size, len(queries), backend.max_batch_size):
+            more = await backend.embed(queries[i:i + backend.max_batch_size])
+            query_vectors = np.vstack([query_vectors, np.asarray(more, dtype=np.float32)])
+        print(f"  向量维度: {query_vectors.shape[1]}")
+
+        if not documents:
+            return []
+        skill_ids = list(documents)
+        doc_vectors = []
+        for skill_id in skill_ids:
+            doc_vectors.extend(await backend.embed([documents[skill_id]]))
+        doc_matrix = np.asarray(doc_vectors, dtype=np.float32)
+        doc_matrix /= np.maximum(np.linalg.norm(doc_matrix, axis=1, keepdims=True), 1e-12)
+        query_vectors /= np.maximum(np.linalg.norm(query_vectors, axis=1, keepdims=True), 1e-12)
+
+        scores = query_vectors @ doc_matrix.T
+        top1 = [skill_ids[i] for i in scores.argmax(axis=1)]
+        for query, skill_id, row in zip(queries, top1, scores):
+            print(f"    {query[:24]:<24} → {skill_id:<12} {row.max():.3f}")
+        return top1
+    finally:
+        await backend.close()
+
+
+async def main(args):
+    queries = load_queries(args.queries) if args.queries else SAMPLE_QUERIES
+    documents = load_skill_documents()
+    backends = [BACKEND_DASHSCOPE, BACKEND_LOCAL] if args.backend == "both" else [args.backend]
+
+    print("=" * 60)
+    print(f"Embedding 后端基准（{len(queries)} 条查询，{len(documents)} 个技能）")
+    print("=" * 60)
+
+    results = {}
+    for name in backends:
+        results[name] = await bench_backend(name, args, queries, documents)
+
+    if len(results) == 2 and all(results.values()):
+        a, b = results.values()
+        agreement = sum(x == y for x, y in zip(a, b)) / len(a)
+        print(f"\nTop-1 技能一致率: {agreement:.0%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Embedding 后端基准")
+    parser.add_argument("--backend", choices=[BACKEND_DASHSCOPE, BACKEND_LOCAL, "both"], default=BACKEND_LOCAL)
+    parser.add_argument("--queries", help="查询文件（每行一条）")
+    parser.add_argument("--rounds", type=int, default=5, help="单条延迟测试的轮数")
+    parser.add_argument("--batch-texts", type=int, default=200, help="吞吐测试的文本数")
+    parser.add_argument("--model", help="本地模型（默认 LOCAL_EMBEDDING_MODEL）")
+    parser.add_argument("--device", help="本地模型设备（默认 LOCAL_EMBEDDING_DEVICE）")
+    parser.add_argument("--batch-size", type=int, help="本地批大小（默认 LOCAL_EMBEDDING_BATCH_SIZE）")
+    parser.add_argument("--onnx", action="store_true", default=None, help="使用 ONNX Runtime 后端")
+    parser.add_argument("--onnx-file", help="ONNX 文件（如量化模型 onnx/model_qint8_avx512_vnni.onnx）")
+    asyncio.run(main(parser.parse_args()))
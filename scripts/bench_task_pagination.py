@@ -0,0 +1,185 @@
+"""
+任务列表分页基准 - OFFSET vs 游标（keyset）
+
+在独立的临时表 bench_task_pages 中（不影响 tasks 表）生成 N 条合成任务
+（随机 status / priority / created_at，约 5% 软删除），然后：
+1. 只有单列 status 索引（与旧的 idx_tasks_status 相同）时，测量 LIMIT/OFFSET 翻到不同深度的延迟
+2. 建立与 tasks 表相同的复合部分索引 (status, created_at DESC, id DESC) WHERE deleted_at IS NULL
+3. 再测 OFFSET，以及游标分页在相同深度的延迟（WHERE (created_at, id) < (游标)）
+
+查询形式与 TaskRepository.get_by_status / get_page_by_status 一致。需要可用的 DATABASE_URL。
+
+Usage:
+    python scripts/bench_task_pagination.py [--size 1000000] [--depths 0,1000,10000,100000]
+    python scripts/bench_task_pagination.py --size 100000 --page-size 20 --keep
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.infrastructure.config import settings
+
+
+TABLE = "bench_task_pages"
+STATUSES = ["brainstorm", "inbox", "active", "waiting", "someday", "completed", "archived"]
+
+
+async def connect():
+    import asyncpg
+
+    dsn = settings.database_url.replace("postgresql+asyncpg://", "postgresql://")
+    return await asyncpg.connect(dsn)
+
+
+async def populate(conn, size: int):
+    """建表并用 generate_series 写入合成任务"""
+    await conn.execute(f"DROP TABLE IF EXISTS {TABLE}")
+    await conn.execute(
+        f"""
+        CREATE TABLE {TABLE} (
+            id UUID PRIMARY KEY,
+            title VARCHAR(500) NOT NULL,
+            status VARCHAR(50) NOT NULL,
+            priority VARCHAR(20),
+            created_at TIMESTAMPTZ NOT NULL,
+            deleted_at TIMESTAMPTZ
+        )
+        """
+    )
+
+    start = time.perf_counter()
+    await conn.execute(
+        f"""
+        INSERT INTO {TABLE} (id, title, status, priority, created_at, deleted_at)
+        SELECT
+            md5(i::text || random()::text)::uuid,
+            'task ' || i,
+            (ARRAY{STATUSES!r})[1 + floor(random() * {len(STATUSES)})::int],
+            (ARRAY['urgent', 'high', 'medium', 'low', 'none'])[1 + floor(random() * 5)::int],
+            now() - (random() * interval '730 days'),
+            CASE WHEN random() < 0.05 THEN now() END
+        FROM generate_series(1, $1) AS i
+        """,
+        size
+    )
+    await conn.execute(f"CREATE INDEX {TABLE}_status ON {TABLE} (status)")
+    await conn.execute(f"VACUUM ANALYZE {TABLE}")
+    print(f"  写入 {size} 条: {time.perf_counter() - start:.1f}s")
+
+
+async def timed(conn, sql: str, *params, rounds: int) -> List[float]:
+    latencies = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        await conn.fetch(sql, *params)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def summarize(latencies: List[float]) -> str:
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return f"p50 {statistics.median(ordered):8.2f}ms  p95 {p95:8.2f}ms"
+
+
+OFFSET_SQL = (
+    f"SELECT * FROM {TABLE} WHERE status = $1 AND deleted_at IS NULL "
+    f"ORDER BY created_at DESC, id DESC LIMIT $2 OFFSET $3"
+)
+KEYSET_SQL = (
+    f"SELECT * FROM {TABLE} WHERE status = $1 AND deleted_at IS NULL "
+    f"AND (created_at, id) < ($2, $3) "
+    f"ORDER BY created_at DESC, id DESC LIMIT $4"
+)
+
+
+async def bench_offset(conn, args, label: str):
+    for depth in args.depths:
+        latencies = await timed(conn, OFFSET_SQL, args.status, args.page_size, depth, rounds=args.rounds)
+        print(f"  {label} OFFSET {depth:<8} {summarize(latencies)}")
+
+
+async def bench_keyset(conn, args):
+    for depth in args.depths:
+        if depth == 0:
+            latencies = await timed(conn, OFFSET_SQL, args.status, args.page_size, 0, rounds=args.rounds)
+        else:
+            # 游标 = 第 depth 行的 (created_at, id)，即翻到该深度时上一页的最后一行
+            cursor = await conn.fetchrow(
+                f"SELECT created_at, id FROM {TABLE} WHERE status = $1 AND deleted_at IS NULL "
+                f"ORDER BY created_at DESC, id DESC OFFSET $2 LIMIT 1",
+                args.status, depth - 1
+            )
+            if cursor is None:
+                print(f"  游标分页 深度 {depth:<8} 超出数据范围")
+                continue
+            latencies = await timed(
+                conn, KEYSET_SQL, args.status, cursor["created_at"], cursor["id"], args.page_size,
+                rounds=args.rounds
+            )
+        print(f"  游标分页 深度 {depth:<8} {summarize(latencies)}")
+
+
+async def explain(conn, sql: str, *params):
+    rows = await conn.fetch(f"EXPLAIN {sql}", *params)
+    for row in rows:
+        print(f"    {row[0]}")
+
+
+async def main(args):
+    conn = await connect()
+    try:
+        print("=" * 60)
+        print(f"任务分页基准（{args.size} 条，status={args.status}，每页 {args.page_size} 条）")
+        print("=" * 60)
+        await populate(conn, args.size)
+
+        print("\n只有单列 status 索引:")
+        await bench_offset(conn, args, "单列索引")
+
+        start = time.perf_counter()
+        await conn.execute(
+            f"CREATE INDEX {TABLE}_status_created_id ON {TABLE} (status, created_at DESC, id DESC) "
+            f"WHERE deleted_at IS NULL"
+        )
+        await conn.execute(f"ANALYZE {TABLE}")
+        print(f"\n建立复合部分索引: {time.perf_counter() - start:.1f}s")
+        await bench_offset(conn, args, "复合索引")
+        await bench_keyset(conn, args)
+
+        if args.explain:
+            print("\n游标分页执行计划:")
+            cursor = await conn.fetchrow(
+                f"SELECT created_at, id FROM {TABLE} WHERE status = $1 AND deleted_at IS NULL "
+                f"ORDER BY created_at DESC, id DESC LIMIT 1",
+                args.status
+            )
+            await explain(conn, KEYSET_SQL, args.status, cursor["created_at"], cursor["id"], args.page_size)
+
+        if not args.keep:
+            await conn.execute(f"DROP TABLE IF EXISTS {TABLE}")
+    finally:
+        await conn.close()
+
+
+def int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="任务列表分页基准（OFFSET vs 游标）")
+    parser.add_argument("--size", type=int, default=1000000)
+    parser.add_argument("--depths", type=int_list, default=[0, 1000, 10000, 100000])
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--status", default="active", choices=STATUSES)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--explain", action="store_true", help="输出游标分页的执行计划")
+    parser.add_argument("--keep", action="store_true", help="保留测试表")
+    asyncio.run(main(parser.parse_args()))
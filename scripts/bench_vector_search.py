@@ -0,0 +1,179 @@
+"""
+向量检索基准 - 顺序扫描 vs HNSW 索引
+
+在独立的临时表 bench_task_vectors 中（不影响 tasks 表）生成合成任务向量：
+1. 插入 N 条 1024 维向量（围绕若干簇中心分布，约 5% 标记为软删除）
+2. 无索引时执行查询，得到精确 Top-K（召回率基准）和顺序扫描延迟
+3. 建立与 tasks 表相同的部分 HNSW 索引（vector_cosine_ops, deleted_at IS NULL）
+4. 对每个 ef_search 测量延迟（p50 / p95）和 recall@K
+
+需要已安装 pgvector 扩展的 PostgreSQL（DATABASE_URL）。1M 规模的建表和建索引需要
+数 GB 磁盘和较长时间，可以先用较小规模验证。
+
+Usage:
+    python scripts/bench_vector_search.py [--sizes 10000,100000,1000000] [--ef-search 40,100,200]
+    python scripts/bench_vector_search.py --sizes 10000 --queries 50 --keep
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.infrastructure.config import settings
+
+
+TABLE = "bench_task_vectors"
+DIM = 1024
+
+
+def synthetic_vectors(rng: np.random.RandomState, centers: np.ndarray, count: int, noise: float) -> np.ndarray:
+    """围绕簇中心生成归一化向量（比均匀随机向量更接近真实 embedding 的分布）"""
+    labels = rng.randint(0, len(centers), size=count)
+    vectors = centers[labels] + rng.normal(scale=noise, size=(count, DIM)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+async def connect():
+    import asyncpg
+    from pgvector.asyncpg import register_vector
+
+    dsn = settings.database_url.replace("postgresql+asyncpg://", "postgresql://")
+    conn = await asyncpg.connect(dsn)
+    await conn.execute("CREATE EXTENSION IF NOT EXISTS vector")
+    await register_vector(conn)
+    return conn
+
+
+async def populate(conn, rng: np.random.RandomState, centers: np.ndarray, size: int, noise: float, chunk: int = 10000):
+    """建表并批量写入合成向量"""
+    await conn.execute(f"DROP TABLE IF EXISTS {TABLE}")
+    await conn.execute(
+        f"""
+        CREATE TABLE {TABLE} (
+            id BIGINT PRIMARY KEY,
+            embedding vector({DIM}),
+            deleted_at TIMESTAMPTZ
+        )
+        """
+    )
+
+    deleted_at = datetime.now(timezone.utc)
+    start = time.perf_counter()
+    for offset in range(0, size, chunk):
+        count = min(chunk, size - offset)
+        vectors = synthetic_vectors(rng, centers, count, noise)
+        deleted = rng.rand(count) < 0.05
+        records = [
+            (offset + i, vectors[i], deleted_at if deleted[i] else None)
+            for i in range(count)
+        ]
+        await conn.copy_records_to_table(TABLE, records=records, columns=["id", "embedding", "deleted_at"])
+        print(f"\r  写入 {offset + count}/{size}", end="", flush=True)
+    await conn.execute(f"ANALYZE {TABLE}")
+    print(f"\r  写入 {size} 条: {time.perf_counter() - start:.1f}s")
+
+
+async def run_queries(conn, queries: np.ndarray, top_k: int, ef_search: int = None) -> Tuple[List[List[int]], List[float]]:
+    """执行查询，返回每条查询的结果 ID 和耗时（毫秒）"""
+    sql = (
+        f"SELECT id FROM {TABLE} WHERE deleted_at IS NULL "
+        f"ORDER BY embedding <=> $1 LIMIT {int(top_k)}"
+    )
+    results, latencies = [], []
+    for query in queries:
+        async with conn.transaction():
+            if ef_search is not None:
+                await conn.execute(f"SET LOCAL hnsw.ef_search = {int(ef_search)}")
+            else:
+                # 精确结果：禁止使用索引
+                await conn.execute("SET LOCAL enable_indexscan = off")
+            start = time.perf_counter()
+            rows = await conn.fetch(sql, query)
+            latencies.append((time.perf_counter() - start) * 1000)
+        results.append([row["id"] for row in rows])
+    return results, latencies
+
+
+def recall(truth: List[List[int]], results: List[List[int]]) -> float:
+    hits = sum(len(set(t) & set(r)) for t, r in zip(truth, results))
+    total = sum(len(t) for t in truth)
+    return hits / total if total else 0.0
+
+
+def summarize(latencies: List[float]) -> str:
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return f"p50 {statistics.median(ordered):8.2f}ms  p95 {p95:8.2f}ms"
+
+
+async def bench_size(conn, size: int, args, rng: np.random.RandomState):
+    print(f"\n--- {size} 条任务 ---")
+    centers = rng.normal(size=(args.clusters, DIM)).astype(np.float32)
+    await populate(conn, rng, centers, size, args.noise)
+
+    queries = synthetic_vectors(rng, centers, args.queries, args.noise)
+
+    truth, latencies = await run_queries(conn, queries, args.top_k)
+    print(f"  顺序扫描      {summarize(latencies)}  recall 1.000")
+
+    start = time.perf_counter()
+    await conn.execute(f"SET maintenance_work_mem = '{args.maintenance_work_mem}'")
+    await conn.execute(
+        f"""
+        CREATE INDEX {TABLE}_hnsw ON {TABLE}
+        USING hnsw (embedding vector_cosine_ops)
+        WITH (m = {args.m}, ef_construction = {args.ef_construction})
+        WHERE deleted_at IS NULL
+        """
+    )
+    await conn.execute(f"ANALYZE {TABLE}")
+    print(f"  建立 HNSW 索引: {time.perf_counter() - start:.1f}s")
+
+    for ef_search in args.ef_search:
+        results, latencies = await run_queries(conn, queries, args.top_k, ef_search=max(ef_search, args.top_k))
+        print(f"  ef_search={ef_search:<4} {summarize(latencies)}  recall {recall(truth, results):.3f}")
+
+    if not args.keep:
+        await conn.execute(f"DROP TABLE IF EXISTS {TABLE}")
+
+
+async def main(args):
+    rng = np.random.RandomState(args.seed)
+    conn = await connect()
+    try:
+        print("=" * 60)
+        print(f"向量检索基准（top_k={args.top_k}，{args.queries} 条查询，m={args.m}，ef_construction={args.ef_construction}）")
+        print("=" * 60)
+        for size in args.sizes:
+            await bench_size(conn, size, args, rng)
+    finally:
+        await conn.close()
+
+
+def int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="向量检索基准（顺序扫描 vs HNSW）")
+    parser.add_argument("--sizes", type=int_list, default=[10000, 100000, 1000000])
+    parser.add_argument("--ef-search", type=int_list, default=[40, 100, 200])
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=20)
+    parser.add_argument("--clusters", type=int, default=200)
+    parser.add_argument("--noise", type=float, default=0.6, help="簇内噪声（越大越接近均匀分布，越难检索）")
+    parser.add_argument("--m", type=int, default=16)
+    parser.add_argument("--ef-construction", type=int, default=64)
+    parser.add_argument("--maintenance-work-mem", default="1GB")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keep", action="store_true", help="保留最后一次的测试表")
+    asyncio.run(main(parser.parse_args()))
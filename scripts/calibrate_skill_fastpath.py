@@ -0,0 +1,213 @@
+"""
+技能快速选择阈值校准
+
+在标注查询集上评估 FastPathPolicy 不同阈值下的准确率和延迟：
+1. 对每条查询生成 embedding，用 retrieve_skills 检索候选技能（含相似度）
+2. 可选：调用 FilterService（不走缓存）得到 LLM 的选择和耗时，作为回退路径的基准
+3. 扫描 (最低相似度, 最小领先差值) 网格，统计每组阈值的
+   - 覆盖率：走快速路径的查询比例
+   - 快速路径准确率：快速选择结果与标注一致的比例
+   - 整体准确率：快速路径 + LLM 回退（需要 --with-llm）
+   - 平均选择耗时：快速路径记 0，回退记 LLM 实测耗时（需要 --with-llm）
+4. 推荐在快速路径准确率不低于 --target-precision 的前提下覆盖率最高的阈值
+
+标注文件为 JSONL，每行 {"query": "...", "skill_id": "cost"}（不应选择任何技能时 skill_id 为空字符串）。
+检索结果可以用 --records 保存，之后用 --from-records 离线重新扫描，无需再调用 API。
+
+Usage:
+    python scripts/calibrate_skill_fastpath.py --labels queries.jsonl [--with-llm] [--records out.json]
+    python scripts/calibrate_skill_fastpath.py --from-records out.json [--target-precision 0.98]
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.core.skills.selection_policy import FastPathPolicy
+
+
+def load_labels(path: str) -> List[Dict[str, str]]:
+    """读取标注查询集"""
+    labels = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                item = json.loads(line)
+                labels.append({"query": item["query"], "skill_id": item.get("skill_id") or ""})
+    return labels
+
+
+async def collect_records(labels: List[Dict[str, str]], top_k: int, with_llm: bool) -> List[Dict[str, Any]]:
+    """检索每条查询的候选技能，可选地记录 LLM 的选择和耗时"""
+    from src.infrastructure.database.session import get_db
+    from src.core.memory.embedding_service import get_embedding_service
+    from src.core.skills.skill_service import SkillService
+    from src.core.skills.filter_service import FilterService
+
+    embedding_service = get_embedding_service()
+    filter_service = FilterService(use_cache=False) if with_llm else None
+    records = []
+
+    async for db in get_db():
+        skill_service = SkillService(db)
+        for i, label in enumerate(labels, 1):
+            embedding = await embedding_service.generate(label["query"])
+            candidates = await skill_service.retrieve_skills(embedding, top_k=top_k)
+
+            record = {
+                "query": label["query"],
+                "expected": label["skill_id"],
+                "candidates": [
+                    {"id": c["id"], "similarity": float(c["similarity"])}
+                    for c in candidates
+                ],
+                "llm_skill_id": None,
+                "llm_latency": None
+            }
+
+            if filter_service is not None:
+                started = time.time()
+                result = await filter_service.filter_skills_and_facts(
+                    user_query=label["query"],
+                    candidate_skills=candidates,
+                    candidate_facts=[]
+                )
+                record["llm_latency"] = time.time() - started
+                record["llm_skill_id"] = result.get("skill_id") or ""
+
+            records.append(record)
+            print(f"  [{i}/{len(labels)}] {label['query'][:30]}")
+        break
+
+    return records
+
+
+def evaluate(records: List[Dict[str, Any]], policy: FastPathPolicy) -> Dict[str, Optional[float]]:
+    """评估一组阈值"""
+    fast = correct_fast = correct_all = 0
+    latencies = []
+    has_llm = all(r["llm_latency"] is not None for r in records)
+
+    for record in records:
+        decision = policy.decide(record["candidates"])
+        if decision is not None:
+            fast += 1
+            hit = decision["skill_id"] == record["expected"]
+            correct_fast += hit
+            correct_all += hit
+            latencies.append(0.0)
+        elif has_llm:
+            correct_all += record["llm_skill_id"] == record["expected"]
+            latencies.append(record["llm_latency"])
+
+    total = len(records)
+    return {
+        "coverage": fast / total if total else 0.0,
+        "fast_precision": correct_fast / fast if fast else None,
+        "accuracy": correct_all / total if has_llm and total else None,
+        "mean_latency": sum(latencies) / total if has_llm and total else None
+    }
+
+
+def sweep(records: List[Dict[str, Any]], similarities: List[float], margins: List[float]) -> List[Dict[str, Any]]:
+    """扫描阈值网格"""
+    rows = []
+    for min_similarity in similarities:
+        for min_margin in margins:
+            policy = FastPathPolicy(min_similarity=min_similarity, min_margin=min_margin, enabled=True)
+            rows.append({"min_similarity": min_similarity, "min_margin": min_margin, **evaluate(records, policy)})
+    return rows
+
+
+def frange(start: float, stop: float, step: float) -> List[float]:
+    """闭区间浮点数序列"""
+    values = []
+    value = start
+    while value <= stop + 1e-9:
+        values.append(round(value, 4))
+        value += step
+    return values
+
+
+def fmt(value: Optional[float], pattern: str = "{:.1%}") -> str:
+    return "-" if value is None else pattern.format(value)
+
+
+def report(records: List[Dict[str, Any]], rows: List[Dict[str, Any]], target_precision: float):
+    """打印校准结果"""
+    has_llm = all(r["llm_latency"] is not None for r in records)
+
+    print(f"\n样本数: {len(records)}")
+    if has_llm:
+        llm_accuracy = sum(r["llm_skill_id"] == r["expected"] for r in records) / len(records)
+        llm_latency = sum(r["llm_latency"] for r in records) / len(records)
+        print(f"仅 LLM 选择: 准确率 {llm_accuracy:.1%}，平均耗时 {llm_latency * 1000:.0f}ms")
+
+    print(f"\n{'相似度':>8} {'领先':>6} {'覆盖率':>8} {'快速准确率':>10} {'整体准确率':>10} {'平均耗时':>10}")
+    for row in rows:
+        print(
+            f"{row['min_similarity']:>8.2f} {row['min_margin']:>6.2f} "
+            f"{fmt(row['coverage']):>8} {fmt(row['fast_precision']):>10} "
+            f"{fmt(row['accuracy']):>10} {fmt(row['mean_latency'], '{:.3f}s'):>10}"
+        )
+
+    eligible = [
+        row for row in rows
+        if row["coverage"] > 0 and row["fast_precision"] is not None and row["fast_precision"] >= target_precision
+    ]
+    if not eligible:
+        print(f"\n没有阈值能让快速路径准确率达到 {target_precision:.0%}")
+        return
+
+    best = max(eligible, key=lambda row: (row["coverage"], -row["min_similarity"], -row["min_margin"]))
+    print(f"\n推荐阈值（快速准确率 ≥ {target_precision:.0%} 时覆盖率最高）:")
+    print(f"  SKILL_FASTPATH_MIN_SIMILARITY={best['min_similarity']}")
+    print(f"  SKILL_FASTPATH_MIN_MARGIN={best['min_margin']}")
+    print(f"  覆盖率 {fmt(best['coverage'])}，快速准确率 {fmt(best['fast_precision'])}", end="")
+    if best["mean_latency"] is not None:
+        print(f"，整体准确率 {fmt(best['accuracy'])}，平均选择耗时 {best['mean_latency'] * 1000:.0f}ms")
+    else:
+        print()
+
+
+async def main(args):
+    if args.from_records:
+        records = json.loads(Path(args.from_records).read_text(encoding="utf-8"))
+    else:
+        labels = load_labels(args.labels)
+        print(f"检索 {len(labels)} 条标注查询...")
+        records = await collect_records(labels, args.top_k, args.with_llm)
+        if args.records:
+            Path(args.records).write_text(json.dumps(records, ensure_ascii=False, indent=2), encoding="utf-8")
+            print(f"检索结果已保存: {args.records}")
+
+    rows = sweep(
+        records,
+        similarities=frange(args.min_similarity, args.max_similarity, args.similarity_step),
+        margins=frange(0.0, args.max_margin, args.margin_step)
+    )
+    report(records, rows, args.target_precision)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="校准技能快速选择阈值")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--labels", help="标注查询集（JSONL）")
+    source.add_argument("--from-records", help="之前保存的检索结果（JSON），离线重新扫描")
+    parser.add_argument("--records", help="保存检索结果的路径")
+    parser.add_argument("--with-llm", action="store_true", help="同时调用 LLM 过滤，统计回退路径的准确率和耗时")
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--min-similarity", type=float, default=0.5)
+    parser.add_argument("--max-similarity", type=float, default=0.95)
+    parser.add_argument("--similarity-step", type=float, default=0.05)
+    parser.add_argument("--max-margin", type=float, default=0.2)
+    parser.add_argument("--margin-step", type=float, default=0.04)
+    parser.add_argument("--target-precision", type=float, default=0.95)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,157 @@
+"""
+标签操作的语句数测试
+
+TaskRepository / TagRepository 的标签操作都应是一条 SQL 语句（data-modifying CTE），
+并在同一条语句里维护 tags.usage_count。本脚本在数据库上实际执行各操作，
+用 before_cursor_execute 事件统计每个操作发出的语句数，同时检查 usage_count。
+
+所有数据写在一个事务里，结束时回滚，不会留下测试数据。需要可用的 DATABASE_URL。
+
+Usage:
+    python scripts/test_tag_queries.py
+"""
+import argparse
+import asyncio
+import sys
+import uuid
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Dict, List
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import event, select
+
+from src.infrastructure.database.connection import engine
+from src.infrastructure.database.models import Tag
+from src.infrastructure.database.session import get_session
+from src.repositories.tag_repository import TagRepository
+from src.repositories.task_repository import TaskRepository
+
+
+class StatementCounter:
+    """统计 engine 发出的 SQL 语句"""
+
+    def __init__(self):
+        self.statements: List[str] = []
+        self.enabled = False
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if self.enabled:
+            self.statements.append(statement)
+
+
+failures: List[str] = []
+
+
+@asynccontextmanager
+async def expect_statements(counter: StatementCounter, label: str, expected: int):
+    """检查代码块发出的语句数"""
+    counter.statements.clear()
+    counter.enabled = True
+    try:
+        yield
+    finally:
+        counter.enabled = False
+
+    count = len(counter.statements)
+    if count == expected:
+        print(f"✓ {label}: {count} 条语句")
+    else:
+        failures.append(label)
+        print(f"❌ {label}: {count} 条语句（期望 {expected}）")
+        for statement in counter.statements:
+            print(f"    {' '.join(statement.split())[:120]}")
+
+
+async def usage_counts(db, tags: Dict[str, Tag]) -> Dict[str, int]:
+    result = await db.execute(
+        select(Tag.name, Tag.usage_count).where(Tag.id.in_([tag.id for tag in tags.values()]))
+    )
+    return dict(result.all())
+
+
+def check_usage(label: str, actual: Dict[str, int], expected: Dict[str, int]):
+    if actual == expected:
+        print(f"✓ {label}: usage_count {actual}")
+    else:
+        failures.append(label)
+        print(f"❌ {label}: usage_count {actual}（期望 {expected}）")
+
+
+async def main(args):
+    counter = StatementCounter()
+    event.listen(engine.sync_engine, "before_cursor_execute", counter)
+
+    prefix = f"test-{uuid.uuid4().hex[:8]}"
+    names = [f"{prefix}-{name}" for name in ("a", "b", "c")]
+    a, b, c = names
+
+    print("=" * 60)
+    print("标签操作语句数测试")
+    print("=" * 60)
+
+    try:
+        async with get_session() as db:
+            task_repo = TaskRepository(db)
+            tag_repo = TagRepository(db)
+
+            first = await task_repo.create(title=f"{prefix} task 1")
+            second = await task_repo.create(title=f"{prefix} task 2")
+
+            async with expect_statements(counter, "get_or_create_many（新建）", 1):
+                tags = await tag_repo.get_or_create_many([a, b, f" {a} ", ""])
+            async with expect_statements(counter, "get_or_create_many（已存在 + 新建）", 1):
+                tags = await tag_repo.get_or_create_many(names)
+            assert set(tags) == set(names), tags
+
+            async with expect_statements(counter, "get_or_create（已存在）", 1):
+                existing = await tag_repo.get_or_create(a)
+            assert existing.id == tags[a].id
+
+            async with expect_statements(counter, "add_tags_bulk", 1):
+                await task_repo.add_tags_bulk([
+                    (first.id, tags[a].id), (first.id, tags[b].id),
+                    (second.id, tags[a].id), (second.id, tags[a].id)
+                ])
+            check_usage("add_tags_bulk", await usage_counts(db, tags), {a: 2, b: 1, c: 0})
+
+            async with expect_statements(counter, "add_tag（已关联）", 1):
+                await task_repo.add_tag(first.id, tags[a].id)
+            check_usage("add_tag（已关联）", await usage_counts(db, tags), {a: 2, b: 1, c: 0})
+
+            async with expect_statements(counter, "replace_tags", 1):
+                await task_repo.replace_tags(first.id, [tags[b].id, tags[c].id])
+            check_usage("replace_tags", await usage_counts(db, tags), {a: 1, b: 1, c: 1})
+
+            async with expect_statements(counter, "replace_tags_bulk", 1):
+                await task_repo.replace_tags_bulk({
+                    first.id: [tags[a].id],
+                    second.id: [tags[a].id, tags[c].id]
+                })
+            check_usage("replace_tags_bulk", await usage_counts(db, tags), {a: 2, b: 0, c: 1})
+
+            async with expect_statements(counter, "remove_tag", 1):
+                await task_repo.remove_tag(second.id, tags[c].id)
+            check_usage("remove_tag", await usage_counts(db, tags), {a: 2, b: 0, c: 0})
+
+            async with expect_statements(counter, "remove_all_tags_bulk", 1):
+                await task_repo.remove_all_tags_bulk([first.id, second.id])
+            check_usage("remove_all_tags_bulk", await usage_counts(db, tags), {a: 0, b: 0, c: 0})
+
+            await db.rollback()
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", counter)
+        await engine.dispose()
+
+    print()
+    if failures:
+        print(f"❌ {len(failures)} 项失败: {', '.join(failures)}")
+        sys.exit(1)
+    print("✓ 全部通过")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="标签操作语句数测试")
+    asyncio.run(main(parser.parse_args()))
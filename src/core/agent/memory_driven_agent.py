@@ -6,8 +6,11 @@
 2. LLM 过滤 skills 和 facts
 3. 动态工具挂载
 4. 对话压缩
+5. 同一轮的多个工具调用并发执行
+6. 流式输出正文和思考过程
+7. 流式响应中的工具调用一旦完整立即开始执行
 """
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Callable
 from uuid import UUID
 import json
 import asyncio
@@ -17,19 +20,52 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from src.core.agent.state import AgentState, get_session_manager
 from src.infrastructure.llm.deepseek_client import DeepSeekClient
 from src.infrastructure.llm.unified_client import create_llm_client
-from src.core.memory.embedding_service import EmbeddingService
+from src.core.memory.embedding_service import get_embedding_service
 from src.core.memory.online_memory_adapter import OnlineMemoryAdapter
 from src.core.skills.skill_service import SkillService
 from src.core.skills.filter_service import FilterService
+from src.core.skills.selection_policy import get_fastpath_policy
 from src.core.skills.tool_registry import get_tool_registry
+from src.core.agent.tool_scheduler import ToolCallScheduler
+from src.core.agent.stream_assembler import CompletionStreamAssembler
 from src.core.utils.performance_tracker import PerformanceTracker
 from src.core.utils.debug import debug_print
 
 
+def _parse_tool_arguments(raw: Optional[str]) -> Dict[str, Any]:
+    """
+    解析工具调用参数（JSON 对象，空字符串视为无参数）
+
+    Raises:
+        ValueError: 参数不是合法的 JSON 对象（json.JSONDecodeError 是其子类）
+    """
+    if not raw or not raw.strip():
+        return {}
+    arguments = json.loads(raw)
+    if not isinstance(arguments, dict):
+        raise ValueError(f"expected a JSON object, got {type(arguments).__name__}")
+    return arguments
+
+
+def _tool_arguments_for_log(raw: Optional[str]) -> Any:
+    """工具调用记录中的参数：无法解析时保留原始字符串"""
+    try:
+        return _parse_tool_arguments(raw)
+    except ValueError:
+        return raw
+
+
 class MemoryDrivenAgent:
     """记忆驱动的统一 Agent"""
 
-    def __init__(self, db: AsyncSession, use_reasoner: bool = False, fixed_skill_id: Optional[str] = None):
+    def __init__(
+        self,
+        db: AsyncSession,
+        use_reasoner: bool = False,
+        fixed_skill_id: Optional[str] = None,
+        parallel_tools: bool = True,
+        eager_tools: bool = True
+    ):
         """
         初始化 Agent
 
@@ -37,17 +73,23 @@ class MemoryDrivenAgent:
             db: 数据库会话
             use_reasoner: 是否使用 reasoner 模式
             fixed_skill_id: 固定使用的 skill ID，如果提供则跳过 LLM 自动选择
+            parallel_tools: 是否并发执行同一轮中互不依赖的工具调用
+            eager_tools: 是否在流式响应过程中立即执行已完整的工具调用
+                         （与模型后续输出重叠），否则等整条响应结束后再执行
         """
         self.db = db
         self.session_manager = get_session_manager()
         self.max_iterations = 20
         self.fixed_skill_id = fixed_skill_id
         self.use_reasoner = use_reasoner
+        self.parallel_tools = parallel_tools
+        self.eager_tools = eager_tools
 
         # 服务层
-        self.embedding_service = EmbeddingService()
+        self.embedding_service = get_embedding_service()
         self.skill_service = SkillService(db)
         self.filter_service = FilterService()
+        self.fastpath_policy = get_fastpath_policy()
 
         # 线上记忆适配器
         self.online_memory_adapter = OnlineMemoryAdapter(enabled=False)  # 临时禁用线上记忆
@@ -193,10 +235,11 @@ class MemoryDrivenAgent:
                 try:
                     online_memories, filter_result = await asyncio.gather(
                         self.online_memory_adapter.recall_memories(query=user_message, top_k=5),
-                        self.filter_service.filter_skills_and_facts(
-                            user_query=user_message,
+                        self._select_skill(
+                            user_message=user_message,
                             candidate_skills=candidate_skills,
-                            candidate_facts=[]  # 不再使用本地 facts
+                            query_embedding=query_embedding,
+                            tracker=tracker
                         )
                     )
                     tracker.end_async_step("线上记忆召回")
@@ -208,10 +251,11 @@ class MemoryDrivenAgent:
 
                     # 重新执行 LLM 过滤（如果失败的话）
                     try:
-                        filter_result = await self.filter_service.filter_skills_and_facts(
-                            user_query=user_message,
+                        filter_result = await self._select_skill(
+                            user_message=user_message,
                             candidate_skills=candidate_skills,
-                            candidate_facts=[]
+                            query_embedding=query_embedding,
+                            tracker=tracker
                         )
                         tracker.end_sync_step("LLM过滤技能")
                     except Exception as filter_error:
@@ -274,7 +318,8 @@ class MemoryDrivenAgent:
                 state=state,
                 messages=messages,
                 tools=tools,
-                stream_callback=stream_callback
+                stream_callback=stream_callback,
+                tracker=tracker
             )
             tracker.end_sync_step("LLM生成响应")
 
@@ -329,6 +374,40 @@ class MemoryDrivenAgent:
                 "session_id": str(state.session_id)
             }
 
+    async def _select_skill(
+        self,
+        user_message: str,
+        candidate_skills: List[Dict[str, Any]],
+        query_embedding: Optional[List[float]] = None,
+        tracker: Optional[PerformanceTracker] = None
+    ) -> Dict[str, Any]:
+        """
+        从候选技能中选择一个
+
+        检索相似度足够高且明显领先时直接选择（快速路径），否则交给 LLM 过滤
+
+        Args:
+            user_message: 用户消息
+            candidate_skills: 候选技能（含 similarity）
+            query_embedding: 用户消息的 embedding
+            tracker: 性能追踪器
+
+        Returns:
+            {"skill_id", "fact_ids", "reasoning"}
+        """
+        fast_result = self.fastpath_policy.decide(candidate_skills)
+        if fast_result is not None:
+            debug_print(f"[Agent] {fast_result['reasoning']}: {fast_result['skill_id']}")
+            return fast_result
+
+        return await self.filter_service.filter_skills_and_facts(
+            user_query=user_message,
+            candidate_skills=candidate_skills,
+            candidate_facts=[],  # 不再使用本地 facts
+            query_embedding=query_embedding,
+            tracker=tracker
+        )
+
     def _build_messages(
         self,
         state: AgentState,
@@ -404,7 +483,8 @@ class MemoryDrivenAgent:
         state: AgentState,
         messages: List[Dict[str, Any]],
         tools: List[Dict[str, Any]],
-        stream_callback=None
+        stream_callback=None,
+        tracker: Optional[PerformanceTracker] = None
     ) -> Dict[str, Any]:
         """
         Agent 主循环
@@ -414,6 +494,7 @@ class MemoryDrivenAgent:
             messages: 消息历史
             tools: 工具列表
             stream_callback: 流式输出回调
+            tracker: 性能追踪器（记录每轮 LLM 调用的首 token 延迟）
 
         Returns:
             执行结果
@@ -425,25 +506,34 @@ class MemoryDrivenAgent:
         while iteration < self.max_iterations:
             iteration += 1
 
-            # 调用 LLM
-            response = await self.llm_client.chat_completion(
-                messages=messages,
-                tools=tools,
-                stream=False
-            )
+            # 立即执行模式：工具调用在流式过程中一旦完整就提交到调度器
+            scheduler = ToolCallScheduler() if self.eager_tools else None
+            on_tool_call = None
+            if scheduler is not None:
+                on_tool_call = lambda tool_call: self._submit_tool_call(scheduler, tool_call, stream_callback)
+
+            # 流式调用 LLM（正文和思考过程实时输出）
+            try:
+                response = await self._stream_completion(
+                    messages=messages,
+                    tools=tools,
+                    stream_callback=stream_callback,
+                    tracker=tracker,
+                    on_tool_call=on_tool_call
+                )
+            except BaseException:
+                if scheduler is not None:
+                    scheduler.cancel()
+                raise
 
             # 检查响应是否有效
-            if not response.choices or len(response.choices) == 0:
+            if response.chunk_count == 0:
                 debug_print(f"⚠️  LLM 返回空响应，终止循环")
                 break
 
             # 提取响应内容
-            content = response.choices[0].message.content or ""
-            tool_calls = response.choices[0].message.tool_calls
-
-            # 输出文本内容
-            if content and stream_callback:
-                stream_callback('text', content)
+            content = response.content
+            tool_calls = response.tool_calls
             accumulated_text += content
 
             # 如果没有工具调用，结束循环
@@ -451,17 +541,20 @@ class MemoryDrivenAgent:
                 state.add_message("assistant", content)
                 break
 
-            # 处理工具调用
-            tool_results = await self._execute_tools(
-                tool_calls=tool_calls,
-                stream_callback=stream_callback
-            )
+            # 处理工具调用（立即执行模式下只需按顺序等待结果）
+            if scheduler is not None:
+                tool_results = await scheduler.join()
+            else:
+                tool_results = await self._execute_tools(
+                    tool_calls=tool_calls,
+                    stream_callback=stream_callback
+                )
 
             # 收集工具调用信息
             for tool_call, result in zip(tool_calls, tool_results):
                 all_tool_calls.append({
                     "name": tool_call.function.name,
-                    "args": json.loads(tool_call.function.arguments),
+                    "args": _tool_arguments_for_log(tool_call.function.arguments),
                     "result": result
                 })
 
@@ -483,8 +576,8 @@ class MemoryDrivenAgent:
             }
 
             # 如果响应包含 reasoning_content（Kimi k2.5），保留它
-            if hasattr(response.choices[0].message, 'reasoning_content') and response.choices[0].message.reasoning_content:
-                assistant_message["reasoning_content"] = response.choices[0].message.reasoning_content
+            if response.reasoning_content:
+                assistant_message["reasoning_content"] = response.reasoning_content
 
             messages.append(assistant_message)
 
@@ -509,6 +602,65 @@ class MemoryDrivenAgent:
             "tool_calls": all_tool_calls
         }
 
+    async def _stream_completion(
+        self,
+        messages: List[Dict[str, Any]],
+        tools: List[Dict[str, Any]],
+        stream_callback=None,
+        tracker: Optional[PerformanceTracker] = None,
+        on_tool_call: Optional[Callable[[Any], None]] = None
+    ) -> CompletionStreamAssembler:
+        """
+        流式调用 LLM
+
+        正文增量以 'content'、思考增量以 'thinking' 输出到回调；
+        工具调用的参数片段边接收边拼装
+
+        Args:
+            messages: 消息历史
+            tools: 工具列表
+            stream_callback: 流式输出回调
+            tracker: 性能追踪器
+            on_tool_call: 工具调用完整时的回调（按 index 顺序，每个调用一次）
+
+        Returns:
+            拼装完成的响应
+        """
+        assembler = CompletionStreamAssembler()
+        llm_call = tracker.start_llm_call() if tracker else None
+
+        try:
+            stream = await self.llm_client.chat_completion(
+                messages=messages,
+                tools=tools,
+                stream=True
+            )
+
+            async for chunk in stream:
+                content, reasoning = assembler.feed(chunk)
+
+                if llm_call is not None and assembler.started:
+                    tracker.mark_first_token(llm_call)
+
+                if stream_callback:
+                    if reasoning:
+                        stream_callback('thinking', reasoning)
+                    if content:
+                        stream_callback('content', content)
+
+                if on_tool_call is not None:
+                    for tool_call in assembler.pop_completed_tool_calls():
+                        on_tool_call(tool_call)
+
+            if on_tool_call is not None:
+                for tool_call in assembler.pop_completed_tool_calls(final=True):
+                    on_tool_call(tool_call)
+        finally:
+            if llm_call is not None:
+                tracker.end_llm_call(llm_call)
+
+        return assembler
+
     async def _execute_tools(
         self,
         tool_calls: List[Any],
@@ -517,6 +669,9 @@ class MemoryDrivenAgent:
         """
         执行工具调用
 
+        并发模式下，互不依赖的工具同时执行；串行工具（写文件、数据库操作等）
+        保持原有顺序。结果始终按 tool_calls 的顺序返回。
+
         Args:
             tool_calls: 工具调用列表
             stream_callback: 流式输出回调
@@ -524,58 +679,107 @@ class MemoryDrivenAgent:
         Returns:
             工具执行结果列表
         """
-        results = []
+        if not self.parallel_tools:
+            results = []
+            for tool_call in tool_calls:
+                results.append(await self._execute_tool_call(tool_call, stream_callback))
+            return results
 
+        scheduler = ToolCallScheduler()
         for tool_call in tool_calls:
-            function_name = tool_call.function.name
-            arguments = json.loads(tool_call.function.arguments)
+            self._submit_tool_call(scheduler, tool_call, stream_callback)
+        return await scheduler.join()
+
+    def _submit_tool_call(
+        self,
+        scheduler: ToolCallScheduler,
+        tool_call: Any,
+        stream_callback=None
+    ) -> None:
+        """
+        把工具调用提交到调度器
+
+        非并发模式下所有调用都按串行提交，保持逐个执行的语义
+        """
+        scheduler.submit(
+            lambda: self._execute_tool_call(tool_call, stream_callback),
+            serial=not self.parallel_tools or self.tool_registry.is_serial(tool_call.function.name)
+        )
+
+    async def _execute_tool_call(
+        self,
+        tool_call: Any,
+        stream_callback=None
+    ) -> Dict[str, Any]:
+        """
+        执行单个工具调用
+
+        Args:
+            tool_call: 工具调用
+            stream_callback: 流式输出回调
 
-            # 输出工具调用可视化
+        Returns:
+            工具执行结果
+        """
+        function_name = tool_call.function.name
+        try:
+            arguments = _parse_tool_arguments(tool_call.function.arguments)
+        except ValueError as e:
+            # 参数被截断或不是合法 JSON：只让这一次调用失败，模型可以重试，不影响同批其他工具
+            debug_print(f"[Agent] 工具 {function_name} 参数解析失败: {e}")
+            result = {"success": False, "error": f"invalid tool arguments: {e}"}
             if stream_callback:
                 viz_text = self.tool_registry.format_visualization(
                     tool_name=function_name,
-                    arguments=arguments,
-                    stage="calling"
+                    arguments={"error": result["error"]},
+                    stage="error"
                 )
-                stream_callback('tool_call', viz_text + '\n')
+                stream_callback('tool_result', viz_text + '\n\n')
+            return result
 
-            # 执行工具
-            result = await self.tool_registry.execute_tool(
+        # 输出工具调用可视化
+        if stream_callback:
+            viz_text = self.tool_registry.format_visualization(
                 tool_name=function_name,
-                db=self.db,
-                **arguments
+                arguments=arguments,
+                stage="calling"
             )
+            stream_callback('tool_call', viz_text + '\n')
 
-            # 特殊处理：如果是渲染工具，将图片编码为base64让AI能看到
-            if function_name == "render_cad_region" and result.get("success"):
-                image_path = result.get("data", {}).get("image_path")
-                if image_path:
-                    try:
-                        import base64
-                        with open(image_path, "rb") as f:
-                            image_base64 = base64.b64encode(f.read()).decode('utf-8')
-                        result["data"]["image_base64"] = image_base64
-                        debug_print(f"[Agent] 已将图片编码为base64: {image_path}")
-                    except Exception as e:
-                        debug_print(f"[Agent] 图片编码失败: {e}")
-
-            # 输出工具结果可视化
-            if stream_callback:
-                if result.get("success"):
-                    viz_text = self.tool_registry.format_visualization(
-                        tool_name=function_name,
-                        arguments={**arguments, **result.get("data", {})},
-                        stage="success"
-                    )
-                else:
-                    viz_text = self.tool_registry.format_visualization(
-                        tool_name=function_name,
-                        arguments={**arguments, "error": result.get("error", "")},
-                        stage="error"
-                    )
-                stream_callback('tool_result', viz_text + '\n\n')
+        # 执行工具
+        result = await self.tool_registry.execute_tool(
+            tool_name=function_name,
+            db=self.db,
+            **arguments
+        )
 
-            results.append(result)
+        # 特殊处理：如果是渲染工具，将图片编码为base64让AI能看到
+        if function_name == "render_cad_region" and result.get("success"):
+            image_path = result.get("data", {}).get("image_path")
+            if image_path:
+                try:
+                    import base64
+                    with open(image_path, "rb") as f:
+                        image_base64 = base64.b64encode(f.read()).decode('utf-8')
+                    result["data"]["image_base64"] = image_base64
+                    debug_print(f"[Agent] 已将图片编码为base64: {image_path}")
+                except Exception as e:
+                    debug_print(f"[Agent] 图片编码失败: {e}")
 
-        return results
+        # 输出工具结果可视化
+        if stream_callback:
+            if result.get("success"):
+                viz_text = self.tool_registry.format_visualization(
+                    tool_name=function_name,
+                    arguments={**arguments, **result.get("data", {})},
+                    stage="success"
+                )
+            else:
+                viz_text = self.tool_registry.format_visualization(
+                    tool_name=function_name,
+                    arguments={**arguments, "error": result.get("error", "")},
+                    stage="error"
+                )
+            stream_callback('tool_result', viz_text + '\n\n')
 
+        return result
@@ -0,0 +1,171 @@
+"""
+流式响应拼装器 - 把 OpenAI 兼容接口的流式 chunk 拼装成完整的 assistant 消息
+
+流式模式下，每个 chunk 只携带增量：
+1. delta.content: 正文片段
+2. delta.reasoning_content: 思考过程片段（DeepSeek reasoner / Kimi k2.5）
+3. delta.tool_calls: 工具调用片段，按 index 区分；id、name 只在首个片段出现，
+   arguments 是分散在多个片段中的 JSON 字符串
+
+拼装完成后的 tool_calls 与非流式响应的类型一致，后续的工具执行逻辑无需区分。
+
+流式过程中可以通过 pop_completed_tool_calls() 提前取出已经完整的工具调用
+（参数已是完整的 JSON，或后一个工具调用已经开始），以便立即开始执行
+"""
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from openai.types.chat import ChatCompletionMessageToolCall
+from openai.types.chat.chat_completion_message_tool_call import Function
+
+
+class CompletionStreamAssembler:
+    """单次流式 completion 的拼装器"""
+
+    def __init__(self):
+        self._content_parts: List[str] = []
+        self._reasoning_parts: List[str] = []
+        # 工具调用片段: {index: {"id", "type", "name", "arguments": [片段]}}
+        self._tool_calls: Dict[int, Dict[str, Any]] = {}
+        # 已通过 pop_completed_tool_calls() 取出的工具调用 index
+        self._popped: set = set()
+        self.finish_reason: Optional[str] = None
+        self.chunk_count = 0
+        # 是否已收到正文、思考或工具调用片段（用于记录首 token）
+        self.started = False
+
+    def feed(self, chunk: Any) -> Tuple[str, str]:
+        """
+        处理一个 chunk
+
+        Args:
+            chunk: ChatCompletionChunk
+
+        Returns:
+            (正文增量, 思考增量)，没有时为空字符串
+        """
+        self.chunk_count += 1
+
+        # 部分服务在最后一个 chunk 中只返回 usage，choices 为空
+        if not chunk.choices:
+            return "", ""
+
+        choice = chunk.choices[0]
+        if choice.finish_reason:
+            self.finish_reason = choice.finish_reason
+
+        delta = choice.delta
+        if delta is None:
+            return "", ""
+
+        content = delta.content or ""
+        if content:
+            self._content_parts.append(content)
+
+        # reasoning_content 不在 OpenAI 的标准字段中，作为扩展字段返回
+        reasoning = getattr(delta, "reasoning_content", None) or ""
+        if reasoning:
+            self._reasoning_parts.append(reasoning)
+
+        for fragment in delta.tool_calls or []:
+            self._feed_tool_call(fragment)
+
+        if content or reasoning or delta.tool_calls:
+            self.started = True
+
+        return content, reasoning
+
+    def _feed_tool_call(self, fragment: Any) -> None:
+        """合并一个工具调用片段"""
+        index = fragment.index if fragment.index is not None else len(self._tool_calls)
+        call = self._tool_calls.setdefault(
+            index, {"id": None, "type": "function", "name": "", "arguments": []}
+        )
+
+        if fragment.id:
+            call["id"] = fragment.id
+        if fragment.type:
+            call["type"] = fragment.type
+
+        function = fragment.function
+        if function is not None:
+            if function.name:
+                call["name"] += function.name
+            if function.arguments:
+                call["arguments"].append(function.arguments)
+
+    def pop_completed_tool_calls(self, final: bool = False) -> List[ChatCompletionMessageToolCall]:
+        """
+        取出新完成的工具调用（按 index 顺序，每个只返回一次）
+
+        工具调用在以下情况视为完整：
+        1. 参数已是完整的 JSON 对象（合法 JSON 之后不可能再追加片段）
+        2. 之后的工具调用已经开始
+        3. final=True（流已结束）
+
+        遇到第一个未完成的工具调用即停止，保证取出顺序与 index 顺序一致
+
+        Args:
+            final: 流是否已结束
+
+        Returns:
+            新完成的工具调用列表
+        """
+        completed = []
+        indexes = sorted(self._tool_calls)
+        for position, index in enumerate(indexes):
+            if index in self._popped:
+                continue
+
+            call = self._tool_calls[index]
+            has_next = position + 1 < len(indexes)
+            if not (final or has_next or self._arguments_complete(call)):
+                break
+
+            self._popped.add(index)
+            completed.append(self._build_tool_call(index, call))
+        return completed
+
+    @staticmethod
+    def _arguments_complete(call: Dict[str, Any]) -> bool:
+        """参数片段是否已拼成完整的 JSON 对象"""
+        if not call["id"] or not call["name"] or not call["arguments"]:
+            return False
+        # 只有以 } 结尾时才可能完整，避免每个片段都尝试解析
+        if not call["arguments"][-1].rstrip().endswith("}"):
+            return False
+        try:
+            return isinstance(json.loads("".join(call["arguments"])), dict)
+        except ValueError:
+            return False
+
+    @property
+    def content(self) -> str:
+        """完整正文"""
+        return "".join(self._content_parts)
+
+    @property
+    def reasoning_content(self) -> str:
+        """完整思考过程"""
+        return "".join(self._reasoning_parts)
+
+    @property
+    def tool_calls(self) -> List[ChatCompletionMessageToolCall]:
+        """拼装完成的工具调用（按 index 排序）"""
+        return [
+            self._build_tool_call(index, self._tool_calls[index])
+            for index in sorted(self._tool_calls)
+        ]
+
+    @staticmethod
+    def _build_tool_call(index: int, call: Dict[str, Any]) -> ChatCompletionMessageToolCall:
+        """把合并后的片段转换为与非流式响应一致的工具调用对象"""
+        return ChatCompletionMessageToolCall(
+            id=call["id"] or f"call_{index}",
+            type="function",
+            function=Function(
+                name=call["name"],
+                # 无参数的工具调用可能不返回 arguments 片段
+                arguments="".join(call["arguments"]) or "{}"
+            )
+        )
@@ -0,0 +1,65 @@
+"""
+工具调用调度器 - 并发执行同一轮中互不依赖的工具调用
+
+调度规则：
+1. 普通工具提交后立即作为 asyncio task 并发执行
+2. 串行工具（如写文件、数据库操作）是一个"屏障"：
+   先等待之前提交的所有调用完成，再执行自己；
+   之后提交的调用也要等它完成后才开始
+3. join() 按提交顺序返回结果，保证 tool 消息顺序稳定
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional
+
+
+class ToolCallScheduler:
+    """单轮工具调用的调度器"""
+
+    def __init__(self):
+        self._tasks: List[asyncio.Task] = []
+        # 最近一个串行调用（屏障）
+        self._barrier: Optional[asyncio.Task] = None
+
+    def submit(self, run: Callable[[], Awaitable[Any]], serial: bool = False) -> asyncio.Task:
+        """
+        提交一个工具调用
+
+        Args:
+            run: 无参协程工厂，执行工具并返回结果
+            serial: 是否串行执行
+
+        Returns:
+            该调用对应的 asyncio task
+        """
+        if serial:
+            waits_for = list(self._tasks)
+        else:
+            waits_for = [self._barrier] if self._barrier is not None else []
+
+        task = asyncio.create_task(self._run_after(waits_for, run))
+        self._tasks.append(task)
+
+        if serial:
+            self._barrier = task
+
+        return task
+
+    @staticmethod
+    async def _run_after(waits_for: List[asyncio.Task], run: Callable[[], Awaitable[Any]]) -> Any:
+        """等待依赖的调用结束（忽略其异常）后执行"""
+        if waits_for:
+            await asyncio.gather(*waits_for, return_exceptions=True)
+        return await run()
+
+    def cancel(self) -> None:
+        """取消所有未完成的调用（如流式响应中途出错）"""
+        for task in self._tasks:
+            task.cancel()
+
+    async def join(self) -> List[Any]:
+        """等待所有调用完成，按提交顺序返回结果"""
+        try:
+            return list(await asyncio.gather(*self._tasks))
+        except BaseException:
+            self.cancel()
+            raise
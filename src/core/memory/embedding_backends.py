@@ -0,0 +1,224 @@
+"""
+Embedding backends used by EmbeddingService.
+
+- DashScopeBackend: DashScope OpenAI-compatible /embeddings API over HTTP
+- LocalEmbeddingBackend: sentence-transformers model on CPU (optionally ONNX / quantized ONNX),
+  no network round-trip
+
+The backend is selected with EMBEDDING_BACKEND (settings.embedding_backend). Vectors from
+different backends are not comparable: after switching, stored task and skill embeddings
+must be regenerated. Local vectors are truncated (and re-normalized) or zero-padded to
+EMBEDDING_DIMENSIONS so they fit the Vector(1024) columns.
+"""
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+from typing import List, Optional, Sequence
+
+import httpx
+import numpy as np
+
+from src.infrastructure.config import settings
+
+
+BACKEND_DASHSCOPE = "dashscope"
+BACKEND_LOCAL = "local"
+
+
+def fit_dimensions(vectors: np.ndarray, dimensions: int) -> np.ndarray:
+    """
+    Fit L2-normalized vectors to the configured dimension.
+
+    Longer vectors are truncated and re-normalized; shorter vectors are zero-padded,
+    which keeps cosine similarity unchanged.
+
+    Args:
+        vectors: Array of shape (n, model_dim)
+        dimensions: Target dimension (<= 0 keeps the model dimension)
+
+    Returns:
+        Array of shape (n, dimensions)
+    """
+    model_dim = vectors.shape[1]
+    if dimensions <= 0 or model_dim == dimensions:
+        return vectors
+    if model_dim > dimensions:
+        truncated = vectors[:, :dimensions]
+        norms = np.linalg.norm(truncated, axis=1, keepdims=True)
+        return truncated / np.maximum(norms, 1e-12)
+    padded = np.zeros((vectors.shape[0], dimensions), dtype=vectors.dtype)
+    padded[:, :model_dim] = vectors
+    return padded
+
+
+class EmbeddingBackend(ABC):
+    """Base class for embedding backends."""
+
+    # Identifies the vector space (used as the embedding cache key)
+    name: str = ""
+    # Maximum number of texts per embed() call
+    max_batch_size: int = 10
+
+    @abstractmethod
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed a batch of texts (no caching).
+
+        Args:
+            texts: Input texts (at most max_batch_size)
+
+        Returns:
+            One embedding per text, in input order
+        """
+
+    async def close(self):
+        """Release backend resources."""
+
+
+class DashScopeBackend(EmbeddingBackend):
+    """DashScope embeddings over HTTP."""
+
+    # DashScope text-embedding-v3/v4 accept at most 10 inputs per request
+    max_batch_size = 10
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        model: Optional[str] = None
+    ):
+        self.api_key = api_key or settings.dashscope_api_key
+        self.base_url = base_url or settings.dashscope_base_url
+        self.model = model or settings.dashscope_embedding_model
+        self.name = self.model
+        self.client = httpx.AsyncClient(timeout=30.0)
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+
+        payload = {
+            "model": self.model,
+            "input": texts
+        }
+
+        response = await self.client.post(
+            f"{self.base_url}/embeddings",
+            headers=headers,
+            json=payload
+        )
+        response.raise_for_status()
+
+        data = response.json()
+        items = sorted(data["data"], key=lambda item: item.get("index", 0))
+        if len(items) != len(texts):
+            raise ValueError(f"Expected {len(texts)} embeddings, got {len(items)}")
+        return [item["embedding"] for item in items]
+
+    async def close(self):
+        await self.client.aclose()
+
+
+class LocalEmbeddingBackend(EmbeddingBackend):
+    """sentence-transformers model running in-process (CPU by default)."""
+
+    def __init__(
+        self,
+        model_name: Optional[str] = None,
+        device: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        dimensions: Optional[int] = None,
+        onnx: Optional[bool] = None,
+        onnx_file: Optional[str] = None
+    ):
+        """
+        Args:
+            model_name: Hugging Face model id or local path
+            device: torch device ("cpu", "cuda", ...)
+            batch_size: Texts per forward pass (also the coalescing batch limit)
+            dimensions: Output dimension (model vectors are truncated/padded to fit)
+            onnx: Run the model with the ONNX Runtime backend
+            onnx_file: ONNX file inside the model repo (e.g. a quantized export)
+        """
+        self.model_name = model_name or settings.local_embedding_model
+        self.device = device or settings.local_embedding_device
+        self.max_batch_size = max(batch_size or settings.local_embedding_batch_size, 1)
+        self.dimensions = dimensions if dimensions is not None else settings.embedding_dimensions
+        self.onnx = settings.local_embedding_onnx if onnx is None else onnx
+        self.onnx_file = onnx_file or settings.local_embedding_onnx_file
+
+        variant = f":onnx:{self.onnx_file or 'default'}" if self.onnx else ""
+        self.name = f"local:{self.model_name}:{self.dimensions}{variant}"
+
+        self._model = None
+        # Loading and encoding are serialized: one model instance, CPU-bound anyway
+        self._lock = threading.Lock()
+
+    def _load(self):
+        """Load the model on first use."""
+        if self._model is None:
+            try:
+                from sentence_transformers import SentenceTransformer
+            except ImportError as e:
+                raise RuntimeError(
+                    "EMBEDDING_BACKEND=local requires sentence-transformers "
+                    "(pip install sentence-transformers; ONNX also needs optimum[onnxruntime])"
+                ) from e
+
+            kwargs = {"device": self.device}
+            if self.onnx:
+                kwargs["backend"] = "onnx"
+                if self.onnx_file:
+                    kwargs["model_kwargs"] = {"file_name": self.onnx_file}
+            self._model = SentenceTransformer(self.model_name, **kwargs)
+        return self._model
+
+    def encode(self, texts: Sequence[str]) -> List[List[float]]:
+        """
+        Embed texts synchronously.
+
+        Args:
+            texts: Input texts
+
+        Returns:
+            L2-normalized embeddings with `dimensions` components
+        """
+        with self._lock:
+            model = self._load()
+            vectors = model.encode(
+                list(texts),
+                batch_size=self.max_batch_size,
+                normalize_embeddings=True,
+                convert_to_numpy=True,
+                show_progress_bar=False
+            )
+        return fit_dimensions(np.asarray(vectors, dtype=np.float32), self.dimensions).tolist()
+
+    def warmup(self) -> None:
+        """Load the model ahead of the first request."""
+        with self._lock:
+            self._load()
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        # Inference is CPU-bound; keep it off the event loop
+        return await asyncio.to_thread(self.encode, texts)
+
+
+def create_embedding_backend(backend: Optional[str] = None) -> EmbeddingBackend:
+    """
+    Create the configured embedding backend.
+
+    Args:
+        backend: "dashscope" or "local" (defaults to settings.embedding_backend)
+
+    Returns:
+        Embedding backend instance
+    """
+    backend = (backend or settings.embedding_backend).lower()
+    if backend == BACKEND_DASHSCOPE:
+        return DashScopeBackend()
+    if backend == BACKEND_LOCAL:
+        return LocalEmbeddingBackend()
+    raise ValueError(f"Unknown embedding backend: {backend}")
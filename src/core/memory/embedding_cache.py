@@ -0,0 +1,330 @@
+"""
+Two-tier cache for text embeddings.
+
+Identical strings (repeated queries, unchanged task titles, skill prompts) used to
+be re-embedded through the DashScope API on every call. Embeddings are cached in:
+
+1. An in-memory LRU bounded by entry count (EMBEDDING_CACHE_ENTRIES)
+2. A persistent SQLite store (EMBEDDING_CACHE_PATH; empty string disables it),
+   so the cache survives restarts
+
+Entries are keyed by sha256(model name + text). Switching the embedding model
+therefore never returns stale vectors and needs no TTL; `clear(model)` reclaims
+the space used by an old model.
+
+SQLite calls can block (busy timeout on the shared file), so async callers use
+aget_many/aput_many: the in-memory tier is served inline and the persistent tier
+runs in a worker thread. The memory tier has its own lock and never waits on disk I/O.
+"""
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+EMBEDDING_CACHE_ENTRIES = int(os.getenv("EMBEDDING_CACHE_ENTRIES", "4096"))
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "workspace/.cache/embeddings.sqlite3")
+
+
+def cache_key(model: str, text: str) -> str:
+    """Cache key for a (model, text) pair."""
+    return hashlib.sha256(f"{model}\x00{text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """In-memory LRU in front of a persistent SQLite store (thread-safe)."""
+
+    def __init__(
+        self,
+        max_entries: int = EMBEDDING_CACHE_ENTRIES,
+        db_path: Optional[str] = EMBEDDING_CACHE_PATH
+    ):
+        """
+        Args:
+            max_entries: Maximum number of embeddings kept in memory
+            db_path: SQLite file for the persistent tier (None or "" disables it)
+        """
+        self.max_entries = max_entries
+        self.db_path = db_path or None
+
+        self._memory: "OrderedDict[str, List[float]]" = OrderedDict()
+        # Guards the in-memory tier and counters; held only for in-memory work
+        self._lock = threading.Lock()
+        # Guards the SQLite connection
+        self._db_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._db_failed = False
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.api_calls = 0
+        self.api_texts = 0
+        self.api_seconds = 0.0
+
+    # ------------------------------------------------------------
+    # Persistent tier
+    # ------------------------------------------------------------
+
+    @property
+    def persistent(self) -> bool:
+        """Whether the persistent tier is enabled."""
+        return self.db_path is not None and not self._db_failed
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        """Open the SQLite store on first use; disable the tier if it cannot be opened (call with _db_lock held)."""
+        if self.db_path is None or self._db_failed:
+            return None
+        if self._conn is None:
+            try:
+                Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=5.0)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS embeddings (
+                        key TEXT PRIMARY KEY,
+                        model TEXT NOT NULL,
+                        dim INTEGER NOT NULL,
+                        vector BLOB NOT NULL,
+                        created_at REAL NOT NULL
+                    )
+                    """
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_model ON embeddings (model)")
+                conn.commit()
+                self._conn = conn
+            except sqlite3.Error:
+                self._db_failed = True
+                return None
+        return self._conn
+
+    # ------------------------------------------------------------
+    # Lookup / store
+    # ------------------------------------------------------------
+
+    def _lookup_memory(
+        self,
+        keys: List[str],
+        results: List[Optional[List[float]]]
+    ) -> Dict[str, List[int]]:
+        """Fill results from the in-memory tier; return the positions of missing keys."""
+        missing: Dict[str, List[int]] = {}
+        with self._lock:
+            for i, key in enumerate(keys):
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    results[i] = list(vector)
+                    self.memory_hits += 1
+                else:
+                    missing.setdefault(key, []).append(i)
+        return missing
+
+    def _load(self, keys: List[str]) -> Dict[str, List[float]]:
+        """Read embeddings from SQLite (blocking; SQLite limits bound parameters, so query in chunks)."""
+        found: Dict[str, List[float]] = {}
+        with self._db_lock:
+            conn = self._connection()
+            if conn is None:
+                return found
+            try:
+                for start in range(0, len(keys), 500):
+                    chunk = keys[start:start + 500]
+                    rows = conn.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})",
+                        chunk
+                    ).fetchall()
+                    for key, blob in rows:
+                        found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+            except sqlite3.Error:
+                pass
+        return found
+
+    def _merge_disk_hits(
+        self,
+        missing: Dict[str, List[int]],
+        found: Dict[str, List[float]],
+        results: List[Optional[List[float]]]
+    ) -> None:
+        """Promote disk hits into the in-memory tier and update counters."""
+        with self._lock:
+            for key, vector in found.items():
+                self._remember(key, vector)
+                for i in missing.pop(key):
+                    results[i] = list(vector)
+                    self.disk_hits += 1
+            self.misses += sum(len(positions) for positions in missing.values())
+
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """
+        Look up embeddings for several texts (blocking; async callers use aget_many).
+
+        Args:
+            model: Embedding model name
+            texts: Input texts
+
+        Returns:
+            One embedding per text, None where the text is not cached
+        """
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        missing = self._lookup_memory([cache_key(model, text) for text in texts], results)
+        found = self._load(list(missing)) if missing and self.persistent else {}
+        self._merge_disk_hits(missing, found, results)
+        return results
+
+    async def aget_many(self, model: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """
+        Look up embeddings for several texts without blocking the event loop.
+
+        In-memory hits are served inline; only the remaining keys go to SQLite,
+        in a worker thread.
+        """
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        missing = self._lookup_memory([cache_key(model, text) for text in texts], results)
+        found = await asyncio.to_thread(self._load, list(missing)) if missing and self.persistent else {}
+        self._merge_disk_hits(missing, found, results)
+        return results
+
+    def _remember(self, key: str, vector: List[float]) -> None:
+        """Insert into the in-memory LRU, evicting the least recently used entries (call with _lock held)."""
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _put_memory(self, model: str, texts: Sequence[str], embeddings: Sequence[Sequence[float]]) -> List[tuple]:
+        """Store embeddings in the in-memory tier; return the rows for SQLite."""
+        rows = []
+        now = time.time()
+        with self._lock:
+            for text, embedding in zip(texts, embeddings):
+                key = cache_key(model, text)
+                vector = [float(v) for v in embedding]
+                self._remember(key, vector)
+                rows.append((
+                    key, model, len(vector),
+                    np.asarray(vector, dtype=np.float32).tobytes(), now
+                ))
+        return rows
+
+    def _store(self, rows: List[tuple]) -> None:
+        """Write rows to SQLite (blocking)."""
+        with self._db_lock:
+            conn = self._connection()
+            if conn is None or not rows:
+                return
+            try:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, model, dim, vector, created_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    rows
+                )
+                conn.commit()
+            except sqlite3.Error:
+                pass
+
+    def put_many(self, model: str, texts: Sequence[str], embeddings: Sequence[Sequence[float]]) -> None:
+        """
+        Store embeddings for several texts (blocking; async callers use aput_many).
+
+        Args:
+            model: Embedding model name
+            texts: Input texts
+            embeddings: Embedding vectors (same order as texts)
+        """
+        rows = self._put_memory(model, texts, embeddings)
+        if self.persistent:
+            self._store(rows)
+
+    async def aput_many(self, model: str, texts: Sequence[str], embeddings: Sequence[Sequence[float]]) -> None:
+        """
+        Store embeddings without blocking the event loop.
+
+        The in-memory tier is updated before the first await, so lookups issued
+        after this call is started already hit; the SQLite write runs in a worker thread.
+        """
+        rows = self._put_memory(model, texts, embeddings)
+        if self.persistent:
+            await asyncio.to_thread(self._store, rows)
+
+    # ------------------------------------------------------------
+    # Metrics / maintenance
+    # ------------------------------------------------------------
+
+    def record_api_call(self, text_count: int, seconds: float) -> None:
+        """Record one embedding API request (used to estimate the latency saved by hits)."""
+        with self._lock:
+            self.api_calls += 1
+            self.api_texts += text_count
+            self.api_seconds += seconds
+
+    def clear(self, model: Optional[str] = None) -> None:
+        """
+        Drop cached embeddings.
+
+        Args:
+            model: Only drop entries of this model (persistent tier); None drops everything
+        """
+        with self._lock:
+            self._memory.clear()
+        with self._db_lock:
+            conn = self._connection()
+            if conn is not None:
+                try:
+                    if model is None:
+                        conn.execute("DELETE FROM embeddings")
+                    else:
+                        conn.execute("DELETE FROM embeddings WHERE model = ?", (model,))
+                    conn.commit()
+                except sqlite3.Error:
+                    pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache statistics, including the API latency saved by hits (estimated per request)."""
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            total = hits + self.misses
+            mean_call = self.api_seconds / self.api_calls if self.api_calls else 0.0
+            return {
+                "memory_entries": len(self._memory),
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / total, 4) if total else 0.0,
+                "api_calls": self.api_calls,
+                "api_texts": self.api_texts,
+                "api_seconds": round(self.api_seconds, 3),
+                "saved_seconds": round(hits * mean_call, 3),
+                "persistent": self.persistent
+            }
+
+    def close(self) -> None:
+        """Close the SQLite connection."""
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# Global embedding cache instance
+_embedding_cache: Optional[EmbeddingCache] = None
+_embedding_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Get or create the global embedding cache."""
+    global _embedding_cache
+    if _embedding_cache is None:
+        with _embedding_cache_lock:
+            if _embedding_cache is None:
+                _embedding_cache = EmbeddingCache()
+    return _embedding_cache
@@ -1,19 +1,61 @@
 """
-Embedding service using DashScope API.
+Embedding service backed by DashScope API or a local sentence-transformers model
+(EMBEDDING_BACKEND, see embedding_backends).
+
+Embeddings are served from a two-tier cache (in-memory LRU + persistent SQLite,
+see embedding_cache) and only texts that are not cached reach the backend.
+
+Uncached texts are coalesced: concurrent generate()/generate_batch() calls within
+EMBEDDING_BATCH_WINDOW_MS (or until EMBEDDING_MAX_BATCH_SIZE texts are queued) are
+merged into one backend request, and identical texts already in flight share
+the same pending result.
 """
-from typing import List, Optional
-import httpx
-from src.infrastructure.config import settings
+from typing import Dict, List, Optional, Set
+import asyncio
+import os
+import threading
+import time
+from src.core.memory.embedding_backends import EmbeddingBackend, create_embedding_backend
+from src.core.memory.embedding_cache import EmbeddingCache, get_embedding_cache
 
 
-class EmbeddingService:
-    """Service for generating text embeddings using DashScope API."""
+EMBEDDING_BATCH_WINDOW_MS = float(os.getenv("EMBEDDING_BATCH_WINDOW_MS", "10"))
+# Overrides the backend's batch limit (0 = use the backend limit, 10 for DashScope)
+EMBEDDING_MAX_BATCH_SIZE = int(os.getenv("EMBEDDING_MAX_BATCH_SIZE", "0"))
 
-    def __init__(self):
-        self.api_key = settings.dashscope_api_key
-        self.base_url = settings.dashscope_base_url
-        self.model = settings.dashscope_embedding_model
-        self.client = httpx.AsyncClient(timeout=30.0)
+
+class EmbeddingService:
+    """Service for generating text embeddings."""
+
+    def __init__(
+        self,
+        cache: Optional[EmbeddingCache] = None,
+        batch_window_ms: float = EMBEDDING_BATCH_WINDOW_MS,
+        max_batch_size: int = EMBEDDING_MAX_BATCH_SIZE,
+        backend: Optional[EmbeddingBackend] = None
+    ):
+        """
+        Args:
+            cache: Embedding cache (defaults to the process-wide cache)
+            batch_window_ms: How long to wait for more texts before sending a batch
+            max_batch_size: Maximum number of texts per backend request (0 = backend limit)
+            backend: Embedding backend (defaults to settings.embedding_backend)
+        """
+        self.backend = backend or create_embedding_backend()
+        # Cache key namespace: vectors from different backends/models never mix
+        self.model = self.backend.name
+        self.cache = cache or get_embedding_cache()
+
+        self.batch_window = max(batch_window_ms, 0.0) / 1000
+        self.max_batch_size = max_batch_size if max_batch_size > 0 else self.backend.max_batch_size
+
+        # Coalescing state (bound to the event loop that created it)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: Dict[str, asyncio.Future] = {}    # queued, not yet sent
+        self._in_flight: Dict[str, asyncio.Future] = {}  # queued or sent, awaiting a response
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._batch_tasks: Set[asyncio.Task] = set()
+        self.coalesced_texts = 0
 
     async def generate(self, text: str) -> List[float]:
         """
@@ -32,45 +74,132 @@ class EmbeddingService:
         """
         Generate embeddings for multiple texts in batch.
 
+        Cached texts are served from the embedding cache; the remaining unique
+        texts are queued for the next coalesced API request.
+
         Args:
             texts: List of input texts to embed
 
         Returns:
             List of embedding vectors
         """
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-
-        payload = {
-            "model": self.model,
-            "input": texts
-        }
-
-        response = await self.client.post(
-            f"{self.base_url}/embeddings",
-            headers=headers,
-            json=payload
-        )
-        response.raise_for_status()
-
-        data = response.json()
-        embeddings = [item["embedding"] for item in data["data"]]
+        embeddings = await self.cache.aget_many(self.model, texts)
+
+        missing = list(dict.fromkeys(
+            text for text, embedding in zip(texts, embeddings) if embedding is None
+        ))
+        if missing:
+            futures = [self._enqueue(text) for text in missing]
+            # shield: a cancelled caller must not cancel a result other callers share
+            fetched = await asyncio.gather(*(asyncio.shield(future) for future in futures))
+
+            by_text = dict(zip(missing, fetched))
+            embeddings = [
+                embedding if embedding is not None else list(by_text[text])
+                for text, embedding in zip(texts, embeddings)
+            ]
+
         return embeddings
 
+    def _enqueue(self, text: str) -> asyncio.Future:
+        """
+        Get the pending result for a text, queueing it for the next batch if needed.
+
+        Args:
+            text: Uncached input text
+
+        Returns:
+            Future resolved with the embedding when its batch completes
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Futures cannot cross event loops (e.g. successive asyncio.run calls)
+            self._loop = loop
+            self._pending = {}
+            self._in_flight = {}
+            self._flush_handle = None
+
+        future = self._in_flight.get(text)
+        if future is not None:
+            self.coalesced_texts += 1
+            return future
+
+        future = loop.create_future()
+        self._in_flight[text] = future
+        self._pending[text] = future
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self._flush)
+        return future
+
+    def _flush(self) -> None:
+        """Send all queued texts as one batch."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, {}
+        task = self._loop.create_task(self._send_batch(batch))
+        self._batch_tasks.add(task)
+        task.add_done_callback(self._batch_tasks.discard)
+
+    async def _send_batch(self, batch: Dict[str, asyncio.Future]) -> None:
+        """Embed one batch and resolve its futures."""
+        texts = list(batch)
+        try:
+            started = time.time()
+            embeddings = await self._request_embeddings(texts)
+            self.cache.record_api_call(len(texts), time.time() - started)
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+                    # Mark retrieved: every waiter may have been cancelled
+                    future.exception()
+        else:
+            for text, embedding in zip(texts, embeddings):
+                future = batch[text]
+                if not future.done():
+                    future.set_result(embedding)
+            # Waiters are resolved first; the memory tier is updated before the
+            # first await, the SQLite write runs in a worker thread
+            await self.cache.aput_many(self.model, texts, embeddings)
+        finally:
+            for text, future in batch.items():
+                if self._in_flight.get(text) is future:
+                    del self._in_flight[text]
+
+    async def _request_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed texts with the backend (no caching).
+
+        Args:
+            texts: List of input texts to embed
+
+        Returns:
+            List of embedding vectors
+        """
+        return await self.backend.embed(texts)
+
     async def close(self):
-        """Close the HTTP client."""
-        await self.client.aclose()
+        """Release backend resources (HTTP client)."""
+        await self.backend.close()
 
 
 # Global embedding service instance
 _embedding_service: Optional[EmbeddingService] = None
+_embedding_service_lock = threading.Lock()
 
 
 def get_embedding_service() -> EmbeddingService:
-    """Get or create the global embedding service instance."""
+    """Get or create the global embedding service instance (shared so requests coalesce)."""
     global _embedding_service
     if _embedding_service is None:
-        _embedding_service = EmbeddingService()
+        with _embedding_service_lock:
+            if _embedding_service is None:
+                _embedding_service = EmbeddingService()
     return _embedding_service
@@ -5,8 +5,13 @@ Loads skills from the filesystem (skills/ folder) instead of database.
 Each skill is a folder containing:
 - skill.md: The prompt template
 - config.json: Configuration (tools, model, metadata)
+
+Embeddings of skill.md are computed by ensure_embeddings() (batched) and persisted
+in skills/.embeddings.json, keyed by the SHA-256 of the prompt and tagged with the
+embedding model, so unchanged skills are never re-embedded.
 """
 
+import hashlib
 import json
 import os
 from pathlib import Path
@@ -17,6 +22,10 @@ from src.infrastructure.database.models import Skill
 from src.core.memory.embedding_service import EmbeddingService
 
 
+# Embedding sidecar file inside the skills folder
+EMBEDDINGS_SIDECAR = ".embeddings.json"
+
+
 @dataclass
 class SkillConfig:
     """Skill configuration from config.json"""
@@ -29,6 +38,7 @@ class SkillConfig:
     enabled: bool = True
     workspace: Optional[Dict[str, Any]] = None
     metadata: Optional[Dict[str, Any]] = None
+    visualizations: Optional[Dict[str, Any]] = None
 
 
 class FileSystemSkillLoader:
@@ -41,6 +51,10 @@ class FileSystemSkillLoader:
     ):
         self.skills_path = Path(skills_path)
         self.embedding_service = embedding_service
+        self.sidecar_path = self.skills_path / EMBEDDINGS_SIDECAR
+
+        self._sidecar: Optional[Dict[str, Any]] = None
+        self._sidecar_mtime: Optional[int] = None
 
     def load_all_skills(self) -> List[Skill]:
         """Load all skills from filesystem"""
@@ -91,9 +105,8 @@ class FileSystemSkillLoader:
 
     def _create_skill_object(self, config: SkillConfig, prompt_template: str) -> Skill:
         """Create a Skill object from config and prompt"""
-        # Skip embedding generation for now (not needed for fixed skill mode)
-        # TODO: Add async version if embedding is needed
-        embedding = None
+        # Embedding from the sidecar (None until ensure_embeddings() has run)
+        embedding = self._cached_embedding(prompt_template)
 
         # Create Skill object (matches database model structure)
         skill = Skill(
@@ -112,6 +125,84 @@ class FileSystemSkillLoader:
 
         return skill
 
+    @staticmethod
+    def content_hash(prompt_template: str) -> str:
+        """Sidecar key for a prompt template"""
+        return hashlib.sha256(prompt_template.encode("utf-8")).hexdigest()
+
+    def _load_sidecar(self) -> Dict[str, Any]:
+        """Read the embedding sidecar (re-read only when its mtime changes)"""
+        try:
+            mtime = self.sidecar_path.stat().st_mtime_ns
+        except OSError:
+            return {}
+
+        if self._sidecar is None or mtime != self._sidecar_mtime:
+            try:
+                with open(self.sidecar_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = {}
+            self._sidecar = data if isinstance(data, dict) else {}
+            self._sidecar_mtime = mtime
+        return self._sidecar
+
+    def _cached_embedding(self, prompt_template: str) -> Optional[List[float]]:
+        """Look up a prompt's embedding in the sidecar (must match the current model)"""
+        if self.embedding_service is None:
+            return None
+
+        data = self._load_sidecar()
+        if data.get("model") != self.embedding_service.model:
+            return None
+        entry = data.get("embeddings", {}).get(self.content_hash(prompt_template))
+        return entry["embedding"] if entry else None
+
+    def _write_sidecar(self, data: Dict[str, Any]) -> None:
+        """Write the sidecar atomically"""
+        tmp_path = self.sidecar_path.with_name(f"{EMBEDDINGS_SIDECAR}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.sidecar_path)
+        self._sidecar = data
+        self._sidecar_mtime = self.sidecar_path.stat().st_mtime_ns
+
+    async def ensure_embeddings(self) -> Dict[str, int]:
+        """
+        Compute embeddings for filesystem skills that are not in the sidecar yet.
+
+        All missing skill.md prompts are embedded in one batch. Entries of removed
+        or edited skills (and of a previous embedding model) are dropped.
+
+        Returns:
+            {"cached": skills already embedded, "embedded": skills embedded now}
+        """
+        if self.embedding_service is None or not self.skills_path.exists():
+            return {"cached": 0, "embedded": 0}
+
+        model = self.embedding_service.model
+        data = self._load_sidecar()
+        entries = dict(data.get("embeddings", {})) if data.get("model") == model else {}
+
+        current = {self.content_hash(skill.prompt_template): skill for skill in self.load_all_skills()}
+        missing = [digest for digest in current if digest not in entries]
+
+        if missing:
+            embeddings = await self.embedding_service.generate_batch(
+                [current[digest].prompt_template for digest in missing]
+            )
+            for digest, embedding in zip(missing, embeddings):
+                entries[digest] = {
+                    "skill_id": current[digest].id,
+                    "embedding": [float(v) for v in embedding]
+                }
+
+        kept = {digest: entries[digest] for digest in current}
+        if missing or data.get("model") != model or len(kept) != len(data.get("embeddings", {})):
+            self._write_sidecar({"model": model, "embeddings": kept})
+
+        return {"cached": len(current) - len(missing), "embedded": len(missing)}
+
     def list_skill_ids(self) -> List[str]:
         """List all available skill IDs in filesystem"""
         if not self.skills_path.exists():
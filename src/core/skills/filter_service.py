@@ -1,18 +1,25 @@
 """
 Filter Service - 使用 LLM 过滤 skills 和 facts
 """
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import json
+import time
 
 from src.infrastructure.llm.deepseek_client import DeepSeekClient
+from src.core.skills.selection_cache import get_skill_selection_cache, candidate_key
 
 
 class FilterService:
     """过滤服务 - 使用 LLM 过滤候选的 skills 和 facts"""
 
-    def __init__(self):
+    def __init__(self, use_cache: bool = True):
+        """
+        Args:
+            use_cache: 是否复用相同/相近请求的选择结果（见 selection_cache）
+        """
         self.llm_client = DeepSeekClient(use_reasoner=False)
         self.filter_schema = self._build_filter_schema()
+        self.cache = get_skill_selection_cache() if use_cache else None
 
     def _build_filter_schema(self) -> Dict[str, Any]:
         """构建过滤 LLM 的 function calling schema"""
@@ -47,15 +54,21 @@ class FilterService:
         self,
         user_query: str,
         candidate_skills: List[Dict],
-        candidate_facts: List[Dict]
+        candidate_facts: List[Dict],
+        query_embedding: Optional[List[float]] = None,
+        tracker=None
     ) -> Dict[str, Any]:
         """
         使用 LLM 过滤候选的 skills 和 facts
 
+        先查技能选择缓存（精确匹配 / 语义匹配），未命中时再调用 LLM
+
         Args:
             user_query: 用户输入
             candidate_skills: 候选技能列表
             candidate_facts: 候选记忆列表
+            query_embedding: 用户输入的 embedding（用于语义匹配，可选）
+            tracker: 性能追踪器（记录缓存命中情况，可选）
 
         Returns:
             {
@@ -64,6 +77,19 @@ class FilterService:
                 "reasoning": "..."
             }
         """
+        candidates = candidate_key(candidate_skills, candidate_facts)
+        if self.cache is not None:
+            cached = self.cache.lookup(user_query, candidates, query_embedding)
+            if tracker is not None:
+                tracker.record_cache(
+                    "技能选择",
+                    hit=cached is not None,
+                    tier=cached[1] if cached else None,
+                    saved_seconds=cached[2] if cached else 0.0
+                )
+            if cached is not None:
+                return cached[0]
+
         # 构建过滤 prompt
         filter_prompt = self._build_filter_prompt(
             user_query,
@@ -72,6 +98,7 @@ class FilterService:
         )
 
         # 调用 LLM
+        started = time.time()
         response = await self.llm_client.chat_completion(
             messages=[{"role": "user", "content": filter_prompt}],
             tools=[self.filter_schema],
@@ -84,6 +111,13 @@ class FilterService:
             return {"skill_id": "", "fact_ids": [], "reasoning": "No tool call"}
 
         arguments = json.loads(tool_calls[0].function.arguments)
+
+        if self.cache is not None:
+            self.cache.store(
+                user_query, candidates, arguments,
+                embedding=query_embedding,
+                latency=time.time() - started
+            )
         return arguments
 
     def _build_filter_prompt(
@@ -0,0 +1,228 @@
+"""
+技能选择缓存 - 复用 FilterService 的 LLM 选择结果
+
+每条非固定技能的消息都要调用一次 DeepSeek，只为从 ≤3 个候选技能中选出一个。
+相同或相近的请求面对同一组候选时，选择结果几乎总是一样的。缓存分两层：
+
+1. 精确匹配：规范化后的查询文本 + 候选集合完全相同
+2. 语义匹配：候选集合相同，且查询 embedding 与某条缓存的余弦相似度不低于阈值
+
+候选集合的 key 包含技能 ID 和技能内容的哈希，技能被修改后旧结果自动失效。
+
+配置（环境变量）：
+- SKILL_SELECTION_CACHE_SIZE: 最多缓存的选择结果数，默认 512
+- SKILL_SELECTION_CACHE_TTL: 缓存有效期（秒），默认 3600
+- SKILL_SELECTION_CACHE_SIMILARITY: 语义匹配的余弦相似度阈值，默认 0.95；设为 0 以下或大于 1 关闭语义匹配
+"""
+import copy
+import hashlib
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+SKILL_SELECTION_CACHE_SIZE = int(os.getenv("SKILL_SELECTION_CACHE_SIZE", "512"))
+SKILL_SELECTION_CACHE_TTL = float(os.getenv("SKILL_SELECTION_CACHE_TTL", "3600"))
+SKILL_SELECTION_CACHE_SIMILARITY = float(os.getenv("SKILL_SELECTION_CACHE_SIMILARITY", "0.95"))
+
+# 命中层级
+TIER_EXACT = "exact"
+TIER_SEMANTIC = "semantic"
+
+# 查询末尾可忽略的标点
+_TRAILING_PUNCTUATION = "。.!！?？~～ "
+
+
+def normalize_query(query: str) -> str:
+    """规范化查询：全角转半角、小写、合并空白、去掉末尾标点"""
+    text = unicodedata.normalize("NFKC", query).lower()
+    text = re.sub(r"\s+", " ", text).strip()
+    return text.rstrip(_TRAILING_PUNCTUATION)
+
+
+def candidate_key(candidate_skills: List[Dict], candidate_facts: List[Dict]) -> str:
+    """候选集合的 key：技能 ID + 内容哈希、记忆 ID，与顺序无关"""
+    parts = sorted(
+        f"{skill['id']}:{skill.get('name', '')}:{skill.get('prompt_template', '')}"
+        for skill in candidate_skills
+    )
+    parts.extend(sorted(f"fact:{fact.get('fact_id')}" for fact in candidate_facts))
+    return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+@dataclass
+class SelectionEntry:
+    """一条缓存的选择结果"""
+    result: Dict[str, Any]
+    candidates: str
+    embedding: Optional[np.ndarray]  # 归一化后的查询向量
+    latency: float                   # 原始 LLM 调用耗时（命中时即为节省的时间）
+    created_at: float
+
+
+class SkillSelectionCache:
+    """技能选择结果的两层缓存（LRU + TTL，线程安全）"""
+
+    def __init__(
+        self,
+        max_entries: int = SKILL_SELECTION_CACHE_SIZE,
+        ttl: float = SKILL_SELECTION_CACHE_TTL,
+        similarity_threshold: float = SKILL_SELECTION_CACHE_SIMILARITY
+    ):
+        """
+        Args:
+            max_entries: 最多缓存的选择结果数
+            ttl: 缓存有效期（秒）
+            similarity_threshold: 语义匹配的余弦相似度阈值
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+
+        self._entries: "OrderedDict[Tuple[str, str], SelectionEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+
+    @staticmethod
+    def _normalize_embedding(embedding: Optional[List[float]]) -> Optional[np.ndarray]:
+        if embedding is None:
+            return None
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else None
+
+    def _expired(self, entry: SelectionEntry, now: float) -> bool:
+        return self.ttl > 0 and now - entry.created_at > self.ttl
+
+    def lookup(
+        self,
+        query: str,
+        candidates: str,
+        embedding: Optional[List[float]] = None
+    ) -> Optional[Tuple[Dict[str, Any], str, float]]:
+        """
+        查找缓存的选择结果
+
+        Args:
+            query: 用户查询
+            candidates: candidate_key() 生成的候选集合 key
+            embedding: 查询向量（可选，用于语义匹配）
+
+        Returns:
+            (选择结果副本, 命中层级, 节省的耗时)，未命中时返回 None
+        """
+        now = time.time()
+        key = (normalize_query(query), candidates)
+
+        with self._lock:
+            # 1. 精确匹配
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry, now):
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.exact_hits += 1
+                self.saved_seconds += entry.latency
+                return copy.deepcopy(entry.result), TIER_EXACT, entry.latency
+
+            # 2. 语义匹配（只在候选集合相同的条目中查找）
+            vector = self._normalize_embedding(embedding)
+            if vector is not None and 0 < self.similarity_threshold <= 1:
+                best_key, best_score = None, self.similarity_threshold
+                for entry_key, entry in self._entries.items():
+                    if entry.candidates != candidates or entry.embedding is None:
+                        continue
+                    if entry.embedding.shape != vector.shape or self._expired(entry, now):
+                        continue
+                    score = float(entry.embedding @ vector)
+                    if score >= best_score:
+                        best_key, best_score = entry_key, score
+
+                if best_key is not None:
+                    entry = self._entries[best_key]
+                    self._entries.move_to_end(best_key)
+                    self.semantic_hits += 1
+                    self.saved_seconds += entry.latency
+                    return copy.deepcopy(entry.result), TIER_SEMANTIC, entry.latency
+
+            self.misses += 1
+            return None
+
+    def store(
+        self,
+        query: str,
+        candidates: str,
+        result: Dict[str, Any],
+        embedding: Optional[List[float]] = None,
+        latency: float = 0.0
+    ) -> None:
+        """
+        缓存一次 LLM 选择结果
+
+        Args:
+            query: 用户查询
+            candidates: 候选集合 key
+            result: 选择结果
+            embedding: 查询向量
+            latency: LLM 调用耗时
+        """
+        key = (normalize_query(query), candidates)
+        entry = SelectionEntry(
+            result=copy.deepcopy(result),
+            candidates=candidates,
+            embedding=self._normalize_embedding(embedding),
+            latency=latency,
+            created_at=time.time()
+        )
+
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """清空缓存（技能变更后调用）"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        with self._lock:
+            hits = self.exact_hits + self.semantic_hits
+            total = hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "exact_hits": self.exact_hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / total, 4) if total else 0.0,
+                "saved_seconds": round(self.saved_seconds, 3)
+            }
+
+
+# 全局技能选择缓存实例
+_selection_cache: Optional[SkillSelectionCache] = None
+_selection_cache_lock = threading.Lock()
+
+
+def get_skill_selection_cache() -> SkillSelectionCache:
+    """获取全局技能选择缓存实例"""
+    global _selection_cache
+    if _selection_cache is None:
+        with _selection_cache_lock:
+            if _selection_cache is None:
+                _selection_cache = SkillSelectionCache()
+    return _selection_cache
@@ -0,0 +1,84 @@
+"""
+技能选择策略 - 向量检索置信度足够高时跳过 LLM 过滤
+
+retrieve_skills 已经返回每个候选技能与查询的余弦相似度。当排名第一的技能：
+1. 相似度不低于 min_similarity，且
+2. 比第二名高出至少 min_margin（只有一个候选时只看第 1 条）
+就直接选择它，不再调用 FilterService；否则仍交给 LLM 选择。
+
+阈值可通过环境变量调整，scripts/calibrate_skill_fastpath.py 可以在标注查询集上
+评估不同阈值下的准确率和延迟：
+- SKILL_FASTPATH_ENABLED: 是否启用快速选择，默认启用
+- SKILL_FASTPATH_MIN_SIMILARITY: 第一名的最低相似度，默认 0.75
+- SKILL_FASTPATH_MIN_MARGIN: 第一名领先第二名的最小差值，默认 0.08
+"""
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+
+SKILL_FASTPATH_ENABLED = os.getenv("SKILL_FASTPATH_ENABLED", "1").lower() in ("1", "true", "yes")
+SKILL_FASTPATH_MIN_SIMILARITY = float(os.getenv("SKILL_FASTPATH_MIN_SIMILARITY", "0.75"))
+SKILL_FASTPATH_MIN_MARGIN = float(os.getenv("SKILL_FASTPATH_MIN_MARGIN", "0.08"))
+
+
+@dataclass
+class FastPathPolicy:
+    """基于检索相似度的技能快速选择策略"""
+    min_similarity: float = SKILL_FASTPATH_MIN_SIMILARITY
+    min_margin: float = SKILL_FASTPATH_MIN_MARGIN
+    enabled: bool = SKILL_FASTPATH_ENABLED
+
+    def decide(self, candidate_skills: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        判断能否直接选择技能
+
+        Args:
+            candidate_skills: retrieve_skills 返回的候选技能（含 similarity）
+
+        Returns:
+            与 FilterService 相同格式的选择结果；需要 LLM 选择时返回 None
+        """
+        if not self.enabled or not candidate_skills:
+            return None
+
+        ranked = sorted(
+            (skill for skill in candidate_skills if skill.get("similarity") is not None),
+            key=lambda skill: skill["similarity"],
+            reverse=True
+        )
+        if not ranked:
+            return None
+
+        top = ranked[0]
+        top_score = float(top["similarity"])
+        runner_up = float(ranked[1]["similarity"]) if len(ranked) > 1 else None
+        margin = top_score - runner_up if runner_up is not None else None
+
+        if top_score < self.min_similarity:
+            return None
+        if margin is not None and margin < self.min_margin:
+            return None
+
+        reasoning = f"向量检索快速选择（相似度 {top_score:.3f}"
+        if margin is not None:
+            reasoning += f"，领先第二名 {margin:.3f}"
+        reasoning += "）"
+
+        return {
+            "skill_id": top["id"],
+            "fact_ids": [],
+            "reasoning": reasoning
+        }
+
+
+# 全局策略实例
+_fastpath_policy: Optional[FastPathPolicy] = None
+
+
+def get_fastpath_policy() -> FastPathPolicy:
+    """获取全局技能快速选择策略"""
+    global _fastpath_policy
+    if _fastpath_policy is None:
+        _fastpath_policy = FastPathPolicy()
+    return _fastpath_policy
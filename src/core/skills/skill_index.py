@@ -0,0 +1,223 @@
+"""
+技能向量索引 - 进程内的技能检索
+
+技能只有少量几条，每条消息都向 pgvector 发一次 ORDER BY embedding <=> :query_embedding
+查询（还要把 1024 维向量序列化成字符串）并不划算。SkillIndex 把所有带 embedding 的技能
+一次性加载成归一化的 NumPy 矩阵，检索就是一次矩阵乘法 + top-k。
+
+数据来源：数据库 skills 表中 embedding 非空的行，以及文件系统技能（加载前先用
+FileSystemSkillLoader.ensure_embeddings() 补齐 embedding；同 ID 时文件系统优先，
+与 get_skill_by_id 一致）。
+
+刷新时机：
+1. 本进程通过 SkillService 创建/更新/同步技能时调用 invalidate()
+2. 文件系统技能（skill.md / config.json）的 mtime 或大小变化，每次检索时 stat 检查
+3. 距上次检查超过 SKILL_INDEX_TTL 秒时，用一条轻量查询（行数 + 最大 updated_at）
+   检查数据库是否被其他进程修改，只在变化时重新加载
+
+配置（环境变量）：
+- SKILL_INDEX_ENABLED: 是否启用进程内索引，默认启用（关闭后回退到 pgvector 查询）
+- SKILL_INDEX_TTL: 数据库变化检查间隔（秒），默认 60
+"""
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.infrastructure.database.models import Skill
+
+
+SKILL_INDEX_ENABLED = os.getenv("SKILL_INDEX_ENABLED", "1").lower() in ("1", "true", "yes")
+SKILL_INDEX_TTL = float(os.getenv("SKILL_INDEX_TTL", "60"))
+
+# 文件系统技能中参与签名的文件
+_SKILL_FILES = ("config.json", "skill.md")
+
+
+class SkillIndex:
+    """技能 embedding 的进程内索引（归一化矩阵 + 余弦 top-k）"""
+
+    def __init__(self, ttl: float = SKILL_INDEX_TTL):
+        """
+        Args:
+            ttl: 数据库变化检查间隔（秒）
+        """
+        self.ttl = ttl
+
+        self._rows: List[Dict[str, Any]] = []
+        self._matrix: Optional[np.ndarray] = None
+        self._loaded = False
+        self._db_fingerprint: Optional[Tuple] = None
+        self._fs_signature: Optional[Tuple] = None
+        self._checked_at = 0.0
+        self._embed_failed = False
+
+        self.loads = 0
+
+    def invalidate(self) -> None:
+        """标记索引失效，下次检索时重新加载"""
+        self._loaded = False
+
+    @staticmethod
+    def _filesystem_signature(fs_loader) -> Optional[Tuple]:
+        """文件系统技能的签名：各技能文件的 (路径, mtime, 大小)"""
+        if fs_loader is None or not fs_loader.skills_path.exists():
+            return None
+
+        signature = []
+        for skill_dir in sorted(fs_loader.skills_path.iterdir()):
+            if not skill_dir.is_dir():
+                continue
+            for name in _SKILL_FILES:
+                path = skill_dir / name
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                signature.append((str(path), stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    @staticmethod
+    async def _fetch_db_fingerprint(db: AsyncSession) -> Tuple:
+        """数据库技能的指纹：带 embedding 的行数 + 最大 updated_at"""
+        result = await db.execute(
+            select(func.count(Skill.id), func.max(Skill.updated_at))
+            .where(Skill.embedding.isnot(None))
+        )
+        return tuple(result.one())
+
+    async def _load(self, db: AsyncSession, fs_loader) -> None:
+        """从数据库和文件系统加载技能 embedding"""
+        result = await db.execute(
+            select(Skill.id, Skill.name, Skill.prompt_template, Skill.tool_set, Skill.embedding)
+            .where(Skill.embedding.isnot(None))
+        )
+        entries: Dict[str, Tuple[Dict[str, Any], Any]] = {}
+        for row in result:
+            entries[row.id] = (
+                {"id": row.id, "name": row.name, "prompt_template": row.prompt_template, "tool_set": row.tool_set},
+                row.embedding
+            )
+
+        # 文件系统技能覆盖同 ID 的数据库技能
+        if fs_loader is not None:
+            try:
+                await fs_loader.ensure_embeddings()
+            except Exception as e:
+                # 已有 embedding 的技能照常检索；清空指纹，TTL 到期后重试
+                print(f"Warning: Failed to embed filesystem skills: {e}")
+                self._embed_failed = True
+            for skill in fs_loader.load_all_skills():
+                if skill.embedding is not None:
+                    entries[skill.id] = (
+                        {"id": skill.id, "name": skill.name, "prompt_template": skill.prompt_template, "tool_set": skill.tool_set},
+                        skill.embedding
+                    )
+
+        rows, vectors = [], []
+        for row, embedding in entries.values():
+            vector = np.asarray(embedding, dtype=np.float32)
+            if vectors and vector.shape != vectors[0].shape:
+                print(f"Warning: skill {row['id']} embedding has dimension {vector.shape}, skipped")
+                continue
+            rows.append(row)
+            vectors.append(vector)
+
+        if vectors:
+            matrix = np.vstack(vectors)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            matrix = matrix / np.maximum(norms, 1e-12)
+        else:
+            matrix = None
+
+        self._rows = rows
+        self._matrix = matrix
+        self.loads += 1
+
+    async def _ensure_fresh(self, db: AsyncSession, fs_loader) -> None:
+        """按需刷新索引"""
+        fs_signature = self._filesystem_signature(fs_loader)
+        now = time.time()
+        if self._loaded and fs_signature == self._fs_signature and now - self._checked_at < self.ttl:
+            return
+
+        fingerprint = await self._fetch_db_fingerprint(db)
+        self._checked_at = now
+        if self._loaded and fs_signature == self._fs_signature and fingerprint == self._db_fingerprint:
+            return
+
+        self._embed_failed = False
+        await self._load(db, fs_loader)
+        self._db_fingerprint = None if self._embed_failed else fingerprint
+        self._fs_signature = fs_signature
+        self._loaded = True
+
+    async def search(
+        self,
+        db: AsyncSession,
+        query_embedding: List[float],
+        top_k: int = 3,
+        fs_loader=None
+    ) -> List[Dict[str, Any]]:
+        """
+        检索与查询最相似的技能
+
+        Args:
+            db: 数据库会话（仅在需要刷新时使用）
+            query_embedding: 查询的 embedding 向量
+            top_k: 返回结果数量
+            fs_loader: 文件系统技能加载器（可选）
+
+        Returns:
+            技能列表，每个技能包含 id, name, prompt_template, tool_set, similarity（按相似度降序）
+        """
+        await self._ensure_fresh(db, fs_loader)
+
+        matrix = self._matrix
+        if matrix is None or top_k <= 0:
+            return []
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        if query.shape != (matrix.shape[1],):
+            raise ValueError(f"Query embedding has dimension {query.shape}, expected {matrix.shape[1]}")
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return []
+
+        scores = matrix @ (query / norm)
+        k = min(top_k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        rows = self._rows
+        return [
+            {**rows[i], "tool_set": list(rows[i]["tool_set"] or []), "similarity": float(scores[i])}
+            for i in top
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        """获取索引统计信息"""
+        return {
+            "skills": len(self._rows),
+            "dimension": int(self._matrix.shape[1]) if self._matrix is not None else 0,
+            "loads": self.loads
+        }
+
+
+# 全局技能索引实例
+_skill_index: Optional[SkillIndex] = None
+_skill_index_lock = threading.Lock()
+
+
+def get_skill_index() -> SkillIndex:
+    """获取全局技能索引实例"""
+    global _skill_index
+    if _skill_index is None:
+        with _skill_index_lock:
+            if _skill_index is None:
+                _skill_index = SkillIndex()
+    return _skill_index
@@ -6,8 +6,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, text
 
 from src.infrastructure.database.models import Skill
-from src.core.memory.embedding_service import EmbeddingService
+from src.core.memory.embedding_service import get_embedding_service
 from src.core.skills.filesystem_skill_loader import FileSystemSkillLoader
+from src.core.skills.skill_index import SKILL_INDEX_ENABLED, get_skill_index
 
 
 class SkillService:
@@ -20,7 +21,7 @@ class SkillService:
         skills_path: str = "skills"
     ):
         self.db = db
-        self.embedding_service = EmbeddingService()
+        self.embedding_service = get_embedding_service()
         self.enable_filesystem = enable_filesystem
 
         # Initialize filesystem loader if enabled
@@ -46,6 +47,15 @@ class SkillService:
         Returns:
             技能列表，每个技能包含 id, name, prompt_template
         """
+        # 进程内索引：不经过数据库，也不需要把向量序列化成字符串
+        if SKILL_INDEX_ENABLED:
+            return await get_skill_index().search(
+                self.db,
+                query_embedding,
+                top_k=top_k,
+                fs_loader=self.fs_loader
+            )
+
         # 使用向量相似度检索
         query = text("""
             SELECT
@@ -136,6 +146,7 @@ class SkillService:
         self.db.add(skill)
         await self.db.commit()
         await self.db.refresh(skill)
+        get_skill_index().invalidate()
 
         return skill
 
@@ -159,7 +170,7 @@ class SkillService:
             return None
 
         # 重新生成 embedding
-        embedding = await self.embedding_service.embed(prompt_template)
+        embedding = await self.embedding_service.generate(prompt_template)
 
         # 更新
         skill.prompt_template = prompt_template
@@ -167,6 +178,7 @@ class SkillService:
 
         await self.db.commit()
         await self.db.refresh(skill)
+        get_skill_index().invalidate()
 
         return skill
 
@@ -180,4 +192,8 @@ class SkillService:
         if not self.enable_filesystem or not self.fs_loader:
             return {"error": "Filesystem loading is not enabled"}
 
-        return self.fs_loader.sync_to_database(self.db)
+        # 先补齐 embedding，同步到数据库的技能才能参与向量检索
+        await self.fs_loader.ensure_embeddings()
+        summary = self.fs_loader.sync_to_database(self.db)
+        get_skill_index().invalidate()
+        return summary
@@ -4,26 +4,130 @@
 功能：
 1. 注册工具（schema + function）
 2. 根据技能领域获取工具
-3. 执行工具调用
+3. 执行工具调用（同步工具在线程池/进程池中执行，不阻塞事件循环）
 4. 格式化工具可视化
 """
-from typing import Dict, Any, List, Optional, Callable
+import asyncio
+import functools
+import inspect
+import multiprocessing
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Callable, FrozenSet
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
+# 同步工具的执行方式
+EXECUTOR_INLINE = "inline"    # 直接在事件循环中执行（仅适用于极快的工具）
+EXECUTOR_THREAD = "thread"    # 线程池（IO 型工具，默认）
+EXECUTOR_PROCESS = "process"  # 进程池（CPU 密集且不依赖进程内缓存的工具，绕开 GIL）
+EXECUTOR_KINDS = (EXECUTOR_INLINE, EXECUTOR_THREAD, EXECUTOR_PROCESS)
+
+
+def _init_process_worker() -> None:
+    """进程池 worker 初始化：使用无界面的 Agg 后端"""
+    import os
+    os.environ.setdefault("MPLBACKEND", "Agg")
+
+
+@dataclass(frozen=True)
+class ToolDispatch:
+    """
+    工具的调度记录 - 注册时计算一次，执行时只需一次字典查找
+
+    Attributes:
+        function: 工具函数
+        needs_db: 是否需要注入 db 参数
+        is_async: 是否为协程函数
+        executor: 同步工具的执行方式
+        required_args: 必填参数名（不含 db）
+        accepted_args: 可接受的参数名（不含 db）
+        accepts_var_kwargs: 是否接受任意关键字参数（**kwargs）
+    """
+    function: Callable
+    needs_db: bool
+    is_async: bool
+    executor: str
+    required_args: FrozenSet[str]
+    accepted_args: FrozenSet[str]
+    accepts_var_kwargs: bool
+
+    @classmethod
+    def from_function(cls, function: Callable, executor: str) -> "ToolDispatch":
+        """解析函数签名，生成调度记录"""
+        parameters = inspect.signature(function).parameters
+        required_args = set()
+        accepted_args = set()
+        accepts_var_kwargs = False
+
+        for param_name, param in parameters.items():
+            if param_name == "db":
+                continue
+            if param.kind == inspect.Parameter.VAR_KEYWORD:
+                accepts_var_kwargs = True
+            elif param.kind in (inspect.Parameter.POSITIONAL_OR_KEYWORD, inspect.Parameter.KEYWORD_ONLY):
+                accepted_args.add(param_name)
+                if param.default is inspect.Parameter.empty:
+                    required_args.add(param_name)
+
+        return cls(
+            function=function,
+            needs_db="db" in parameters,
+            is_async=inspect.iscoroutinefunction(function),
+            executor=executor,
+            required_args=frozenset(required_args),
+            accepted_args=frozenset(accepted_args),
+            accepts_var_kwargs=accepts_var_kwargs
+        )
+
+    def validate(self, arguments: Dict[str, Any]) -> Optional[str]:
+        """
+        校验调用参数
+
+        Returns:
+            错误信息，参数合法时返回 None
+        """
+        missing = self.required_args.difference(arguments)
+        if missing:
+            return f"缺少必填参数: {', '.join(sorted(missing))}"
+
+        if not self.accepts_var_kwargs:
+            unknown = set(arguments).difference(self.accepted_args)
+            if unknown:
+                return f"未知参数: {', '.join(sorted(unknown))}"
+
+        return None
+
+
 class ToolRegistry:
     """工具注册表"""
 
-    def __init__(self):
-        # 工具存储: {tool_name: {schema, function, visualization}}
+    def __init__(self, max_thread_workers: int = 4, max_process_workers: int = 2):
+        """
+        初始化工具注册表
+
+        Args:
+            max_thread_workers: 执行同步（阻塞）工具的线程池大小
+            max_process_workers: 执行 CPU 密集型工具的进程池大小
+        """
+        # 工具存储: {tool_name: {schema, function, visualization, serial, dispatch}}
         self.tools: Dict[str, Dict[str, Any]] = {}
 
+        # 同步工具的执行池（延迟创建）
+        self.max_thread_workers = max_thread_workers
+        self.max_process_workers = max_process_workers
+        self._thread_executor: Optional[ThreadPoolExecutor] = None
+        self._process_executor: Optional[ProcessPoolExecutor] = None
+
     def register_tool(
         self,
         name: str,
         schema: Dict[str, Any],
         function: Callable,
-        visualization: Optional[Dict[str, Any]] = None
+        visualization: Optional[Dict[str, Any]] = None,
+        serial: bool = False,
+        executor: str = EXECUTOR_THREAD
     ) -> None:
         """
         注册工具
@@ -33,13 +137,89 @@ class ToolRegistry:
             schema: 工具 schema（用于 LLM function calling）
             function: 工具函数
             visualization: 可视化模板（可选）
+            serial: 是否必须串行执行（对顺序敏感的工具，如写文件）。
+                    需要 db 参数的工具共享同一个数据库会话，总是串行执行
+            executor: 同步工具的执行方式（inline / thread / process）。
+                      process 要求工具函数是模块级函数，参数和返回值可 pickle；
+                      协程工具忽略此参数
         """
+        if executor not in EXECUTOR_KINDS:
+            raise ValueError(f"不支持的 executor: {executor}（可选: {', '.join(EXECUTOR_KINDS)}）")
+
+        dispatch = ToolDispatch.from_function(function, executor)
+
         self.tools[name] = {
             "schema": schema,
             "function": function,
-            "visualization": visualization or {}
+            "visualization": visualization or {},
+            "serial": serial or dispatch.needs_db,
+            "dispatch": dispatch
         }
 
+    def is_serial(self, tool_name: str) -> bool:
+        """
+        判断工具是否必须串行执行
+
+        未注册的工具按串行处理，保证其错误结果的顺序稳定
+        """
+        tool = self.tools.get(tool_name)
+        return tool["serial"] if tool else True
+
+    def _get_thread_executor(self) -> ThreadPoolExecutor:
+        """获取同步工具的执行线程池"""
+        if self._thread_executor is None:
+            self._thread_executor = ThreadPoolExecutor(
+                max_workers=self.max_thread_workers,
+                thread_name_prefix="tool-worker"
+            )
+        return self._thread_executor
+
+    def _get_process_executor(self) -> ProcessPoolExecutor:
+        """获取 CPU 密集型工具的执行进程池"""
+        if self._process_executor is None:
+            # 使用 spawn：当前进程有事件循环和线程池，fork 不安全
+            self._process_executor = ProcessPoolExecutor(
+                max_workers=self.max_process_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_process_worker
+            )
+        return self._process_executor
+
+    def _get_executor(self, kind: str) -> Optional[Executor]:
+        """根据执行方式获取执行池，inline 返回 None"""
+        if kind == EXECUTOR_PROCESS:
+            return self._get_process_executor()
+        if kind == EXECUTOR_THREAD:
+            return self._get_thread_executor()
+        return None
+
+    def configure_executors(
+        self,
+        max_thread_workers: Optional[int] = None,
+        max_process_workers: Optional[int] = None
+    ) -> None:
+        """
+        调整执行池大小（已创建的执行池会被关闭，下次使用时按新配置重建）
+
+        Args:
+            max_thread_workers: 线程池大小
+            max_process_workers: 进程池大小
+        """
+        if max_thread_workers is not None:
+            self.max_thread_workers = max_thread_workers
+        if max_process_workers is not None:
+            self.max_process_workers = max_process_workers
+        self.shutdown()
+
+    def shutdown(self) -> None:
+        """关闭工具执行池"""
+        if self._thread_executor is not None:
+            self._thread_executor.shutdown(wait=False)
+            self._thread_executor = None
+        if self._process_executor is not None:
+            self._process_executor.shutdown(wait=False, cancel_futures=True)
+            self._process_executor = None
+
     def get_tools_by_names(self, tool_names: List[str]) -> List[Dict[str, Any]]:
         """
         根据工具名称列表获取工具 schemas
@@ -83,23 +263,42 @@ class ToolRegistry:
         Returns:
             工具执行结果
         """
-        if tool_name not in self.tools:
+        tool = self.tools.get(tool_name)
+        if tool is None:
             return {"error": f"Unknown tool: {tool_name}"}
 
-        tool_function = self.tools[tool_name]["function"]
+        dispatch: ToolDispatch = tool["dispatch"]
 
-        try:
-            # 检查工具函数是否需要 db 参数
-            import inspect
-            sig = inspect.signature(tool_function)
-            needs_db = 'db' in sig.parameters
+        error = dispatch.validate(kwargs)
+        if error:
+            return {"success": False, "error": error}
 
-            if needs_db:
-                result = await tool_function(db, **kwargs)
+        try:
+            if dispatch.needs_db:
+                # 数据库会话不能跨线程使用，需要 db 的工具总在事件循环中执行
+                if dispatch.is_async:
+                    result = await dispatch.function(db, **kwargs)
+                else:
+                    result = dispatch.function(db, **kwargs)
+            elif dispatch.is_async:
+                result = await dispatch.function(**kwargs)
             else:
-                result = await tool_function(**kwargs) if inspect.iscoroutinefunction(tool_function) else tool_function(**kwargs)
+                executor = self._get_executor(dispatch.executor)
+                if executor is None:
+                    result = dispatch.function(**kwargs)
+                else:
+                    # 同步工具放到执行池中运行，避免阻塞事件循环
+                    loop = asyncio.get_running_loop()
+                    result = await loop.run_in_executor(
+                        executor,
+                        functools.partial(dispatch.function, **kwargs)
+                    )
 
             return {"success": True, "data": result}
+        except BrokenProcessPool as e:
+            # worker 进程异常退出（如内存耗尽），丢弃进程池，下次调用时重建
+            self._process_executor = None
+            return {"success": False, "error": f"工具进程异常退出: {str(e)}"}
         except Exception as e:
             return {"success": False, "error": str(e)}
 
@@ -183,5 +382,9 @@ def get_tool_registry() -> ToolRegistry:
     """获取全局工具注册表实例"""
     global _tool_registry
     if _tool_registry is None:
-        _tool_registry = ToolRegistry()
+        from src.infrastructure.config import settings
+        _tool_registry = ToolRegistry(
+            max_thread_workers=settings.tool_thread_workers,
+            max_process_workers=settings.tool_process_workers
+        )
     return _tool_registry
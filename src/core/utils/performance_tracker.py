@@ -22,6 +22,28 @@ class Step:
     error: Optional[str] = None
 
 
+@dataclass
+class LLMCall:
+    """单次 LLM 调用的耗时"""
+    start_time: float
+    first_token_time: Optional[float] = None
+    end_time: Optional[float] = None
+
+    @property
+    def time_to_first_token(self) -> Optional[float]:
+        """首 token 延迟（从发出请求到收到第一个正文/思考/工具调用片段）"""
+        if self.first_token_time is None:
+            return None
+        return self.first_token_time - self.start_time
+
+    @property
+    def duration(self) -> Optional[float]:
+        """总耗时"""
+        if self.end_time is None:
+            return None
+        return self.end_time - self.start_time
+
+
 @dataclass
 class RequestBlock:
     """单个请求的完整追踪信息"""
@@ -38,6 +60,12 @@ class RequestBlock:
     error: Optional[str] = None
     # 上下文内容
     context_content: Optional[Dict[str, Any]] = None
+    # LLM 调用（agent loop 每轮一次）
+    llm_calls: List[LLMCall] = field(default_factory=list)
+    # 用户可见的首 token 延迟（从请求开始到第一次流式输出）
+    time_to_first_token: Optional[float] = None
+    # 缓存命中记录: [{"cache", "hit", "tier", "saved_seconds"}]
+    cache_events: List[Dict[str, Any]] = field(default_factory=list)
 
 
 class PerformanceTracker:
@@ -112,6 +140,54 @@ class PerformanceTracker:
                     del self._current_async_steps[name]
                 break
 
+    def start_llm_call(self) -> LLMCall:
+        """开始一次 LLM 调用"""
+        call = LLMCall(start_time=time.time())
+        self.block.llm_calls.append(call)
+        return call
+
+    def mark_first_token(self, call: LLMCall):
+        """记录 LLM 调用收到的第一个片段（每次调用只记录一次）"""
+        if call.first_token_time is not None:
+            return
+        call.first_token_time = time.time()
+        debug_print(f"⚡ [{self.request_id}] 首 token: {call.time_to_first_token:.2f}s")
+
+        if self.block.time_to_first_token is None:
+            self.block.time_to_first_token = call.first_token_time - self.block.start_time
+            debug_print(f"⚡ [{self.request_id}] 请求首 token: {self.block.time_to_first_token:.2f}s")
+
+    def end_llm_call(self, call: LLMCall):
+        """结束一次 LLM 调用"""
+        call.end_time = time.time()
+
+    def record_cache(
+        self,
+        cache: str,
+        hit: bool,
+        tier: Optional[str] = None,
+        saved_seconds: float = 0.0
+    ):
+        """
+        记录一次缓存查询
+
+        Args:
+            cache: 缓存名称
+            hit: 是否命中
+            tier: 命中层级（如 exact / semantic）
+            saved_seconds: 命中时节省的耗时
+        """
+        self.block.cache_events.append({
+            "cache": cache,
+            "hit": hit,
+            "tier": tier,
+            "saved_seconds": saved_seconds
+        })
+        if hit:
+            debug_print(f"💾 [{self.request_id}] {cache} 命中 ({tier})，节省 {saved_seconds:.2f}s")
+        else:
+            debug_print(f"💾 [{self.request_id}] {cache} 未命中")
+
     def get_progress(self) -> tuple[float, str]:
         """
         计算当前进度
@@ -168,6 +244,8 @@ class PerformanceTracker:
         status_icon = "❌" if error else "✅"
         debug_print(f"\n{status_icon} [{self.request_id}] 请求完成")
         debug_print(f"📊 总耗时: {self.block.total_duration:.2f}s")
+        if self.block.time_to_first_token is not None:
+            debug_print(f"⚡ 首 token: {self.block.time_to_first_token:.2f}s")
         debug_print(f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n")
 
     def get_summary(self) -> Dict[str, Any]:
@@ -195,6 +273,15 @@ class PerformanceTracker:
                 }
                 for s in self.block.async_steps
             ],
+            "llm_calls": [
+                {
+                    "time_to_first_token": c.time_to_first_token,
+                    "duration": c.duration
+                }
+                for c in self.block.llm_calls
+            ],
+            "time_to_first_token": self.block.time_to_first_token,
+            "cache_events": self.block.cache_events,
             "total_duration": self.block.total_duration,
             "response": self.block.response[:100] + "..." if self.block.response and len(self.block.response) > 100 else self.block.response
         }
@@ -204,6 +291,34 @@ class PerformanceTracker:
         """获取所有历史请求"""
         return cls._all_requests
 
+    @classmethod
+    def get_cache_stats(cls) -> Dict[str, Dict[str, Any]]:
+        """
+        汇总历史请求中各缓存的命中率和节省的耗时
+
+        Returns:
+            {缓存名称: {"hits", "misses", "hit_rate", "saved_seconds", "tiers": {层级: 命中数}}}
+        """
+        stats: Dict[str, Dict[str, Any]] = {}
+        for block in cls._all_requests:
+            for event in block.cache_events:
+                item = stats.setdefault(
+                    event["cache"],
+                    {"hits": 0, "misses": 0, "hit_rate": 0.0, "saved_seconds": 0.0, "tiers": {}}
+                )
+                if event["hit"]:
+                    item["hits"] += 1
+                    item["saved_seconds"] += event["saved_seconds"]
+                    item["tiers"][event["tier"]] = item["tiers"].get(event["tier"], 0) + 1
+                else:
+                    item["misses"] += 1
+
+        for item in stats.values():
+            total = item["hits"] + item["misses"]
+            item["hit_rate"] = round(item["hits"] / total, 4) if total else 0.0
+            item["saved_seconds"] = round(item["saved_seconds"], 3)
+        return stats
+
     @classmethod
     def get_active_requests(cls) -> List[RequestBlock]:
         """获取正在进行的请求"""
@@ -40,6 +40,20 @@ class Settings(BaseSettings):
         alias="DASHSCOPE_EMBEDDING_MODEL"
     )
 
+    # Embedding backend: "dashscope" (HTTP API) or "local" (sentence-transformers on CPU)
+    embedding_backend: str = Field(default="dashscope", alias="EMBEDDING_BACKEND")
+    # Must match the Vector(...) columns; local vectors are truncated/padded to fit
+    embedding_dimensions: int = Field(default=1024, alias="EMBEDDING_DIMENSIONS")
+    local_embedding_model: str = Field(
+        default="BAAI/bge-large-zh-v1.5",
+        alias="LOCAL_EMBEDDING_MODEL"
+    )
+    local_embedding_device: str = Field(default="cpu", alias="LOCAL_EMBEDDING_DEVICE")
+    local_embedding_batch_size: int = Field(default=32, alias="LOCAL_EMBEDDING_BATCH_SIZE")
+    local_embedding_onnx: bool = Field(default=False, alias="LOCAL_EMBEDDING_ONNX")
+    # Optional ONNX file inside the model repo, e.g. a quantized onnx/model_qint8_avx512_vnni.onnx
+    local_embedding_onnx_file: Optional[str] = Field(default=None, alias="LOCAL_EMBEDDING_ONNX_FILE")
+
     # Cost Skill - Vision Model API (Optional)
     vision_model_api_key: Optional[str] = Field(
         default=None,
@@ -54,6 +68,10 @@ class Settings(BaseSettings):
         alias="VISION_MODEL_NAME"
     )
 
+    # Tool execution pools (blocking tools run off the event loop)
+    tool_thread_workers: int = Field(default=4, alias="TOOL_THREAD_WORKERS")
+    tool_process_workers: int = Field(default=2, alias="TOOL_PROCESS_WORKERS")
+
     class Config:
         env_file = ".env"
         case_sensitive = False
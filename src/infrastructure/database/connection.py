@@ -23,6 +23,8 @@ async def init_db():
     async with engine.begin() as conn:
         # Create pgvector extension
         await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+        # Create pg_trgm extension (keyword / hybrid task search)
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
         # Create all tables
         await conn.run_sync(Base.metadata.create_all)
 
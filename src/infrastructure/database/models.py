@@ -11,7 +11,7 @@ from uuid import UUID, uuid4
 
 from sqlalchemy import (
     String, Text, Integer, Float, DateTime, ForeignKey,
-    CheckConstraint, Index, func, ARRAY
+    CheckConstraint, Index, func, text, ARRAY
 )
 from sqlalchemy.dialects.postgresql import UUID as PGUUID, JSONB
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
@@ -56,6 +56,13 @@ class Skill(Base):
     # Indexes
     __table_args__ = (
         Index("idx_skills_name", "name"),
+        # Approximate nearest-neighbour index for cosine search (see migrations/add_vector_indexes.sql)
+        Index(
+            "idx_skills_embedding_hnsw", "embedding",
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding": "vector_cosine_ops"},
+        ),
     )
 
 
@@ -112,6 +119,41 @@ class Task(Base):
         Index("idx_tasks_priority", "priority"),
         Index("idx_tasks_due_date", "due_date"),
         Index("idx_tasks_metadata", "metadata", postgresql_using="gin"),
+        # Keyset pagination of non-deleted tasks (TaskRepository.get_page*, see
+        # migrations/add_task_pagination_indexes.sql)
+        Index(
+            "idx_tasks_created_id", text("created_at DESC"), text("id DESC"),
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+        Index(
+            "idx_tasks_status_created_id", "status", text("created_at DESC"), text("id DESC"),
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+        Index(
+            "idx_tasks_priority_created_id", "priority", text("created_at DESC"), text("id DESC"),
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+        # Partial HNSW index: semantic search only looks at tasks that are not soft-deleted
+        Index(
+            "idx_tasks_embedding_hnsw", "embedding",
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding": "vector_cosine_ops"},
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+        # Trigram indexes for keyword / hybrid search (pg_trgm, see migrations/add_task_trigram_indexes.sql)
+        Index(
+            "idx_tasks_title_trgm", "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+        Index(
+            "idx_tasks_description_trgm", "description",
+            postgresql_using="gin",
+            postgresql_ops={"description": "gin_trgm_ops"},
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
     )
 
 
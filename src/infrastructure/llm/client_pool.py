@@ -0,0 +1,187 @@
+"""
+Process-wide pool of OpenAI-compatible LLM clients.
+
+Building an AsyncOpenAI / OpenAI client per message (or per call) also builds a
+fresh httpx connection pool, so every request paid for DNS, TCP and TLS setup.
+This pool hands out one client per (provider, base_url, api_key) and keeps its
+connections alive across requests:
+
+- HTTP/2 when the optional `h2` package is installed (httpx[http2]), so
+  concurrent requests to the same host share one connection
+- Tuned connection limits and keep-alive expiry (LLM_* environment variables)
+- Explicit lifecycle: `aclose()` closes every client at shutdown
+
+Async clients are bound to the event loop that created them; a client whose loop
+has been closed is transparently replaced.
+"""
+import asyncio
+import importlib.util
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+from dotenv import load_dotenv
+from openai import AsyncOpenAI, OpenAI
+
+load_dotenv()
+
+
+# Total request timeout (LLM responses, especially reasoning ones, can be slow)
+LLM_HTTP_TIMEOUT = float(os.getenv("LLM_HTTP_TIMEOUT", "300"))
+# Connection establishment timeout
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "10"))
+# Maximum concurrent connections per client
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+# Maximum idle connections kept alive per client
+LLM_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "10"))
+# Seconds an idle connection is kept before being closed
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "120"))
+# Use HTTP/2 when the h2 package is available
+LLM_HTTP2 = os.getenv("LLM_HTTP2", "1").lower() in ("1", "true", "yes")
+
+ClientKey = Tuple[str, str, str]
+
+
+def http2_enabled() -> bool:
+    """Whether pooled clients negotiate HTTP/2 (requires the optional h2 package)."""
+    return LLM_HTTP2 and importlib.util.find_spec("h2") is not None
+
+
+def _http_options(trust_env: bool) -> Dict:
+    """Shared httpx client options."""
+    return {
+        "http2": http2_enabled(),
+        "timeout": httpx.Timeout(LLM_HTTP_TIMEOUT, connect=LLM_CONNECT_TIMEOUT),
+        "limits": httpx.Limits(
+            max_connections=LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=LLM_KEEPALIVE_EXPIRY
+        ),
+        "trust_env": trust_env,
+        "follow_redirects": True
+    }
+
+
+class LLMClientPool:
+    """Shared LLM clients keyed by (provider, base_url, api_key)."""
+
+    def __init__(self):
+        # key -> (client, event loop it was created on)
+        self._async_clients: Dict[ClientKey, Tuple[AsyncOpenAI, Optional[asyncio.AbstractEventLoop]]] = {}
+        self._sync_clients: Dict[ClientKey, OpenAI] = {}
+        self._lock = threading.Lock()
+
+    def get_async_client(
+        self,
+        provider: str,
+        base_url: str,
+        api_key: Optional[str],
+        trust_env: bool = True
+    ) -> AsyncOpenAI:
+        """
+        Get the shared async client for a provider endpoint.
+
+        Args:
+            provider: Provider name (part of the cache key)
+            base_url: API base URL
+            api_key: API key
+            trust_env: Whether httpx reads proxy settings from the environment
+
+        Returns:
+            AsyncOpenAI client with a keep-alive connection pool
+        """
+        key = (provider, base_url, api_key or "")
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        with self._lock:
+            entry = self._async_clients.get(key)
+            if entry is not None:
+                client, client_loop = entry
+                if client_loop is None or not client_loop.is_closed():
+                    return client
+
+            client = AsyncOpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                http_client=httpx.AsyncClient(**_http_options(trust_env))
+            )
+            self._async_clients[key] = (client, loop)
+            return client
+
+    def get_sync_client(
+        self,
+        provider: str,
+        base_url: str,
+        api_key: Optional[str],
+        trust_env: bool = True
+    ) -> OpenAI:
+        """
+        Get the shared sync client for a provider endpoint (thread-safe).
+
+        Args:
+            provider: Provider name (part of the cache key)
+            base_url: API base URL
+            api_key: API key
+            trust_env: Whether httpx reads proxy settings from the environment
+
+        Returns:
+            OpenAI client with a keep-alive connection pool
+        """
+        key = (provider, base_url, api_key or "")
+        with self._lock:
+            client = self._sync_clients.get(key)
+            if client is None:
+                client = OpenAI(
+                    api_key=api_key,
+                    base_url=base_url,
+                    http_client=httpx.Client(**_http_options(trust_env))
+                )
+                self._sync_clients[key] = client
+            return client
+
+    async def aclose(self) -> None:
+        """Close every pooled client (call once at shutdown, inside the event loop)."""
+        with self._lock:
+            async_clients = list(self._async_clients.values())
+            sync_clients = list(self._sync_clients.values())
+            self._async_clients.clear()
+            self._sync_clients.clear()
+
+        for client, client_loop in async_clients:
+            if client_loop is not None and client_loop.is_closed():
+                continue
+            try:
+                await client.close()
+            except Exception:
+                pass
+
+        for client in sync_clients:
+            client.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Number of pooled clients."""
+        with self._lock:
+            return {
+                "async_clients": len(self._async_clients),
+                "sync_clients": len(self._sync_clients),
+                "http2": http2_enabled()
+            }
+
+
+# Global client pool
+_client_pool: Optional[LLMClientPool] = None
+_client_pool_lock = threading.Lock()
+
+
+def get_llm_client_pool() -> LLMClientPool:
+    """Get the global LLM client pool."""
+    global _client_pool
+    if _client_pool is None:
+        with _client_pool_lock:
+            if _client_pool is None:
+                _client_pool = LLMClientPool()
+    return _client_pool
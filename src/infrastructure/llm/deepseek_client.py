@@ -2,18 +2,19 @@
 DeepSeek API client for LLM interactions.
 """
 from typing import List, Dict, Any, Optional
-from openai import AsyncOpenAI
 from src.infrastructure.config import settings
+from src.infrastructure.llm.client_pool import get_llm_client_pool
 
 
 class DeepSeekClient:
     """Client for interacting with DeepSeek API."""
 
     def __init__(self, use_reasoner: bool = True):
-        """Initialize DeepSeek client using OpenAI-compatible API."""
-        self.client = AsyncOpenAI(
-            api_key=settings.deepseek_api_key,
-            base_url=settings.deepseek_base_url
+        """Initialize DeepSeek client using OpenAI-compatible API (shared connection pool)."""
+        self.client = get_llm_client_pool().get_async_client(
+            "deepseek",
+            base_url=settings.deepseek_base_url,
+            api_key=settings.deepseek_api_key
         )
         # Use reasoner model to see thinking process
         self.model = "deepseek-reasoner" if use_reasoner else "deepseek-chat"
@@ -6,10 +6,10 @@
 - Kimi (moonshot-v1-128k, kimi-k2.5)
 """
 from typing import List, Dict, Any, Optional
-from openai import AsyncOpenAI
 import os
 from dotenv import load_dotenv
-import httpx
+
+from src.infrastructure.llm.client_pool import get_llm_client_pool
 
 load_dotenv()
 
@@ -34,26 +34,23 @@ class UnifiedLLMClient:
         self.provider = provider
         self.use_reasoner = use_reasoner
 
-        # 根据 provider 初始化客户端
+        # 根据 provider 获取共享客户端（连接池在进程内复用，不随每条消息重建）
+        pool = get_llm_client_pool()
         if provider == "deepseek":
-            self.client = AsyncOpenAI(
-                api_key=os.getenv("DEEPSEEK_API_KEY"),
-                base_url=os.getenv("DEEPSEEK_BASE_URL", "https://api.deepseek.com")
+            self.client = pool.get_async_client(
+                provider,
+                base_url=os.getenv("DEEPSEEK_BASE_URL", "https://api.deepseek.com"),
+                api_key=os.getenv("DEEPSEEK_API_KEY")
             )
             self.model = model_name or ("deepseek-reasoner" if use_reasoner else "deepseek-chat")
             self.supports_vision = False
         
         elif provider == "moonshot":
-            # 创建不使用代理的 httpx 客户端
-            import httpx
-            http_client = httpx.AsyncClient(
-                timeout=300.0,
-                trust_env=False  # 不读取环境变量中的代理配置
-            )
-            self.client = AsyncOpenAI(
-                api_key=os.getenv("VISION_MODEL_API_KEY"),
+            self.client = pool.get_async_client(
+                provider,
                 base_url=os.getenv("VISION_MODEL_BASE_URL", "https://api.moonshot.cn/v1"),
-                http_client=http_client
+                api_key=os.getenv("VISION_MODEL_API_KEY"),
+                trust_env=False  # 不读取环境变量中的代理配置
             )
             self.model = model_name or os.getenv("VISION_MODEL_NAME", "kimi-k2.5")
             self.supports_vision = True
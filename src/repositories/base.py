@@ -1,10 +1,13 @@
 """
 Base repository pattern for database operations.
 """
-from typing import Generic, TypeVar, Type, Optional, List
+import base64
+import json
+from datetime import datetime
+from typing import Any, Generic, Sequence, TypeVar, Type, Optional, List, Tuple
 from uuid import UUID
 
-from sqlalchemy import select, update, delete
+from sqlalchemy import Select, select, update, delete, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.infrastructure.database.models import Base
@@ -12,6 +15,41 @@ from src.infrastructure.database.models import Base
 ModelType = TypeVar("ModelType", bound=Base)
 
 
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode the sort key of the last row of a page as an opaque cursor."""
+    payload = [value.isoformat() if isinstance(value, datetime) else str(value) for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence[Any]) -> List[Any]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Args:
+        cursor: Opaque cursor string
+        columns: Sort key columns (used to restore value types)
+
+    Raises:
+        ValueError: If the cursor is malformed or does not match the columns
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(payload, list) or len(payload) != len(columns):
+            raise ValueError
+        values = []
+        for column, value in zip(columns, payload):
+            python_type = column.type.python_type
+            if python_type is datetime:
+                values.append(datetime.fromisoformat(value))
+            elif python_type is UUID:
+                values.append(UUID(value))
+            else:
+                values.append(python_type(value))
+        return values
+    except (ValueError, TypeError, NotImplementedError):
+        raise ValueError(f"Invalid cursor: {cursor!r}") from None
+
+
 class BaseRepository(Generic[ModelType]):
     """Base repository with common CRUD operations."""
 
@@ -48,6 +86,54 @@ class BaseRepository(Generic[ModelType]):
         )
         return list(result.scalars().all())
 
+    async def paginate(
+        self,
+        stmt: Select,
+        columns: Sequence[Any],
+        limit: int,
+        cursor: Optional[str] = None,
+        descending: bool = False
+    ) -> Tuple[List[ModelType], Optional[str]]:
+        """
+        Keyset (cursor) pagination of a select.
+
+        Rows are ordered by `columns` (which must end with a unique column) and the
+        next page starts after the cursor with a row-value comparison, so deep pages
+        cost the same as the first one (no OFFSET scan).
+
+        Args:
+            stmt: Select of the model, with filters but without ORDER BY / LIMIT
+            columns: Sort key columns, e.g. (Task.created_at, Task.id)
+            limit: Page size
+            cursor: Cursor returned with the previous page (None for the first page)
+            descending: Sort newest/largest first
+
+        Returns:
+            (rows, next_cursor); next_cursor is None on the last page
+        """
+        if cursor:
+            key = tuple_(*columns)
+            values = tuple_(*decode_cursor(cursor, columns))
+            stmt = stmt.where(key < values if descending else key > values)
+
+        order = [column.desc() if descending else column.asc() for column in columns]
+        result = await self.db.execute(stmt.order_by(*order).limit(limit + 1))
+        rows = list(result.scalars().all())
+
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        last = rows[-1]
+        return rows, encode_cursor([getattr(last, column.key) for column in columns])
+
+    async def get_page(
+        self,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[ModelType], Optional[str]]:
+        """Get records ordered by primary key, one page at a time (see paginate)."""
+        return await self.paginate(select(self.model), [self.model.id], limit, cursor)
+
     async def update(self, id: UUID, **kwargs) -> Optional[ModelType]:
         """Update a record by ID."""
         await self.db.execute(
@@ -1,10 +1,11 @@
 """
 Tag repository for database operations.
 """
-from typing import List, Optional
+from typing import Dict, List, Optional, Sequence
 from uuid import UUID
 
 from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.infrastructure.database.models import Tag
@@ -30,16 +31,50 @@ class TagRepository(BaseRepository[Tag]):
         color: Optional[str] = None,
         description: Optional[str] = None
     ) -> Tag:
-        """Get existing tag or create new one."""
-        tag = await self.get_by_name(name)
-        if tag:
-            return tag
-
-        return await self.create(
-            name=name,
-            color=color,
-            description=description
+        """Get existing tag or create new one (single upsert, safe under concurrent inserts)."""
+        values = {"name": name}
+        if color is not None:
+            values["color"] = color
+        if description is not None:
+            values["description"] = description
+
+        stmt = insert(Tag).values(values)
+        result = await self.db.scalars(
+            stmt.on_conflict_do_update(
+                index_elements=[Tag.name],
+                set_={"name": stmt.excluded.name}
+            ).returning(Tag),
+            execution_options={"populate_existing": True}
+        )
+        return result.one()
+
+    async def get_or_create_many(self, names: Sequence[str]) -> Dict[str, Tag]:
+        """
+        Get or create several tags with one statement.
+
+        INSERT ... ON CONFLICT (name) DO UPDATE is used instead of DO NOTHING so that
+        RETURNING also yields the rows that already existed (the no-op update only
+        rewrites the name with itself).
+
+        Args:
+            names: Tag names (stripped; blanks and duplicates are ignored)
+
+        Returns:
+            Mapping of tag name to tag
+        """
+        unique_names = list(dict.fromkeys(name.strip() for name in names if name and name.strip()))
+        if not unique_names:
+            return {}
+
+        stmt = insert(Tag).values([{"name": name} for name in unique_names])
+        result = await self.db.scalars(
+            stmt.on_conflict_do_update(
+                index_elements=[Tag.name],
+                set_={"name": stmt.excluded.name}
+            ).returning(Tag),
+            execution_options={"populate_existing": True}
         )
+        return {tag.name: tag for tag in result.all()}
 
     async def increment_usage(self, tag_id: UUID) -> None:
         """Increment tag usage count."""
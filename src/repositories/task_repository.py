@@ -1,13 +1,18 @@
 """
 Task repository for database operations.
+
+Tag links are managed with set-based statements: every tag operation is a single
+statement whose data-modifying CTEs change task_tags and adjust tags.usage_count
+by the rows actually inserted/deleted.
 """
-from typing import List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 from uuid import UUID
 
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, delete, insert, update, func, literal, tuple_, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.infrastructure.database.models import Task, TaskTag
+from src.infrastructure.database.models import Task, TaskTag, Tag
 from src.repositories.base import BaseRepository
 
 
@@ -23,12 +28,12 @@ class TaskRepository(BaseRepository[Task]):
         limit: int = 100,
         offset: int = 0
     ) -> List[Task]:
-        """Get tasks by status."""
+        """Get tasks by status (OFFSET paging; prefer get_page_by_status for deep pages)."""
         result = await self.db.execute(
             select(Task)
             .where(Task.status == status)
             .where(Task.deleted_at.is_(None))
-            .order_by(Task.created_at.desc())
+            .order_by(Task.created_at.desc(), Task.id.desc())
             .limit(limit)
             .offset(offset)
         )
@@ -40,61 +45,219 @@ class TaskRepository(BaseRepository[Task]):
         limit: int = 100,
         offset: int = 0
     ) -> List[Task]:
-        """Get tasks by priority."""
+        """Get tasks by priority (OFFSET paging; prefer get_page_by_priority for deep pages)."""
         result = await self.db.execute(
             select(Task)
             .where(Task.priority == priority)
             .where(Task.deleted_at.is_(None))
-            .order_by(Task.created_at.desc())
+            .order_by(Task.created_at.desc(), Task.id.desc())
             .limit(limit)
             .offset(offset)
         )
         return list(result.scalars().all())
 
-    async def add_tag(self, task_id: UUID, tag_id: UUID) -> None:
-        """Add a tag to a task."""
-        # Check if relationship already exists
-        result = await self.db.execute(
-            select(TaskTag).where(
-                and_(
-                    TaskTag.task_id == task_id,
-                    TaskTag.tag_id == tag_id
-                )
-            )
+    async def get_page(
+        self,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Task], Optional[str]]:
+        """
+        Get non-deleted tasks, newest first, one page at a time.
+
+        Args:
+            limit: Page size
+            cursor: Cursor returned with the previous page (None for the first page)
+
+        Returns:
+            (tasks, next_cursor); next_cursor is None on the last page
+        """
+        return await self.paginate(
+            select(Task).where(Task.deleted_at.is_(None)),
+            [Task.created_at, Task.id], limit, cursor, descending=True
         )
-        existing = result.scalar_one_or_none()
 
-        if not existing:
-            task_tag = TaskTag(task_id=task_id, tag_id=tag_id)
-            self.db.add(task_tag)
-            await self.db.flush()
+    async def get_page_by_status(
+        self,
+        status: str,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Task], Optional[str]]:
+        """Get tasks by status, newest first, one page at a time (see get_page)."""
+        return await self.paginate(
+            select(Task).where(Task.status == status).where(Task.deleted_at.is_(None)),
+            [Task.created_at, Task.id], limit, cursor, descending=True
+        )
+
+    async def get_page_by_priority(
+        self,
+        priority: str,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Task], Optional[str]]:
+        """Get tasks by priority, newest first, one page at a time (see get_page)."""
+        return await self.paginate(
+            select(Task).where(Task.priority == priority).where(Task.deleted_at.is_(None)),
+            [Task.created_at, Task.id], limit, cursor, descending=True
+        )
+
+    async def create_many(self, rows: Sequence[Dict[str, Any]]) -> List[Task]:
+        """
+        Create several tasks with one multi-row INSERT ... RETURNING.
+
+        Args:
+            rows: Column values per task (all rows must have the same keys)
+
+        Returns:
+            Created tasks, in input order
+        """
+        if not rows:
+            return []
+        result = await self.db.scalars(
+            insert(Task).returning(Task, sort_by_parameter_order=True),
+            list(rows)
+        )
+        return list(result.all())
+
+    async def get_many(self, task_ids: Iterable[UUID], refresh: bool = False) -> Dict[UUID, Task]:
+        """
+        Get several tasks by ID with one SELECT.
+
+        Args:
+            task_ids: Task IDs
+            refresh: Overwrite tasks already loaded in the session (after bulk updates)
+        """
+        ids = list(task_ids)
+        if not ids:
+            return {}
+        stmt = select(Task).where(Task.id.in_(ids))
+        if refresh:
+            stmt = stmt.execution_options(populate_existing=True)
+        result = await self.db.execute(stmt)
+        return {task.id: task for task in result.scalars().all()}
+
+    async def update_many(self, updates: Sequence[Dict[str, Any]]) -> None:
+        """
+        Update several tasks by primary key (ORM bulk UPDATE, executemany).
+
+        Args:
+            updates: Column values per task, each including "id"
+        """
+        if not updates:
+            return
+        await self.db.execute(update(Task), list(updates))
+        await self.db.flush()
+
+    async def _apply_tag_changes(self, added=None, removed=None) -> None:
+        """
+        Run tag link changes and the matching usage_count update as one statement.
+
+        Args:
+            added: INSERT ... RETURNING tag_id CTE (one row per link created)
+            removed: DELETE ... RETURNING tag_id CTE (one row per link removed)
+        """
+        changes = []
+        if added is not None:
+            changes.append(select(added.c.tag_id, literal(1).label("delta")))
+        if removed is not None:
+            changes.append(select(removed.c.tag_id, literal(-1).label("delta")))
+
+        change_rows = (changes[0] if len(changes) == 1 else union_all(*changes)).subquery("changes")
+        deltas = (
+            select(change_rows.c.tag_id, func.sum(change_rows.c.delta).label("delta"))
+            .group_by(change_rows.c.tag_id)
+            .subquery("deltas")
+        )
+        await self.db.execute(
+            update(Tag)
+            .where(Tag.id == deltas.c.tag_id)
+            .values(usage_count=func.greatest(Tag.usage_count + deltas.c.delta, 0))
+            .execution_options(synchronize_session=False)
+        )
+
+    async def add_tags_bulk(self, pairs: Iterable[Tuple[UUID, UUID]]) -> None:
+        """Link (task_id, tag_id) pairs (INSERT ... ON CONFLICT DO NOTHING, one statement)."""
+        values = [{"task_id": task_id, "tag_id": tag_id} for task_id, tag_id in dict.fromkeys(pairs)]
+        if not values:
+            return
+        added = (
+            pg_insert(TaskTag).values(values)
+            .on_conflict_do_nothing()
+            .returning(TaskTag.tag_id)
+            .cte("added")
+        )
+        await self._apply_tag_changes(added=added)
+
+    async def add_tag(self, task_id: UUID, tag_id: UUID) -> None:
+        """Add a tag to a task."""
+        await self.add_tags_bulk([(task_id, tag_id)])
 
     async def remove_tag(self, task_id: UUID, tag_id: UUID) -> None:
         """Remove a tag from a task."""
-        result = await self.db.execute(
-            select(TaskTag).where(
-                and_(
-                    TaskTag.task_id == task_id,
-                    TaskTag.tag_id == tag_id
-                )
-            )
+        removed = (
+            delete(TaskTag)
+            .where(and_(TaskTag.task_id == task_id, TaskTag.tag_id == tag_id))
+            .returning(TaskTag.tag_id)
+            .cte("removed")
         )
-        task_tag = result.scalar_one_or_none()
+        await self._apply_tag_changes(removed=removed)
 
-        if task_tag:
-            await self.db.delete(task_tag)
-            await self.db.flush()
+    async def remove_all_tags_bulk(self, task_ids: Iterable[UUID]) -> None:
+        """Remove all tags from several tasks (one statement)."""
+        ids = list(task_ids)
+        if not ids:
+            return
+        removed = (
+            delete(TaskTag)
+            .where(TaskTag.task_id.in_(ids))
+            .returning(TaskTag.tag_id)
+            .cte("removed")
+        )
+        await self._apply_tag_changes(removed=removed)
 
     async def remove_all_tags(self, task_id: UUID) -> None:
         """Remove all tags from a task."""
-        result = await self.db.execute(
-            select(TaskTag).where(TaskTag.task_id == task_id)
+        await self.remove_all_tags_bulk([task_id])
+
+    async def replace_tags_bulk(self, tag_sets: Dict[UUID, Iterable[UUID]]) -> None:
+        """
+        Replace the tag sets of several tasks with one statement.
+
+        Only the difference is written: links not in the new set are deleted, new
+        links are inserted with ON CONFLICT DO NOTHING, unchanged links are kept.
+
+        Args:
+            tag_sets: New tag IDs per task ID (an empty set removes all tags)
+        """
+        if not tag_sets:
+            return
+        pairs = list(dict.fromkeys(
+            (task_id, tag_id) for task_id, tag_ids in tag_sets.items() for tag_id in tag_ids
+        ))
+
+        conditions = [TaskTag.task_id.in_(list(tag_sets))]
+        if pairs:
+            conditions.append(tuple_(TaskTag.task_id, TaskTag.tag_id).not_in(pairs))
+        removed = (
+            delete(TaskTag)
+            .where(*conditions)
+            .returning(TaskTag.tag_id)
+            .cte("removed")
         )
-        task_tags = result.scalars().all()
 
-        for task_tag in task_tags:
-            await self.db.delete(task_tag)
-        await self.db.flush()
+        added = None
+        if pairs:
+            added = (
+                pg_insert(TaskTag)
+                .values([{"task_id": task_id, "tag_id": tag_id} for task_id, tag_id in pairs])
+                .on_conflict_do_nothing()
+                .returning(TaskTag.tag_id)
+                .cte("added")
+            )
+        await self._apply_tag_changes(added=added, removed=removed)
+
+    async def replace_tags(self, task_id: UUID, tag_ids: Iterable[UUID]) -> None:
+        """Replace a task's tag set (one statement)."""
+        await self.replace_tags_bulk({task_id: list(tag_ids)})
 
     async def soft_delete(self, task_id: UUID) -> None:
         """Soft delete a task."""
@@ -8,9 +8,10 @@ CAD 渲染器 - 使用 matplotlib 渲染 DXF 文件
 import os
 from pathlib import Path
 from typing import Dict, Any, List, Optional, Tuple
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 import matplotlib.patches as patches
-from matplotlib.collections import LineCollection
+from matplotlib.collections import LineCollection, PatchCollection
 import numpy as np
 
 
@@ -32,6 +33,12 @@ LAYER_COLOR_MAP = {
 
 DEFAULT_COLOR = "#000000"  # 黑色 - 默认（白底上可见）
 
+# 视图外扩边距（mm）：端点落在边距内的线段也会被渲染
+RENDER_MARGIN = 1000
+
+# 默认是否使用瓦片模式渲染区域
+TILE_RENDER = os.getenv("DXF_TILE_RENDER", "1").lower() in ("1", "true", "yes")
+
 
 def get_layer_color(layer_name: str) -> str:
     """获取图层颜色"""
@@ -56,11 +63,15 @@ def render_drawing_region(
     layers: Optional[List[str]] = None,
     output_path: Optional[str] = None,
     color_mode: str = "by_layer",
-    maintain_aspect_ratio: bool = True
+    maintain_aspect_ratio: bool = True,
+    tiled: Optional[bool] = None
 ) -> Dict[str, Any]:
     """
     渲染指定坐标区域为 PNG 图片
 
+    瓦片模式下由磁盘缓存的瓦片金字塔拼接出结果（见 tile_cache），重叠或重复的区域
+    只渲染一次；否则直接用 matplotlib 渲染整个区域
+
     Args:
         file_path: DXF 文件路径
         bbox: 边界框 {"x": 1000, "y": 2000, "width": 5000, "height": 3000}
@@ -69,20 +80,20 @@ def render_drawing_region(
         output_path: 输出文件路径（可选）
         color_mode: "by_layer" 或 "monochrome"
         maintain_aspect_ratio: 是否保持宽高比（默认 True）
+        tiled: 是否使用瓦片模式，为空时由 DXF_TILE_RENDER 决定（仅在保持宽高比时生效）
 
     Returns:
         {"success": True, "image_path": "...", "scale": 0.4096, ...}
     """
     try:
-        import ezdxf
         import gc  # 用于垃圾回收
 
         if not os.path.exists(file_path):
             return {"success": False, "error": f"文件不存在: {file_path}"}
 
-        # 读取 DXF
-        doc = ezdxf.readfile(file_path)
-        msp = doc.modelspace()
+        # 列式实体存储（进程内缓存）
+        from .dxf_columnar import get_entity_store
+        store = get_entity_store(file_path)
 
         # 生成输出路径（统一输出到 workspace/rendered/）
         if not output_path:
@@ -105,8 +116,37 @@ def render_drawing_region(
         else:
             actual_width, actual_height = output_size
 
+        # 计算缩放比例
+        scale = actual_width / bbox['width']
+
+        if tiled is None:
+            tiled = TILE_RENDER
+        tile_info = None
+        if tiled and maintain_aspect_ratio:
+            from .tile_cache import get_tile_cache
+            tile_info = get_tile_cache().render_region(
+                file_path, store, bbox, (actual_width, actual_height),
+                layers, color_mode, output_path
+            )
+        # 拼接图超过上限时 render_region 返回 None，改为直接渲染
+        if tile_info is not None:
+            return {
+                "success": True,
+                "image_path": output_path,
+                "actual_bbox": bbox,
+                "scale": round(scale, 6),
+                "output_size": [actual_width, actual_height],
+                "tiles": tile_info
+            }
+
+        # 通过空间索引只取视图附近的实体
+        rows = store.spatial_index.query(bbox, margin=RENDER_MARGIN)
+
         # 创建图形（白底）
-        fig, ax = plt.subplots(figsize=(actual_width/100, actual_height/100), dpi=100)
+        # 使用面向对象 API 而非 pyplot 全局状态，多个线程可以同时渲染
+        fig = Figure(figsize=(actual_width/100, actual_height/100), dpi=100)
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
         fig.patch.set_facecolor('white')  # 设置图形背景为白色
         ax.set_facecolor('white')  # 设置坐标轴背景为白色
         ax.set_xlim(bbox['x'], bbox['x'] + bbox['width'])
@@ -115,20 +155,17 @@ def render_drawing_region(
         ax.axis('off')
 
         # 渲染实体
-        _render_entities(ax, msp, bbox, layers, color_mode)
+        _render_entities(ax, store, rows, bbox, layers, color_mode)
 
         # 保存（白底）
-        plt.tight_layout(pad=0)
-        plt.savefig(output_path, dpi=100, bbox_inches='tight', pad_inches=0, facecolor='white')
+        fig.tight_layout(pad=0)
+        fig.savefig(output_path, dpi=100, bbox_inches='tight', pad_inches=0, facecolor='white')
 
         # 显式清理内存
-        plt.close(fig)  # 关闭特定 figure
-        plt.close('all')  # 确保关闭所有 figure
+        fig.clear()
+        del fig, ax
         gc.collect()  # 强制垃圾回收
 
-        # 计算缩放比例
-        scale = actual_width / bbox['width']
-
         return {
             "success": True,
             "image_path": output_path,
@@ -140,9 +177,8 @@ def render_drawing_region(
     except ImportError:
         return {"success": False, "error": "需要安装 ezdxf 和 matplotlib"}
     except Exception as e:
-        # 异常时也要清理内存
+        # 异常时也要清理内存（figure 不在 pyplot 中注册，回收即可释放）
         try:
-            plt.close('all')
             import gc
             gc.collect()
         except:
@@ -150,117 +186,144 @@ def render_drawing_region(
         return {"success": False, "error": f"渲染失败: {str(e)}"}
 
 
-def _render_entities(ax, msp, bbox, layers, color_mode):
-    """渲染实体到 matplotlib axes"""
-    x_min = bbox['x']
-    x_max = bbox['x'] + bbox['width']
-    y_min = bbox['y']
-    y_max = bbox['y'] + bbox['height']
-    
-    for entity in msp:
-        # 图层过滤
-        if layers and entity.dxf.layer not in layers:
-            continue
-        
-        # 获取颜色
-        if color_mode == "by_layer":
-            color = get_layer_color(entity.dxf.layer)
-        else:
-            color = DEFAULT_COLOR
-        
-        entity_type = entity.dxftype()
-        
-        try:
-            # 渲染不同类型的实体
-            if entity_type == "LINE":
-                _render_line(ax, entity, x_min, x_max, y_min, y_max, color)
-            elif entity_type == "CIRCLE":
-                _render_circle(ax, entity, x_min, x_max, y_min, y_max, color)
-            elif entity_type == "ARC":
-                _render_arc(ax, entity, x_min, x_max, y_min, y_max, color)
-            elif entity_type == "LWPOLYLINE":
-                _render_lwpolyline(ax, entity, x_min, x_max, y_min, y_max, color)
-            elif entity_type == "POLYLINE":
-                _render_polyline(ax, entity, x_min, x_max, y_min, y_max, color)
-        except:
-            pass  # 忽略渲染错误
-
-
-def _is_in_bbox(x, y, x_min, x_max, y_min, y_max, margin=0):
-    """检查点是否在边界框内（带边距）"""
-    return (x_min - margin <= x <= x_max + margin and 
-            y_min - margin <= y <= y_max + margin)
-
-
-def _render_line(ax, entity, x_min, x_max, y_min, y_max, color):
-    """渲染线段"""
-    x1, y1 = entity.dxf.start.x, entity.dxf.start.y
-    x2, y2 = entity.dxf.end.x, entity.dxf.end.y
-    
-    # 检查是否在视图范围内
-    if (_is_in_bbox(x1, y1, x_min, x_max, y_min, y_max, margin=1000) or
-        _is_in_bbox(x2, y2, x_min, x_max, y_min, y_max, margin=1000)):
-        ax.plot([x1, x2], [y1, y2], color=color, linewidth=0.5)
-
-
-def _render_circle(ax, entity, x_min, x_max, y_min, y_max, color):
-    """渲染圆"""
-    cx, cy = entity.dxf.center.x, entity.dxf.center.y
-    r = entity.dxf.radius
-    
-    if _is_in_bbox(cx, cy, x_min, x_max, y_min, y_max, margin=r):
-        circle = patches.Circle((cx, cy), r, fill=False, edgecolor=color, linewidth=0.5)
-        ax.add_patch(circle)
-
-
-def _render_arc(ax, entity, x_min, x_max, y_min, y_max, color):
-    """渲染圆弧"""
-    cx, cy = entity.dxf.center.x, entity.dxf.center.y
-    r = entity.dxf.radius
-    start_angle = entity.dxf.start_angle
-    end_angle = entity.dxf.end_angle
-    
-    if _is_in_bbox(cx, cy, x_min, x_max, y_min, y_max, margin=r):
-        arc = patches.Arc((cx, cy), 2*r, 2*r, angle=0, 
-                         theta1=start_angle, theta2=end_angle,
-                         edgecolor=color, linewidth=0.5)
-        ax.add_patch(arc)
-
-
-def _render_lwpolyline(ax, entity, x_min, x_max, y_min, y_max, color):
-    """渲染轻量多段线"""
-    points = list(entity.get_points())
-    if not points:
-        return
-    
-    xs = [p[0] for p in points]
-    ys = [p[1] for p in points]
-    
-    # 检查是否有点在视图范围内
-    in_view = any(_is_in_bbox(x, y, x_min, x_max, y_min, y_max, margin=1000) 
-                  for x, y in zip(xs, ys))
-    
-    if in_view:
-        if entity.closed and len(points) > 2:
-            xs.append(xs[0])
-            ys.append(ys[0])
-        ax.plot(xs, ys, color=color, linewidth=0.5)
-
-
-def _render_polyline(ax, entity, x_min, x_max, y_min, y_max, color):
-    """渲染多段线"""
-    points = [(v.dxf.location.x, v.dxf.location.y) for v in entity.vertices]
-    if not points:
-        return
-    
-    xs = [p[0] for p in points]
-    ys = [p[1] for p in points]
-    
-    in_view = any(_is_in_bbox(x, y, x_min, x_max, y_min, y_max, margin=1000) 
-                  for x, y in zip(xs, ys))
-    
-    if in_view:
-        if entity.is_closed and len(points) > 2:
-            xs.append(xs[0])
-            ys.append(ys[0])
-        ax.plot(xs, ys, color=color, linewidth=0.5)
+def render_tile_image(
+    store,
+    bbox: Dict[str, float],
+    size: int,
+    layers: Optional[List[str]] = None,
+    color_mode: str = "by_layer"
+) -> np.ndarray:
+    """
+    把正方形区域渲染为 size × size 的 RGB 像素数组（瓦片）
+
+    坐标轴铺满整张图且不做 tight 裁剪，像素与坐标严格对应，相邻瓦片可以无缝拼接
+    """
+    fig = Figure(figsize=(size / 100, size / 100), dpi=100)
+    canvas = FigureCanvasAgg(fig)
+    fig.patch.set_facecolor('white')
+    ax = fig.add_axes([0, 0, 1, 1])
+    ax.set_facecolor('white')
+    ax.set_xlim(bbox['x'], bbox['x'] + bbox['width'])
+    ax.set_ylim(bbox['y'], bbox['y'] + bbox['height'])
+    ax.axis('off')
+
+    # 瓦片只按包围盒相交选实体（边距一个像素，线宽跨过瓦片边界时两边都画到），
+    # 两端都在瓦片外、穿过瓦片的长线段和多段线也会被渲染
+    rows = store.spatial_index.query(bbox, margin=bbox['width'] / size)
+    _render_entities(ax, store, rows, bbox, layers, color_mode, rows_intersect=True)
+
+    canvas.draw()
+    pixels = np.asarray(canvas.buffer_rgba())[:, :, :3].copy()
+    fig.clear()
+    return pixels
+
+
+def _render_entities(ax, store, rows, bbox, layers, color_mode, rows_intersect=False):
+    """
+    渲染实体到 matplotlib axes
+
+    基于列式实体存储按颜色分组：每种颜色生成一个 LineCollection（线段和多段线）
+    和一个 PatchCollection（圆和圆弧），避免为每个实体创建一个 artist
+
+    Args:
+        ax: matplotlib axes
+        store: 列式实体存储
+        rows: 候选实体行号
+        bbox: 视图范围
+        layers: 要渲染的图层列表
+        color_mode: "by_layer" 或 "monochrome"
+        rows_intersect: rows 已按包围盒与视图相交筛选，不再按端点/顶点/圆心过滤
+    """
+    view = (bbox['x'], bbox['x'] + bbox['width'], bbox['y'], bbox['y'] + bbox['height'])
+
+    # 图层过滤
+    if layers:
+        rows = rows[store.layer_mask(layers, rows)]
+
+    # 获取颜色：每个图层只计算一次
+    if color_mode == "by_layer":
+        layer_colors = np.array([get_layer_color(name) for name in store.layer_names] or [DEFAULT_COLOR])
+        row_colors = layer_colors[store.layer_ids[rows]]
+    else:
+        row_colors = np.full(len(rows), DEFAULT_COLOR)
+
+    codes = store.type_codes[rows]
+    is_line = codes == store.type_code("LINE")
+    is_circle = codes == store.type_code("CIRCLE")
+    is_arc = codes == store.type_code("ARC")
+    is_polyline = np.isin(codes, [store.type_code("LWPOLYLINE"), store.type_code("POLYLINE")])
+
+    offsets = store.vertex_offsets
+    has_vertices = offsets[rows + 1] > offsets[rows]
+    is_polyline &= has_vertices
+    is_round = is_circle | is_arc
+
+    if not rows_intersect:
+        is_line, is_polyline, is_round = _filter_in_view(store, rows, view, is_line, is_polyline, is_round)
+
+    for color in dict.fromkeys(row_colors.tolist()):
+        same_color = row_colors == color
+
+        paths: List[np.ndarray] = []
+        line_rows = rows[is_line & same_color]
+        if len(line_rows):
+            paths.extend(np.stack((store.start[line_rows], store.end[line_rows]), axis=1))
+
+        for row in rows[is_polyline & same_color]:
+            points = store.polyline_points(row)
+            if store.closed[row] and len(points) > 2:
+                points = np.vstack((points, points[:1]))
+            paths.append(points)
+
+        if paths:
+            ax.add_collection(LineCollection(paths, colors=color, linewidths=0.5))
+
+        shapes = []
+        for row in rows[is_round & same_color]:
+            center = store.center[row]
+            r = store.radius[row]
+            if np.isnan(store.start_angle[row]):
+                shapes.append(patches.Circle(center, r))
+            else:
+                shapes.append(patches.Arc(
+                    center, 2 * r, 2 * r, angle=0,
+                    theta1=store.start_angle[row], theta2=store.end_angle[row]
+                ))
+
+        if shapes:
+            ax.add_collection(PatchCollection(
+                shapes, facecolors='none', edgecolors=color, linewidths=0.5
+            ))
+
+
+def _filter_in_view(store, rows, view, is_line, is_polyline, is_round):
+    """直接渲染路径的可见性过滤：按端点/顶点/圆心是否在视图范围（含边距）内"""
+    # 线段：任一端点在视图范围（含边距）内
+    is_line = is_line & (
+        _in_view(store.start[rows], view, RENDER_MARGIN) |
+        _in_view(store.end[rows], view, RENDER_MARGIN)
+    )
+
+    # 多段线：任一顶点在视图范围（含边距）内
+    is_polyline = is_polyline.copy()
+    if is_polyline.any():
+        # 可见顶点数的前缀和，按顶点偏移相减得到每条多段线的可见顶点数
+        offsets = store.vertex_offsets
+        visible = np.concatenate(([0], np.cumsum(_in_view(store.vertices, view, RENDER_MARGIN))))
+        polyline_rows = rows[is_polyline]
+        visible_counts = visible[offsets[polyline_rows + 1]] - visible[offsets[polyline_rows]]
+        is_polyline[is_polyline] = visible_counts > 0
+
+    # 圆和圆弧：圆心在视图范围（以半径为边距）内
+    is_round = is_round & _in_view(store.center[rows], view, store.radius[rows])
+    return is_line, is_polyline, is_round
+
+
+def _in_view(points, view, margin) -> np.ndarray:
+    """向量化检查点 (N, 2) 是否在视图范围内（带边距，边距可为数组）"""
+    x_min, x_max, y_min, y_max = view
+    xs, ys = points[:, 0], points[:, 1]
+    return (
+        (x_min - margin <= xs) & (xs <= x_max + margin) &
+        (y_min - margin <= ys) & (ys <= y_max + margin)
+    )
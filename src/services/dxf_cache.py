@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+DXF 文档缓存 - 进程内共享的已解析文档 LRU 缓存
+
+同一轮对话中多个 CAD 工具（元数据、区域检查、实体提取、渲染）往往读取同一个
+DXF 文件，每次 ezdxf.readfile 都要完整解析一遍。本模块按
+(绝对路径, mtime, 文件大小) 缓存解析结果：
+
+- 内存预算：按 "文件大小 × 膨胀系数" 估算文档内存，超出预算时淘汰最久未使用的文档
+- 统计：命中 / 未命中 / 淘汰次数
+- 失效：文件被修改后 key 变化自动失效；也可以调用 invalidate() 显式失效
+- 派生数据：get_artifact() 可以把基于文档构建的数据挂在缓存条目上，
+  与文档一起淘汰和失效
+
+缓存是进程级的：工具在进程池中执行时，每个 worker 进程各自持有一份缓存。
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+# 缓存的内存预算（字节），默认 2GB
+DEFAULT_MAX_BYTES = int(os.getenv("DXF_CACHE_MAX_BYTES", str(2 * 1024 ** 3)))
+
+# 解析后的 ezdxf 文档内存占用约为 DXF 文本大小的数倍
+DEFAULT_MEMORY_FACTOR = float(os.getenv("DXF_CACHE_MEMORY_FACTOR", "8"))
+
+CacheKey = Tuple[str, int, int]
+
+
+@dataclass
+class DxfCacheEntry:
+    """缓存条目"""
+    key: CacheKey
+    doc: Any
+    cost: int  # 估算的内存占用（字节）
+    artifacts: Dict[str, Any] = field(default_factory=dict)
+    # 串行化派生数据的构建，同一派生数据只构建一次
+    artifact_lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+
+class DxfDocumentCache:
+    """已解析 DXF 文档的 LRU 缓存（线程安全）"""
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        memory_factor: float = DEFAULT_MEMORY_FACTOR
+    ):
+        """
+        初始化缓存
+
+        Args:
+            max_bytes: 内存预算（字节）
+            memory_factor: 文档内存占用相对文件大小的估算倍数
+        """
+        self.max_bytes = max_bytes
+        self.memory_factor = memory_factor
+
+        self._entries: "OrderedDict[CacheKey, DxfCacheEntry]" = OrderedDict()
+        self._current_bytes = 0
+        self._lock = threading.RLock()
+        # 正在解析的文件：同一文件并发请求时只解析一次
+        self._loading: Dict[CacheKey, threading.Lock] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(file_path: str) -> CacheKey:
+        """根据文件路径生成缓存 key（文件不存在时抛出 OSError）"""
+        path = os.path.abspath(file_path)
+        stat = os.stat(path)
+        return (path, stat.st_mtime_ns, stat.st_size)
+
+    def get_entry(self, file_path: str) -> DxfCacheEntry:
+        """
+        获取缓存条目，未命中时解析文件并加入缓存
+
+        Args:
+            file_path: DXF 文件路径
+
+        Returns:
+            缓存条目
+        """
+        key = self.make_key(file_path)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            load_lock = self._loading.setdefault(key, threading.Lock())
+
+        with load_lock:
+            # 等锁期间可能已被其他线程加载
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry
+
+            try:
+                import ezdxf
+                doc = ezdxf.readfile(key[0])
+            except BaseException:
+                with self._lock:
+                    self._loading.pop(key, None)
+                raise
+
+            entry = DxfCacheEntry(key=key, doc=doc, cost=int(key[2] * self.memory_factor))
+
+            with self._lock:
+                self.misses += 1
+                # 同一文件的旧版本已经过期
+                for stale_key in [k for k in self._entries if k[0] == key[0]]:
+                    self._remove(stale_key)
+
+                # 超过整个预算的文档不缓存，直接返回
+                if entry.cost <= self.max_bytes:
+                    self._entries[key] = entry
+                    self._current_bytes += entry.cost
+                    self._evict()
+
+                # 先插入条目再移除加载锁（同一临界区内），之后到达的线程必然能命中缓存
+                self._loading.pop(key, None)
+
+            return entry
+
+    def get_document(self, file_path: str):
+        """获取已解析的 ezdxf 文档"""
+        return self.get_entry(file_path).doc
+
+    def get_artifact(self, file_path: str, name: str, builder: Callable[[Any], Any]) -> Any:
+        """
+        获取基于文档构建的派生数据，首次访问时调用 builder(doc) 构建
+
+        Args:
+            file_path: DXF 文件路径
+            name: 派生数据名称
+            builder: 构建函数，参数为 ezdxf 文档
+
+        Returns:
+            派生数据
+        """
+        entry = self.get_entry(file_path)
+        artifact = entry.artifacts.get(name)
+        if artifact is not None:
+            return artifact
+
+        with entry.artifact_lock:
+            # 等锁期间可能已被其他线程构建
+            artifact = entry.artifacts.get(name)
+            if artifact is None:
+                artifact = builder(entry.doc)
+                entry.artifacts[name] = artifact
+        return artifact
+
+    def invalidate(self, file_path: Optional[str] = None) -> int:
+        """
+        显式失效缓存
+
+        Args:
+            file_path: 要失效的文件路径，为空时清空全部缓存
+
+        Returns:
+            被移除的条目数
+        """
+        with self._lock:
+            if file_path is None:
+                keys = list(self._entries)
+            else:
+                path = os.path.abspath(file_path)
+                keys = [k for k in self._entries if k[0] == path]
+
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "current_bytes": self._current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0
+            }
+
+    def _remove(self, key: CacheKey) -> None:
+        """移除条目（调用方持有锁）"""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._current_bytes -= entry.cost
+
+    def _evict(self) -> None:
+        """淘汰最久未使用的条目直到满足内存预算（调用方持有锁）"""
+        while self._current_bytes > self.max_bytes and self._entries:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+
+# 全局缓存实例
+_dxf_cache: Optional[DxfDocumentCache] = None
+_dxf_cache_lock = threading.Lock()
+
+
+def get_dxf_cache() -> DxfDocumentCache:
+    """获取全局 DXF 文档缓存实例"""
+    global _dxf_cache
+    if _dxf_cache is None:
+        with _dxf_cache_lock:
+            if _dxf_cache is None:
+                _dxf_cache = DxfDocumentCache()
+    return _dxf_cache
+
+
+def read_dxf(file_path: str):
+    """读取 DXF 文档（优先使用缓存），可直接替代 ezdxf.readfile"""
+    return get_dxf_cache().get_document(file_path)
@@ -0,0 +1,603 @@
+#!/usr/bin/env python3
+"""
+DXF 列式实体存储 - 每个文档版本只遍历一次 modelspace
+
+CAD 工具原本在每次查询时遍历 ezdxf 实体对象，逐个通过 Python 属性访问读取
+entity.dxf.start.x 等数据。本模块在文档首次使用时把 modelspace 转换为
+NumPy 列式存储：
+
+- 类型编码 / 图层编号 / 颜色
+- 起点、终点、圆心、半径、插入点、圆弧角度（不存在的属性为 NaN）
+- 文字表（TEXT / MTEXT 的内容和字高）
+- 多段线顶点（顶点数组 + 偏移数组）
+- 实体包围盒和空间索引用的包围盒
+
+元数据、边界、区域密度、实体提取和渲染都基于这些数组做向量化过滤。
+存储按 (路径, mtime, 文件大小) 缓存在进程内，并写入磁盘索引（见 dxf_sidecar），
+重启后再次访问同一份图纸时直接内存映射加载，无需重新解析 DXF 文本。
+"""
+
+import os
+import threading
+import warnings
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+# 实体类型编码：常见类型预先分配，其他类型构建时追加
+BASE_ENTITY_TYPES = (
+    "LINE", "CIRCLE", "ARC", "LWPOLYLINE", "POLYLINE",
+    "TEXT", "MTEXT", "INSERT", "DIMENSION", "HATCH",
+)
+
+# 区域工具按以下锚点属性判断实体位置（对应 hasattr(entity.dxf, ...)）
+ANCHOR_ATTRIBS = ("start", "end", "center", "insert")
+
+
+def get_entity_bbox(entity) -> Optional[Dict[str, float]]:
+    """
+    获取实体的包围盒
+
+    Returns:
+        {min_x, min_y, max_x, max_y} 或 None
+    """
+    entity_type = entity.dxftype()
+
+    try:
+        if entity_type == "LINE":
+            return {
+                'min_x': min(entity.dxf.start.x, entity.dxf.end.x),
+                'min_y': min(entity.dxf.start.y, entity.dxf.end.y),
+                'max_x': max(entity.dxf.start.x, entity.dxf.end.x),
+                'max_y': max(entity.dxf.start.y, entity.dxf.end.y)
+            }
+
+        elif entity_type in ["CIRCLE", "ARC"]:
+            cx, cy, r = entity.dxf.center.x, entity.dxf.center.y, entity.dxf.radius
+            return {
+                'min_x': cx - r,
+                'min_y': cy - r,
+                'max_x': cx + r,
+                'max_y': cy + r
+            }
+
+        elif entity_type in ["LWPOLYLINE", "POLYLINE"]:
+            if entity_type == "LWPOLYLINE":
+                points = list(entity.get_points())
+            else:
+                points = [(v.dxf.location.x, v.dxf.location.y) for v in entity.vertices]
+
+            if not points:
+                return None
+
+            xs = [p[0] for p in points]
+            ys = [p[1] for p in points]
+            return {
+                'min_x': min(xs),
+                'min_y': min(ys),
+                'max_x': max(xs),
+                'max_y': max(ys)
+            }
+
+        elif entity_type == "TEXT":
+            x = entity.dxf.insert.x
+            y = entity.dxf.insert.y
+            # 文字边界框估算：字高 × 字符数
+            height = entity.dxf.height
+            width = height * max(len(entity.dxf.text), 1)
+            return {
+                'min_x': x,
+                'min_y': y,
+                'max_x': x + width,
+                'max_y': y + height
+            }
+
+        elif entity_type == "MTEXT":
+            x = entity.dxf.insert.x
+            y = entity.dxf.insert.y
+            # 多行文字：优先使用参考矩形宽度，插入点按左上角处理
+            height = entity.dxf.char_height
+            lines = entity.plain_text().split("\n") if hasattr(entity, "plain_text") else [entity.text]
+            width = entity.dxf.get("width", 0) or height * max(max(len(line) for line in lines), 1)
+            total_height = height * max(len(lines), 1)
+            return {
+                'min_x': x,
+                'min_y': y - total_height,
+                'max_x': x + width,
+                'max_y': y
+            }
+
+        elif entity_type == "INSERT":
+            # 块引用：计算块内实体的真实范围，失败时按插入点估算
+            from ezdxf import bbox as ezdxf_bbox
+            extents = ezdxf_bbox.extents([entity], fast=True)
+            if extents.has_data:
+                return {
+                    'min_x': extents.extmin.x,
+                    'min_y': extents.extmin.y,
+                    'max_x': extents.extmax.x,
+                    'max_y': extents.extmax.y
+                }
+            x = entity.dxf.insert.x
+            y = entity.dxf.insert.y
+            return {
+                'min_x': x - 100,
+                'min_y': y - 100,
+                'max_x': x + 100,
+                'max_y': y + 100
+            }
+
+    except:
+        pass
+
+    return None
+
+
+class EntityStore:
+    """modelspace 实体的列式存储，第 i 行对应 modelspace 中第 i 个实体"""
+
+    # NumPy 数组列（磁盘索引中每列一个 .npy 文件）
+    ARRAY_COLUMNS = (
+        "type_codes", "layer_ids", "colors",
+        "start", "end", "center", "insert", "radius", "start_angle", "end_angle",
+        "anchor_flags", "text_ids", "text_heights",
+        "vertices", "vertex_offsets", "closed",
+        "bboxes", "index_bboxes",
+    )
+
+    # 其他列（磁盘索引中写入 meta.json）
+    META_COLUMNS = ("type_names", "layer_names", "texts", "handles", "dxf_version", "units")
+
+    def __init__(self, columns: Dict[str, Any], spatial_index=None):
+        """
+        Args:
+            columns: 列数据，见 build_entity_store()；可包含已计算的精确范围 "extents"
+            spatial_index: 已构建的空间索引（从磁盘索引加载时传入）
+        """
+        self.type_names: List[str] = columns["type_names"]
+        self.layer_names: List[str] = columns["layer_names"]
+        self.texts: List[str] = columns["texts"]
+        self.handles: List[str] = columns["handles"]
+
+        self.type_codes: np.ndarray = columns["type_codes"]
+        self.layer_ids: np.ndarray = columns["layer_ids"]
+        self.colors: np.ndarray = columns["colors"]
+        self.start: np.ndarray = columns["start"]
+        self.end: np.ndarray = columns["end"]
+        self.center: np.ndarray = columns["center"]
+        self.insert: np.ndarray = columns["insert"]
+        self.radius: np.ndarray = columns["radius"]
+        self.start_angle: np.ndarray = columns["start_angle"]
+        self.end_angle: np.ndarray = columns["end_angle"]
+        self.anchor_flags: np.ndarray = columns["anchor_flags"]
+        self.text_ids: np.ndarray = columns["text_ids"]
+        self.text_heights: np.ndarray = columns["text_heights"]
+        self.vertices: np.ndarray = columns["vertices"]
+        self.vertex_offsets: np.ndarray = columns["vertex_offsets"]
+        self.closed: np.ndarray = columns["closed"]
+        self.bboxes: np.ndarray = columns["bboxes"]
+        self.index_bboxes: np.ndarray = columns["index_bboxes"]
+
+        self.dxf_version: str = columns["dxf_version"]
+        self.units: str = columns["units"]
+
+        # 精确范围按需计算，has_extents 表示是否已经计算过（结果可能为 None）
+        self.has_extents = "extents" in columns
+        extents = columns.get("extents")
+        self.extents: Optional[Tuple[float, ...]] = tuple(extents) if extents else None
+
+        self._spatial_index = spatial_index
+
+    def __len__(self) -> int:
+        return len(self.type_codes)
+
+    def to_columns(self) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+        """导出列数据：(数组列, 其他列)"""
+        arrays = {name: getattr(self, name) for name in self.ARRAY_COLUMNS}
+        meta = {name: getattr(self, name) for name in self.META_COLUMNS}
+        if self.has_extents:
+            meta["extents"] = list(self.extents) if self.extents else None
+        return arrays, meta
+
+    # ------------------------------------------------------------
+    # 编码查询
+    # ------------------------------------------------------------
+
+    def type_code(self, entity_type: str) -> int:
+        """实体类型编码，不存在时返回 -1"""
+        try:
+            return self.type_names.index(entity_type)
+        except ValueError:
+            return -1
+
+    def type_mask(self, entity_types, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """实体类型属于 entity_types 的掩码"""
+        codes = [self.type_code(t) for t in entity_types]
+        type_codes = self.type_codes if rows is None else self.type_codes[rows]
+        return np.isin(type_codes, codes)
+
+    def layer_mask(self, layers, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """图层属于 layers 的掩码"""
+        wanted = set(layers)
+        ids = [i for i, name in enumerate(self.layer_names) if name in wanted]
+        layer_ids = self.layer_ids if rows is None else self.layer_ids[rows]
+        return np.isin(layer_ids, ids)
+
+    def has_anchor(self, attrib: str) -> np.ndarray:
+        """实体是否支持锚点属性（对应 hasattr(entity.dxf, attrib)）"""
+        return (self.anchor_flags & (1 << ANCHOR_ATTRIBS.index(attrib))) != 0
+
+    def anchor_in_box(
+        self,
+        rows: np.ndarray,
+        box: Tuple[float, float, float, float],
+        order: Tuple[str, ...]
+    ) -> np.ndarray:
+        """
+        按锚点判断实体是否在矩形内
+
+        每个实体取 order 中第一个支持的锚点属性判断；线段的终点也参与判断。
+
+        Args:
+            rows: 实体行号
+            box: (min_x, min_y, max_x, max_y)
+            order: 锚点属性的优先顺序，如 ("start", "center", "insert")
+
+        Returns:
+            与 rows 等长的掩码
+        """
+        inside = np.zeros(len(rows), dtype=bool)
+        decided = np.zeros(len(rows), dtype=bool)
+        for attrib in order:
+            supported = self.has_anchor(attrib)[rows] & ~decided
+            inside |= supported & points_in_box(getattr(self, attrib)[rows], *box)
+            decided |= supported
+
+        is_line = self.type_codes[rows] == self.type_code("LINE")
+        inside |= is_line & points_in_box(self.end[rows], *box)
+        return inside
+
+    def count_by(self, codes: np.ndarray, names: List[str]) -> Dict[str, int]:
+        """按编码统计数量，返回 {名称: 数量}（按首次出现顺序）"""
+        if len(codes) == 0:
+            return {}
+        unique, first, counts = np.unique(codes, return_index=True, return_counts=True)
+        order = np.argsort(first)
+        return {names[int(unique[i])]: int(counts[i]) for i in order}
+
+    # ------------------------------------------------------------
+    # 多段线
+    # ------------------------------------------------------------
+
+    def polyline_points(self, row: int) -> np.ndarray:
+        """第 row 个实体的多段线顶点 (K, 2)"""
+        return self.vertices[self.vertex_offsets[row]:self.vertex_offsets[row + 1]]
+
+    # ------------------------------------------------------------
+    # 空间索引
+    # ------------------------------------------------------------
+
+    @property
+    def index_extents(self) -> Optional[Tuple[float, float, float, float]]:
+        """所有索引包围盒的并集 (min_x, min_y, max_x, max_y)，没有实体时返回 None"""
+        boxes = self.spatial_index.bboxes
+        if len(boxes) == 0:
+            return None
+        return (
+            float(boxes[:, 0].min()), float(boxes[:, 1].min()),
+            float(boxes[:, 2].max()), float(boxes[:, 3].max())
+        )
+
+    @property
+    def spatial_index(self):
+        """实体包围盒的网格索引（首次访问时构建）"""
+        if self._spatial_index is None:
+            from .dxf_spatial_index import SpatialIndex
+            valid = ~np.isnan(self.index_bboxes).any(axis=1)
+            self._spatial_index = SpatialIndex(
+                self.index_bboxes[valid],
+                ids=np.nonzero(valid)[0]
+            )
+        return self._spatial_index
+
+
+def points_in_box(points: np.ndarray, min_x: float, min_y: float, max_x: float, max_y: float) -> np.ndarray:
+    """向量化判断点 (N, 2) 是否在矩形内（NaN 视为不在）"""
+    return (
+        (min_x <= points[:, 0]) & (points[:, 0] <= max_x) &
+        (min_y <= points[:, 1]) & (points[:, 1] <= max_y)
+    )
+
+
+def build_entity_store(doc) -> EntityStore:
+    """遍历一次 modelspace，构建列式存储"""
+    msp = doc.modelspace()
+
+    type_names = list(BASE_ENTITY_TYPES)
+    type_lookup = {name: i for i, name in enumerate(type_names)}
+    layer_names: List[str] = []
+    layer_lookup: Dict[str, int] = {}
+
+    type_codes, layer_ids, colors, handles = [], [], [], []
+    anchors = {attrib: [] for attrib in ANCHOR_ATTRIBS}
+    anchor_flags = []
+    radius, start_angle, end_angle = [], [], []
+    texts: List[str] = []
+    text_ids, text_heights = [], []
+    vertices: List[Tuple[float, float]] = []
+    vertex_counts, closed = [], []
+    other_bboxes: Dict[int, Dict[str, float]] = {}
+
+    nan = float("nan")
+    nan_point = (nan, nan)
+
+    for row, entity in enumerate(msp):
+        entity_type = entity.dxftype()
+        dxf = entity.dxf
+
+        code = type_lookup.get(entity_type)
+        if code is None:
+            code = type_lookup[entity_type] = len(type_names)
+            type_names.append(entity_type)
+        type_codes.append(code)
+
+        layer = dxf.layer
+        layer_id = layer_lookup.get(layer)
+        if layer_id is None:
+            layer_id = layer_lookup[layer] = len(layer_names)
+            layer_names.append(layer)
+        layer_ids.append(layer_id)
+
+        colors.append(dxf.color)
+        handles.append(dxf.handle)
+
+        # 锚点：与区域工具 hasattr(entity.dxf, ...) + entity.dxf.xxx.x 的行为一致
+        flags = 0
+        for bit, attrib in enumerate(ANCHOR_ATTRIBS):
+            point = nan_point
+            if dxf.is_supported(attrib):
+                flags |= 1 << bit
+                try:
+                    value = getattr(dxf, attrib)
+                    point = (value.x, value.y)
+                except Exception:
+                    pass
+            anchors[attrib].append(point)
+        anchor_flags.append(flags)
+
+        if entity_type in ("CIRCLE", "ARC"):
+            radius.append(dxf.radius)
+        else:
+            radius.append(nan)
+
+        if entity_type == "ARC":
+            start_angle.append(dxf.start_angle)
+            end_angle.append(dxf.end_angle)
+        else:
+            start_angle.append(nan)
+            end_angle.append(nan)
+
+        # 文字表
+        if entity_type == "TEXT":
+            text_ids.append(len(texts))
+            texts.append(dxf.text)
+            text_heights.append(dxf.height)
+        elif entity_type == "MTEXT":
+            text_ids.append(len(texts))
+            texts.append(entity.text)
+            text_heights.append(dxf.char_height)
+        else:
+            text_ids.append(-1)
+            text_heights.append(nan)
+
+        # 多段线顶点
+        points = ()
+        is_closed = False
+        try:
+            if entity_type == "LWPOLYLINE":
+                points = [(p[0], p[1]) for p in entity.get_points()]
+                is_closed = entity.closed
+            elif entity_type == "POLYLINE":
+                points = [(v.dxf.location.x, v.dxf.location.y) for v in entity.vertices]
+                is_closed = entity.is_closed
+        except Exception:
+            points = ()
+        vertices.extend(points)
+        vertex_counts.append(len(points))
+        closed.append(bool(is_closed))
+
+        # 文字和块引用的包围盒需要实体对象，其余类型由数组直接计算
+        if entity_type in ("TEXT", "MTEXT", "INSERT"):
+            bbox = get_entity_bbox(entity)
+            if bbox:
+                other_bboxes[row] = bbox
+
+    count = len(type_codes)
+    columns: Dict[str, Any] = {
+        "type_names": type_names,
+        "layer_names": layer_names,
+        "texts": texts,
+        "handles": handles,
+        "type_codes": np.array(type_codes, dtype=np.int16),
+        "layer_ids": np.array(layer_ids, dtype=np.int32),
+        "colors": np.array(colors, dtype=np.int16),
+        "radius": np.array(radius, dtype=np.float64),
+        "start_angle": np.array(start_angle, dtype=np.float64),
+        "end_angle": np.array(end_angle, dtype=np.float64),
+        "anchor_flags": np.array(anchor_flags, dtype=np.uint8),
+        "text_ids": np.array(text_ids, dtype=np.int32),
+        "text_heights": np.array(text_heights, dtype=np.float64),
+        "vertices": np.array(vertices, dtype=np.float64).reshape(-1, 2),
+        "vertex_offsets": np.concatenate(([0], np.cumsum(vertex_counts, dtype=np.int64))),
+        "closed": np.array(closed, dtype=bool),
+    }
+    for attrib in ANCHOR_ATTRIBS:
+        columns[attrib] = np.array(anchors[attrib], dtype=np.float64).reshape(-1, 2)
+
+    columns["bboxes"] = _compute_bboxes(columns, count, other_bboxes)
+    columns["index_bboxes"] = _compute_index_bboxes(columns)
+
+    columns["dxf_version"] = doc.dxfversion
+    columns["units"] = str(doc.units)
+
+    return EntityStore(columns)
+
+
+def _compute_bboxes(columns: Dict[str, Any], count: int, other_bboxes: Dict[int, Dict[str, float]]) -> np.ndarray:
+    """向量化计算实体包围盒 (N, 4)，无法计算的行为 NaN"""
+    bboxes = np.full((count, 4), np.nan)
+    codes = columns["type_codes"]
+    type_names = columns["type_names"]
+
+    is_line = codes == type_names.index("LINE")
+    start, end = columns["start"][is_line], columns["end"][is_line]
+    bboxes[is_line] = np.hstack((np.minimum(start, end), np.maximum(start, end)))
+
+    is_round = np.isin(codes, [type_names.index("CIRCLE"), type_names.index("ARC")])
+    center = columns["center"][is_round]
+    r = columns["radius"][is_round][:, None]
+    bboxes[is_round] = np.hstack((center - r, center + r))
+
+    offsets = columns["vertex_offsets"]
+    counts = np.diff(offsets)
+    has_vertices = counts > 0
+    if has_vertices.any():
+        vertices = columns["vertices"]
+        starts = offsets[:-1][has_vertices]
+        bboxes[has_vertices] = np.hstack((
+            np.minimum.reduceat(vertices, starts, axis=0),
+            np.maximum.reduceat(vertices, starts, axis=0)
+        ))
+
+    for row, bbox in other_bboxes.items():
+        bboxes[row] = (bbox['min_x'], bbox['min_y'], bbox['max_x'], bbox['max_y'])
+
+    return bboxes
+
+
+def _compute_index_bboxes(columns: Dict[str, Any]) -> np.ndarray:
+    """
+    空间索引用的包围盒：实体包围盒与所有锚点的并集
+
+    锚点可能落在包围盒之外（如块引用的插入点），合并后区域工具的点位判断不会漏掉实体
+    """
+    stacked = np.stack(
+        [columns["bboxes"][:, :2], columns["bboxes"][:, 2:]] +
+        [columns[attrib] for attrib in ANCHOR_ATTRIBS]
+    )
+    # 全 NaN 的行（没有包围盒也没有锚点）结果仍为 NaN，不进入索引
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        mins = np.nanmin(stacked, axis=0)
+        maxs = np.nanmax(stacked, axis=0)
+    return np.hstack((mins, maxs))
+
+
+def compute_extents(doc) -> Optional[Tuple[float, float, float, float]]:
+    """modelspace 的精确范围 (min_x, min_y, max_x, max_y)，无法计算时返回 None"""
+    try:
+        from ezdxf.bbox import extents
+        box = extents(doc.modelspace())
+        if box.has_data:
+            return (box.extmin.x, box.extmin.y, box.extmax.x, box.extmax.y)
+    except Exception:
+        pass
+    return None
+
+
+def get_drawing_extents(file_path: str) -> Optional[Tuple[float, ...]]:
+    """
+    获取 modelspace 的精确范围 (min_x, min_y, max_x, max_y)
+
+    精确范围需要展开圆弧、文字和块引用，代价远高于列式存储本身，只在首次需要时
+    解析文档计算一次，结果保存在实体存储和磁盘索引中
+    """
+    store = get_entity_store(file_path)
+    if not store.has_extents:
+        from .dxf_cache import read_dxf
+        from .dxf_sidecar import save_extents
+        store.extents = compute_extents(read_dxf(file_path))
+        store.has_extents = True
+        save_extents(file_path, store.extents)
+    return store.extents
+
+
+# 进程内实体存储缓存：(绝对路径, mtime, 文件大小) -> EntityStore
+# 从磁盘索引加载的存储是内存映射，常驻代价很小，按条目数限制即可
+STORE_CACHE_ENTRIES = int(os.getenv("DXF_STORE_CACHE_ENTRIES", "16"))
+
+_stores: "OrderedDict[Tuple[str, int, int], EntityStore]" = OrderedDict()
+_stores_lock = threading.Lock()
+_store_loading: Dict[Tuple[str, int, int], threading.Lock] = {}
+
+
+def get_entity_store(file_path: str) -> EntityStore:
+    """
+    获取文件的列式实体存储
+
+    依次查找进程内缓存、磁盘索引；都未命中时解析 DXF 构建存储并写入磁盘索引
+    """
+    from .dxf_cache import DxfDocumentCache
+
+    key = DxfDocumentCache.make_key(file_path)
+
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is not None:
+            _stores.move_to_end(key)
+            return store
+        load_lock = _store_loading.setdefault(key, threading.Lock())
+
+    with load_lock:
+        # 等锁期间可能已被其他线程加载
+        with _stores_lock:
+            store = _stores.get(key)
+        if store is not None:
+            return store
+
+        try:
+            from .dxf_sidecar import load_entity_store, save_entity_store
+            store = load_entity_store(file_path)
+            if store is None:
+                from .dxf_cache import read_dxf
+                store = build_entity_store(read_dxf(file_path))
+                save_entity_store(file_path, store)
+        except BaseException:
+            with _stores_lock:
+                _store_loading.pop(key, None)
+            raise
+
+        with _stores_lock:
+            # 同一文件的旧版本已经过期
+            for stale_key in [k for k in _stores if k[0] == key[0]]:
+                del _stores[stale_key]
+            _stores[key] = store
+            while len(_stores) > STORE_CACHE_ENTRIES:
+                _stores.popitem(last=False)
+            # 先发布存储再移除加载锁（同一临界区内），之后到达的线程必然能命中缓存
+            _store_loading.pop(key, None)
+
+    return store
+
+
+def invalidate_entity_stores(file_path: Optional[str] = None) -> int:
+    """
+    显式失效进程内的实体存储（磁盘索引以内容哈希为 key，无需失效）
+
+    Args:
+        file_path: 要失效的文件路径，为空时清空全部
+
+    Returns:
+        被移除的条目数
+    """
+    with _stores_lock:
+        if file_path is None:
+            keys = list(_stores)
+        else:
+            path = os.path.abspath(file_path)
+            keys = [k for k in _stores if k[0] == path]
+        for key in keys:
+            del _stores[key]
+        return len(keys)
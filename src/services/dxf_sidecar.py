@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+DXF 磁盘索引 - 列式实体存储的持久化 sidecar
+
+进程重启后，首次访问图纸仍要完整解析 DXF 文本并构建列式存储。本模块把构建结果
+写入缓存目录，再次访问同一份图纸时直接内存映射加载：
+
+    <DXF_INDEX_DIR>/<文件内容 sha256>/
+        meta.json        格式版本、图层/类型/文字表、DXF 版本与单位、精确范围、网格参数
+        <列名>.npy       列式实体数组（np.load(mmap_mode='r') 加载）
+        index.<名>.npy   空间索引的 CSR 网格数组
+
+- 以文件内容哈希为 key：文件改名或复制仍能命中，内容变化自动失效
+- 写入先落到临时目录再原子重命名，并发进程不会读到半成品
+- 格式版本不一致或文件损坏时视为未命中，重新构建
+- DXF_INDEX_DIR 设为空字符串可关闭磁盘索引
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+
+# 磁盘索引目录
+SIDECAR_DIR = os.getenv("DXF_INDEX_DIR", "workspace/.dxfidx")
+
+# 磁盘格式版本：列定义变化时递增，旧索引自动失效
+SIDECAR_VERSION = 1
+
+# 文件内容哈希缓存：(绝对路径, mtime, 大小) -> sha256
+_digests: Dict[Tuple[str, int, int], str] = {}
+_digests_lock = threading.Lock()
+
+
+def file_digest(file_path: str) -> str:
+    """计算文件内容的 sha256（同一文件版本在进程内只计算一次）"""
+    from .dxf_cache import DxfDocumentCache
+
+    key = DxfDocumentCache.make_key(file_path)
+    with _digests_lock:
+        digest = _digests.get(key)
+    if digest is not None:
+        return digest
+
+    sha = hashlib.sha256()
+    with open(key[0], "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            sha.update(chunk)
+    digest = sha.hexdigest()
+
+    with _digests_lock:
+        _digests[key] = digest
+    return digest
+
+
+def sidecar_path(file_path: str) -> Optional[Path]:
+    """文件对应的磁盘索引目录，磁盘索引关闭时返回 None"""
+    if not SIDECAR_DIR:
+        return None
+    return Path(SIDECAR_DIR) / file_digest(file_path)
+
+
+def load_entity_store(file_path: str):
+    """
+    从磁盘索引加载列式实体存储
+
+    Returns:
+        EntityStore，索引不存在、版本不一致或损坏时返回 None
+    """
+    from .dxf_columnar import EntityStore
+    from .dxf_spatial_index import SpatialIndex
+
+    path = sidecar_path(file_path)
+    if path is None or not (path / "meta.json").exists():
+        return None
+
+    try:
+        meta = json.loads((path / "meta.json").read_text(encoding="utf-8"))
+        if meta.get("version") != SIDECAR_VERSION:
+            return None
+
+        columns: Dict[str, Any] = dict(meta["columns"])
+        for name in EntityStore.ARRAY_COLUMNS:
+            columns[name] = np.load(path / f"{name}.npy", mmap_mode="r")
+
+        index_arrays = {
+            name: np.load(path / f"index.{name}.npy", mmap_mode="r")
+            for name in SpatialIndex.STATE_ARRAYS
+        }
+        spatial_index = SpatialIndex.from_state(meta["index"], index_arrays)
+    except (OSError, ValueError, KeyError):
+        return None
+
+    return EntityStore(columns, spatial_index=spatial_index)
+
+
+def save_entity_store(file_path: str, store) -> bool:
+    """
+    把列式实体存储写入磁盘索引
+
+    Returns:
+        是否写入成功（目录不可写等情况下返回 False，不影响调用方）
+    """
+    path = sidecar_path(file_path)
+    if path is None:
+        return False
+
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_dir = Path(tempfile.mkdtemp(prefix=f".{path.name}.", dir=path.parent))
+        try:
+            arrays, meta_columns = store.to_columns()
+            for name, array in arrays.items():
+                np.save(tmp_dir / f"{name}.npy", np.ascontiguousarray(array))
+
+            index_params, index_arrays = store.spatial_index.to_state()
+            for name, array in index_arrays.items():
+                np.save(tmp_dir / f"index.{name}.npy", np.ascontiguousarray(array))
+
+            meta = {
+                "version": SIDECAR_VERSION,
+                "source": os.path.abspath(file_path),
+                "columns": meta_columns,
+                "index": index_params
+            }
+            (tmp_dir / "meta.json").write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+
+            # 原子替换；其他进程已写入同一份索引时保留已有的
+            try:
+                os.rename(tmp_dir, path)
+            except OSError:
+                if not (path / "meta.json").exists():
+                    shutil.rmtree(path, ignore_errors=True)
+                    os.rename(tmp_dir, path)
+        finally:
+            if tmp_dir.exists():
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+    except OSError:
+        return False
+
+    return True
+
+
+def save_extents(file_path: str, extents: Optional[Tuple[float, float, float, float]]) -> bool:
+    """把精确范围补写到已有磁盘索引的 meta.json"""
+    path = sidecar_path(file_path)
+    if path is None or not (path / "meta.json").exists():
+        return False
+
+    try:
+        meta_path = path / "meta.json"
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        meta["columns"]["extents"] = list(extents) if extents else None
+
+        tmp_path = meta_path.with_name(f".meta.{os.getpid()}.{threading.get_ident()}.json")
+        tmp_path.write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, meta_path)
+    except (OSError, ValueError, KeyError):
+        return False
+
+    return True
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+DXF 空间索引 - 基于均匀网格的实体包围盒索引
+
+区域类工具（inspect_region、extract_cad_entities(bbox=...)、区域渲染）原本每次都要
+线性扫描整个 modelspace。本模块为每个文档构建一次空间索引：
+
+1. 使用列式实体存储中的包围盒（含 TEXT/MTEXT 文字范围估算、INSERT 块引用范围和锚点）
+2. 批量装入均匀网格，网格以 CSR 形式存储（按单元排序的实体下标 + 单元偏移数组）
+3. 查询时只取 bbox 覆盖的网格单元，再用 NumPy 向量化做精确的包围盒相交判断
+
+跨越大量网格单元的大实体（如图框）单独存放，每次查询都参与精确判断。
+索引挂在列式实体存储上，随存储一起写入磁盘索引和失效。
+"""
+
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+
+# 单个实体最多登记的网格单元数，超过则视为大实体
+LARGE_ENTITY_CELL_LIMIT = 64
+
+# 网格单元总数上限
+MAX_GRID_CELLS = 1 << 20
+
+BBoxLike = Union[Dict[str, float], Sequence[float]]
+
+
+def _normalize_bbox(bbox: BBoxLike, margin: float = 0.0) -> Tuple[float, float, float, float]:
+    """把 {"x","y","width","height"} 或 (min_x, min_y, max_x, max_y) 统一为元组"""
+    if isinstance(bbox, dict):
+        min_x, min_y = bbox['x'], bbox['y']
+        max_x, max_y = min_x + bbox['width'], min_y + bbox['height']
+    else:
+        min_x, min_y, max_x, max_y = bbox
+    return (min_x - margin, min_y - margin, max_x + margin, max_y + margin)
+
+
+class SpatialIndex:
+    """实体包围盒的均匀网格索引"""
+
+    def __init__(
+        self,
+        bboxes: np.ndarray,
+        ids: Optional[np.ndarray] = None,
+        cell_size: Optional[float] = None
+    ):
+        """
+        批量构建索引
+
+        Args:
+            bboxes: (N, 4) 数组，每行为 min_x, min_y, max_x, max_y
+            ids: 与 bboxes 对应的实体行号（升序），为空时使用 0..N-1
+            cell_size: 网格单元边长，为空时按实体密度自动选择
+        """
+        self.bboxes = np.asarray(bboxes, dtype=np.float64).reshape(-1, 4)
+        count = len(self.bboxes)
+        self.ids = np.arange(count) if ids is None else np.asarray(ids, dtype=np.int64)
+
+        if count == 0:
+            self.origin = (0.0, 0.0)
+            self.cell_size = 1.0
+            self.nx = self.ny = 1
+            self.cell_offsets = np.zeros(2, dtype=np.int64)
+            self.cell_entities = np.zeros(0, dtype=np.int64)
+            self.large_entities = np.zeros(0, dtype=np.int64)
+            return
+
+        min_x, min_y = self.bboxes[:, 0].min(), self.bboxes[:, 1].min()
+        max_x, max_y = self.bboxes[:, 2].max(), self.bboxes[:, 3].max()
+        width = max(max_x - min_x, 1e-9)
+        height = max(max_y - min_y, 1e-9)
+
+        # 平均每个单元约 2 个实体；限制总单元数
+        if cell_size is None:
+            cell_size = np.sqrt(width * height / count) * 1.5
+        cell_size = max(cell_size, np.sqrt(width * height / MAX_GRID_CELLS), 1e-9)
+
+        self.origin = (float(min_x), float(min_y))
+        self.cell_size = float(cell_size)
+        self.nx = int(width // cell_size) + 1
+        self.ny = int(height // cell_size) + 1
+
+        # 每个实体覆盖的单元范围
+        cx0, cy0, cx1, cy1 = self._cell_range(self.bboxes)
+        spans_x = cx1 - cx0 + 1
+        cell_counts = spans_x * (cy1 - cy0 + 1)
+
+        is_large = cell_counts > LARGE_ENTITY_CELL_LIMIT
+        self.large_entities = np.nonzero(is_large)[0]
+
+        small = np.nonzero(~is_large)[0]
+        counts = cell_counts[small]
+        total = int(counts.sum())
+
+        # 展开 (实体, 单元) 对：实体 i 覆盖 counts[i] 个单元
+        owner = np.repeat(np.arange(len(small)), counts)
+        local = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        span = spans_x[small][owner]
+        cells = (cy0[small][owner] + local // span) * self.nx + cx0[small][owner] + local % span
+
+        order = np.argsort(cells, kind="stable")
+        self.cell_entities = small[owner[order]]
+        self.cell_offsets = np.concatenate((
+            [0],
+            np.cumsum(np.bincount(cells, minlength=self.nx * self.ny))
+        )).astype(np.int64)
+
+    # 持久化时保存的数组
+    STATE_ARRAYS = ("bboxes", "ids", "cell_offsets", "cell_entities", "large_entities")
+
+    def to_state(self) -> Tuple[Dict[str, float], Dict[str, np.ndarray]]:
+        """导出索引状态：(网格参数, 数组)，用于写入磁盘"""
+        params = {
+            "origin_x": self.origin[0],
+            "origin_y": self.origin[1],
+            "cell_size": self.cell_size,
+            "nx": self.nx,
+            "ny": self.ny
+        }
+        return params, {name: getattr(self, name) for name in self.STATE_ARRAYS}
+
+    @classmethod
+    def from_state(cls, params: Dict[str, float], arrays: Dict[str, np.ndarray]) -> "SpatialIndex":
+        """从导出的状态恢复索引（数组可以是内存映射），无需重新构建"""
+        index = cls.__new__(cls)
+        index.origin = (float(params["origin_x"]), float(params["origin_y"]))
+        index.cell_size = float(params["cell_size"])
+        index.nx = int(params["nx"])
+        index.ny = int(params["ny"])
+        for name in cls.STATE_ARRAYS:
+            setattr(index, name, arrays[name])
+        return index
+
+    def _cell_range(self, bboxes: np.ndarray):
+        """计算包围盒覆盖的网格单元范围（闭区间，已裁剪到网格内）"""
+        ox, oy = self.origin
+        size = self.cell_size
+        cx0 = np.clip(((bboxes[:, 0] - ox) // size).astype(np.int64), 0, self.nx - 1)
+        cy0 = np.clip(((bboxes[:, 1] - oy) // size).astype(np.int64), 0, self.ny - 1)
+        cx1 = np.clip(((bboxes[:, 2] - ox) // size).astype(np.int64), 0, self.nx - 1)
+        cy1 = np.clip(((bboxes[:, 3] - oy) // size).astype(np.int64), 0, self.ny - 1)
+        return cx0, cy0, cx1, cy1
+
+    def __len__(self) -> int:
+        return len(self.bboxes)
+
+    def query(self, bbox: BBoxLike, margin: float = 0.0) -> np.ndarray:
+        """
+        查询与 bbox 相交的实体
+
+        Args:
+            bbox: {"x","y","width","height"} 或 (min_x, min_y, max_x, max_y)
+            margin: 向四周扩展的距离
+
+        Returns:
+            实体行号数组（按 modelspace 顺序升序）
+        """
+        min_x, min_y, max_x, max_y = _normalize_bbox(bbox, margin)
+        if len(self.bboxes) == 0:
+            return np.zeros(0, dtype=np.int64)
+
+        query_box = np.array([[min_x, min_y, max_x, max_y]])
+        cx0, cy0, cx1, cy1 = (int(v[0]) for v in self._cell_range(query_box))
+
+        # 同一行中相邻单元在 CSR 中是连续的，每行一次切片
+        parts = [self.large_entities]
+        for cy in range(cy0, cy1 + 1):
+            start = self.cell_offsets[cy * self.nx + cx0]
+            end = self.cell_offsets[cy * self.nx + cx1 + 1]
+            if end > start:
+                parts.append(self.cell_entities[start:end])
+
+        candidates = np.unique(np.concatenate(parts))
+        if len(candidates) == 0:
+            return candidates
+
+        boxes = self.bboxes[candidates]
+        hit = (
+            (boxes[:, 0] <= max_x) & (boxes[:, 2] >= min_x) &
+            (boxes[:, 1] <= max_y) & (boxes[:, 3] >= min_y)
+        )
+        return self.ids[candidates[hit]]
+
+
+def get_spatial_index(file_path: str) -> SpatialIndex:
+    """获取文件的空间索引（随列式实体存储一起构建和失效）"""
+    from .dxf_columnar import get_entity_store
+    return get_entity_store(file_path).spatial_index
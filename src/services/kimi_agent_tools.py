@@ -12,6 +12,8 @@ Kimi Agent 工具定义
 from typing import Dict, Any, List, Optional
 import json
 
+import numpy as np
+
 
 # ============================================================
 # 工具函数定义
@@ -32,9 +34,8 @@ def get_cad_metadata(file_path: str) -> Dict[str, Any]:
     """
     try:
         import os
-        import ezdxf
         from pathlib import Path
-        from ezdxf.bbox import extents
+        from .dxf_columnar import get_entity_store, get_drawing_extents
 
         if not os.path.exists(file_path):
             return {
@@ -42,40 +43,41 @@ def get_cad_metadata(file_path: str) -> Dict[str, Any]:
                 "error": f"文件不存在: {file_path}"
             }
 
-        # 读取 DXF 文件
-        doc = ezdxf.readfile(file_path)
-        msp = doc.modelspace()
+        # 列式实体存储（每个文档版本只构建一次，后续缩略图渲染也复用）
+        store = get_entity_store(file_path)
 
-        # 提取图层信息
+        # 提取图层信息：按 (图层, 类型) 分组计数，保持首次出现顺序
         layers_info = {}
-        for entity in msp:
-            layer_name = entity.dxf.layer
-            if layer_name not in layers_info:
-                layers_info[layer_name] = {
-                    "entity_count": 0,
-                    "entity_types": {}
-                }
-            layers_info[layer_name]["entity_count"] += 1
-
-            entity_type = entity.dxftype()
-            if entity_type not in layers_info[layer_name]["entity_types"]:
-                layers_info[layer_name]["entity_types"][entity_type] = 0
-            layers_info[layer_name]["entity_types"][entity_type] += 1
+        type_count = len(store.type_names)
+        groups = store.layer_ids.astype(np.int64) * type_count + store.type_codes
+        if len(groups):
+            keys, first, counts = np.unique(groups, return_index=True, return_counts=True)
+            for i in np.argsort(first):
+                layer_name = store.layer_names[int(keys[i]) // type_count]
+                entity_type = store.type_names[int(keys[i]) % type_count]
+                if layer_name not in layers_info:
+                    layers_info[layer_name] = {
+                        "entity_count": 0,
+                        "entity_types": {}
+                    }
+                layers_info[layer_name]["entity_count"] += int(counts[i])
+                layers_info[layer_name]["entity_types"][entity_type] = int(counts[i])
 
-        # 获取边界信息
-        try:
-            bbox = extents(msp)
+        # 获取边界信息（每个文档版本只计算一次）
+        extents = get_drawing_extents(file_path)
+        if extents:
+            min_x, min_y, max_x, max_y = extents
             bounds = {
-                "min_x": round(bbox.extmin.x, 2),
-                "max_x": round(bbox.extmax.x, 2),
-                "min_y": round(bbox.extmin.y, 2),
-                "max_y": round(bbox.extmax.y, 2),
-                "width": round(bbox.size.x, 2),
-                "height": round(bbox.size.y, 2),
-                "width_m": round(bbox.size.x / 1000, 2),
-                "height_m": round(bbox.size.y / 1000, 2)
+                "min_x": round(min_x, 2),
+                "max_x": round(max_x, 2),
+                "min_y": round(min_y, 2),
+                "max_y": round(max_y, 2),
+                "width": round(max_x - min_x, 2),
+                "height": round(max_y - min_y, 2),
+                "width_m": round((max_x - min_x) / 1000, 2),
+                "height_m": round((max_y - min_y) / 1000, 2)
             }
-        except:
+        else:
             bounds = None
 
         # 获取文件元数据
@@ -88,13 +90,13 @@ def get_cad_metadata(file_path: str) -> Dict[str, Any]:
                 "filename": filename,
                 "file_path": file_path,
                 "metadata": {
-                    "dxf_version": doc.dxfversion,
+                    "dxf_version": store.dxf_version,
                     "file_size": file_size,
-                    "units": str(doc.units)
+                    "units": store.units
                 },
                 "bounds": bounds,
                 "layers": layers_info,
-                "entity_count": len(list(msp)),
+                "entity_count": len(store),
                 "layer_count": len(layers_info)
             }
         }
@@ -146,97 +148,67 @@ def extract_cad_entities(
         包含实体列表和统计信息
     """
     try:
-        import ezdxf
+        from .dxf_columnar import get_entity_store
+
+        store = get_entity_store(file_path)
 
-        doc = ezdxf.readfile(file_path)
-        msp = doc.modelspace()
+        # 指定区域时只取空间索引命中的候选实体
+        if bbox:
+            rows = store.spatial_index.query(bbox)
+        else:
+            rows = np.arange(len(store))
+
+        # 过滤实体类型
+        if entity_types:
+            rows = rows[store.type_mask(entity_types, rows)]
+
+        # 过滤图层
+        if layers:
+            rows = rows[store.layer_mask(layers, rows)]
+
+        # 过滤 bbox：线段起点或终点、圆的圆心、文字插入点，其他实体依次取起点/中心点/插入点
+        if bbox:
+            box = (bbox['x'], bbox['y'], bbox['x'] + bbox['width'], bbox['y'] + bbox['height'])
+            rows = rows[store.anchor_in_box(rows, box, ("start", "center", "insert"))]
 
+        # 提取实体信息（只返回前100个）
         entities = []
-        entity_count = {}
-
-        # 辅助函数：检查点是否在 bbox 内
-        def is_in_bbox(x, y, bbox):
-            if not bbox:
-                return True
-            return (bbox['x'] <= x <= bbox['x'] + bbox['width'] and
-                    bbox['y'] <= y <= bbox['y'] + bbox['height'])
-
-        for entity in msp:
-            # 过滤实体类型
-            if entity_types and entity.dxftype() not in entity_types:
-                continue
-
-            # 过滤图层
-            if layers and entity.dxf.layer not in layers:
-                continue
-
-            # 过滤 bbox（检查实体是否在指定区域内）
-            if bbox:
-                in_region = False
-                try:
-                    if entity.dxftype() == "LINE":
-                        # 线段：起点或终点在区域内
-                        if (is_in_bbox(entity.dxf.start.x, entity.dxf.start.y, bbox) or
-                            is_in_bbox(entity.dxf.end.x, entity.dxf.end.y, bbox)):
-                            in_region = True
-                    elif entity.dxftype() == "CIRCLE":
-                        # 圆：圆心在区域内
-                        if is_in_bbox(entity.dxf.center.x, entity.dxf.center.y, bbox):
-                            in_region = True
-                    elif entity.dxftype() == "TEXT":
-                        # 文字：插入点在区域内
-                        if is_in_bbox(entity.dxf.insert.x, entity.dxf.insert.y, bbox):
-                            in_region = True
-                    elif hasattr(entity.dxf, 'start'):
-                        # 其他有起点的实体
-                        if is_in_bbox(entity.dxf.start.x, entity.dxf.start.y, bbox):
-                            in_region = True
-                    elif hasattr(entity.dxf, 'center'):
-                        # 其他有中心点的实体
-                        if is_in_bbox(entity.dxf.center.x, entity.dxf.center.y, bbox):
-                            in_region = True
-                    elif hasattr(entity.dxf, 'insert'):
-                        # 其他有插入点的实体
-                        if is_in_bbox(entity.dxf.insert.x, entity.dxf.insert.y, bbox):
-                            in_region = True
-                except:
-                    pass
-
-                if not in_region:
-                    continue
-
-            # 提取实体信息
+        line_code = store.type_code("LINE")
+        circle_code = store.type_code("CIRCLE")
+        text_code = store.type_code("TEXT")
+
+        for row in rows[:100]:
+            code = store.type_codes[row]
             entity_info = {
-                "type": entity.dxftype(),
-                "layer": entity.dxf.layer,
-                "color": entity.dxf.color
+                "type": store.type_names[code],
+                "layer": store.layer_names[store.layer_ids[row]],
+                "color": int(store.colors[row])
             }
 
             # 提取几何信息
-            if entity.dxftype() == "LINE":
-                entity_info["start"] = [entity.dxf.start.x, entity.dxf.start.y]
-                entity_info["end"] = [entity.dxf.end.x, entity.dxf.end.y]
+            if code == line_code:
+                entity_info["start"] = store.start[row].tolist()
+                entity_info["end"] = store.end[row].tolist()
 
-            elif entity.dxftype() == "CIRCLE":
-                entity_info["center"] = [entity.dxf.center.x, entity.dxf.center.y]
-                entity_info["radius"] = entity.dxf.radius
+            elif code == circle_code:
+                entity_info["center"] = store.center[row].tolist()
+                entity_info["radius"] = float(store.radius[row])
 
-            elif entity.dxftype() == "TEXT":
-                entity_info["text"] = entity.dxf.text
-                entity_info["position"] = [entity.dxf.insert.x, entity.dxf.insert.y]
-                entity_info["height"] = entity.dxf.height
+            elif code == text_code:
+                entity_info["text"] = store.texts[store.text_ids[row]]
+                entity_info["position"] = store.insert[row].tolist()
+                entity_info["height"] = float(store.text_heights[row])
 
             entities.append(entity_info)
 
-            # 统计
-            entity_type = entity.dxftype()
-            entity_count[entity_type] = entity_count.get(entity_type, 0) + 1
+        # 统计
+        entity_count = store.count_by(store.type_codes[rows], store.type_names)
 
         return {
             "success": True,
             "data": {
-                "entities": entities[:100],  # 只返回前100个
-                "total_count": len(entities),
+                "entities": entities,
+                "total_count": len(rows),
                 "entity_count": entity_count
             }
         }
@@ -295,7 +267,6 @@ def inspect_region(
     """
     try:
         from .cad_renderer import render_drawing_region
-        import ezdxf
         import base64
 
         bbox = {"x": x, "y": y, "width": width, "height": height}
@@ -322,67 +293,31 @@ def inspect_region(
         except Exception as e:
             image_base64 = None
 
-        # 3. 提取区域内的实体数据
-        doc = ezdxf.readfile(file_path)
-        msp = doc.modelspace()
-
-        entities_by_type = {}
-        entities_by_layer = {}
-        texts = []
-        dimensions = []
+        # 3. 提取区域内的实体数据（渲染时已构建列式存储和空间索引，这里命中缓存）
+        from .dxf_columnar import get_entity_store
+        store = get_entity_store(file_path)
+        rows = store.spatial_index.query(bbox)
 
-        def is_in_bbox(px, py):
-            return (x <= px <= x + width and y <= py <= y + height)
+        # 线段起点或终点、文字插入点，其他实体依次取中心点/起点/插入点
+        box = (x, y, x + width, y + height)
+        rows = rows[store.anchor_in_box(rows, box, ("center", "start", "insert"))]
 
-        for entity in msp:
-            # 检查实体是否在区域内
-            in_region = False
-            entity_point = None
+        # 统计实体类型和图层
+        entities_by_type = store.count_by(store.type_codes[rows], store.type_names)
+        entities_by_layer = store.count_by(store.layer_ids[rows], store.layer_names)
 
-            try:
-                if entity.dxftype() == "LINE":
-                    if (is_in_bbox(entity.dxf.start.x, entity.dxf.start.y) or
-                        is_in_bbox(entity.dxf.end.x, entity.dxf.end.y)):
-                        in_region = True
-                elif entity.dxftype() == "TEXT":
-                    if is_in_bbox(entity.dxf.insert.x, entity.dxf.insert.y):
-                        in_region = True
-                        texts.append({
-                            "text": entity.dxf.text,
-                            "position": [entity.dxf.insert.x, entity.dxf.insert.y],
-                            "height": entity.dxf.height,
-                            "layer": entity.dxf.layer
-                        })
-                elif entity.dxftype() == "MTEXT":
-                    if is_in_bbox(entity.dxf.insert.x, entity.dxf.insert.y):
-                        in_region = True
-                        texts.append({
-                            "text": entity.text,
-                            "position": [entity.dxf.insert.x, entity.dxf.insert.y],
-                            "layer": entity.dxf.layer
-                        })
-                elif hasattr(entity.dxf, 'center'):
-                    if is_in_bbox(entity.dxf.center.x, entity.dxf.center.y):
-                        in_region = True
-                elif hasattr(entity.dxf, 'start'):
-                    if is_in_bbox(entity.dxf.start.x, entity.dxf.start.y):
-                        in_region = True
-                elif hasattr(entity.dxf, 'insert'):
-                    if is_in_bbox(entity.dxf.insert.x, entity.dxf.insert.y):
-                        in_region = True
-            except:
-                pass
-
-            if not in_region:
-                continue
-
-            # 统计实体类型
-            entity_type = entity.dxftype()
-            entities_by_type[entity_type] = entities_by_type.get(entity_type, 0) + 1
-
-            # 统计图层
-            layer = entity.dxf.layer
-            entities_by_layer[layer] = entities_by_layer.get(layer, 0) + 1
+        # 文字内容
+        texts = []
+        text_code = store.type_code("TEXT")
+        for row in rows[store.text_ids[rows] >= 0]:
+            text_info = {
+                "text": store.texts[store.text_ids[row]],
+                "position": store.insert[row].tolist()
+            }
+            if store.type_codes[row] == text_code:
+                text_info["height"] = float(store.text_heights[row])
+            text_info["layer"] = store.layer_names[store.layer_ids[row]]
+            texts.append(text_info)
 
         # 计算区域面积
         area_m2 = round((width * height) / 1000000, 2)
@@ -865,3 +800,24 @@ KIMI_AGENT_TOOLS = [
         }
     }
 ]
+
+
+# ============================================================
+# 调度策略（注册到 ToolRegistry 时使用）
+# ============================================================
+
+# 对顺序敏感的工具（写文件、DWG 转换后删除原文件），不参与并发执行
+SERIAL_TOOLS = frozenset({"write_file", "append_to_file", "convert_dwg_to_dxf"})
+
+
+def tool_scheduling(tool_name: str) -> Dict[str, Any]:
+    """
+    工具的调度参数（ToolRegistry.register_tool 的 serial / executor）
+
+    所有工具都用线程池，CAD 工具也不放进程池：DXF 文档缓存和列式实体存储
+    （dxf_cache / dxf_columnar）是进程内的，进程池的每个 worker 都会各自再解析
+    一遍同一文件，主进程中的渲染也无法复用
+    """
+    from src.core.skills.tool_registry import EXECUTOR_THREAD
+
+    return {"serial": tool_name in SERIAL_TOOLS, "executor": EXECUTOR_THREAD}
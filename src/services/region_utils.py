@@ -16,7 +16,7 @@ def cluster_grids(
     聚类相邻的高密度网格，形成区域
 
     Args:
-        high_density_grids: 高密度网格字典 {(grid_x, grid_y): {entities, layers}}
+        high_density_grids: 高密度网格字典 {(grid_x, grid_y): {entity_count, layers}}
         grid_size: 网格大小（mm）
 
     Returns:
@@ -121,7 +121,7 @@ def _calculate_cluster_bbox(
 
     for grid_key in cluster:
         grid_data = grid_map[grid_key]
-        total_entities += len(grid_data['entities'])
+        total_entities += grid_data['entity_count']
         all_layers.update(grid_data['layers'])
 
     # 计算密度
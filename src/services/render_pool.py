@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+CAD 渲染进程池 - 多区域并行渲染
+
+convert_cad_to_image 原本在调用线程中逐个渲染区域，并限制最多 2 个区域以控制内存。
+本模块提供独立的渲染 worker 进程：
+
+1. worker 使用 spawn 启动、Agg 后端，进程内保留文档缓存和列式实体存储，
+   同一份图纸的后续任务无需重新解析
+2. 一批 bbox 渲染任务同时提交，并发度由 worker 数限定
+3. worker 处理 N 个任务后自动回收重建（max_tasks_per_child），释放 matplotlib /
+   ezdxf 累积的内存碎片
+4. 每个任务结束后检查 worker 的常驻内存，超过软上限时清空进程内缓存
+5. worker 异常退出（如被 OOM 杀掉）时丢弃进程池，未完成的任务在新进程池中重试一次
+
+配置（环境变量）：
+- DXF_RENDER_WORKERS: worker 进程数，默认 2；设为 0 时在调用线程中逐个渲染
+- DXF_RENDER_MAX_JOBS: 每个 worker 处理多少个任务后回收，默认 50
+- DXF_RENDER_WORKER_MAX_RSS: worker 常驻内存软上限（字节），默认 2GB
+"""
+
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional
+
+
+RENDER_WORKERS = int(os.getenv("DXF_RENDER_WORKERS", "2"))
+RENDER_MAX_JOBS = int(os.getenv("DXF_RENDER_MAX_JOBS", "50"))
+RENDER_WORKER_MAX_RSS = int(os.getenv("DXF_RENDER_WORKER_MAX_RSS", str(2 * 1024 ** 3)))
+
+
+def _init_render_worker() -> None:
+    """渲染 worker 初始化：使用无界面的 Agg 后端"""
+    os.environ.setdefault("MPLBACKEND", "Agg")
+    import matplotlib
+    matplotlib.use("Agg")
+
+
+def _current_rss() -> int:
+    """当前进程的常驻内存（字节）；无法读取 /proc 时退化为峰值 RSS"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _trim_worker_memory(max_rss: int) -> None:
+    """常驻内存超过软上限时清空进程内的文档缓存和实体存储"""
+    if max_rss <= 0 or _current_rss() <= max_rss:
+        return
+
+    import gc
+    from .dxf_cache import get_dxf_cache
+    from .dxf_columnar import invalidate_entity_stores
+
+    get_dxf_cache().invalidate()
+    invalidate_entity_stores()
+    gc.collect()
+
+
+def _render_job(job: Dict[str, Any], max_rss: int = 0) -> Dict[str, Any]:
+    """
+    在 worker 中执行一个渲染任务
+
+    Args:
+        job: render_drawing_region 的关键字参数
+        max_rss: 常驻内存软上限，0 表示不检查
+
+    Returns:
+        render_drawing_region 的返回值
+    """
+    from .cad_renderer import render_drawing_region
+
+    try:
+        return render_drawing_region(**job)
+    finally:
+        _trim_worker_memory(max_rss)
+
+
+class RenderPool:
+    """CAD 渲染进程池（线程安全，延迟创建）"""
+
+    def __init__(
+        self,
+        max_workers: int = RENDER_WORKERS,
+        max_jobs_per_worker: int = RENDER_MAX_JOBS,
+        max_worker_rss: int = RENDER_WORKER_MAX_RSS
+    ):
+        """
+        Args:
+            max_workers: worker 进程数，0 表示在调用线程中渲染
+            max_jobs_per_worker: 每个 worker 处理的任务数上限，达到后回收
+            max_worker_rss: worker 常驻内存软上限（字节）
+        """
+        self.max_workers = max_workers
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.max_worker_rss = max_worker_rss
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """获取进程池（首次使用时创建）"""
+        with self._lock:
+            if self._executor is None:
+                # 使用 spawn：调用方可能有事件循环和线程池，fork 不安全
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_render_worker,
+                    max_tasks_per_child=self.max_jobs_per_worker or None
+                )
+            return self._executor
+
+    def _discard_executor(self, executor: ProcessPoolExecutor) -> None:
+        """丢弃已损坏的进程池，下次使用时重建"""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def render_many(self, jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        并行渲染一批区域
+
+        Args:
+            jobs: 任务列表，每个任务是 render_drawing_region 的关键字参数
+                  （file_path、bbox、output_size、layers 等）
+
+        Returns:
+            与 jobs 一一对应的渲染结果
+        """
+        if not jobs:
+            return []
+
+        if self.max_workers <= 0:
+            return [_render_job(job) for job in jobs]
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(jobs)
+        pending = list(range(len(jobs)))
+
+        # worker 异常退出时，未完成的任务在新进程池中重试一次
+        for attempt in range(2):
+            executor = self._get_executor()
+            try:
+                futures = {
+                    i: executor.submit(_render_job, jobs[i], self.max_worker_rss)
+                    for i in pending
+                }
+            except BrokenProcessPool:
+                self._discard_executor(executor)
+                continue
+
+            broken = []
+            for i, future in futures.items():
+                try:
+                    results[i] = future.result()
+                except BrokenProcessPool as e:
+                    broken.append(i)
+                    results[i] = {"success": False, "error": f"渲染进程异常退出: {str(e)}"}
+                except Exception as e:
+                    results[i] = {"success": False, "error": f"渲染失败: {str(e)}"}
+
+            if not broken:
+                break
+            self._discard_executor(executor)
+            pending = broken
+
+        return [
+            result if result is not None else {"success": False, "error": "渲染进程池不可用"}
+            for result in results
+        ]
+
+    def shutdown(self) -> None:
+        """关闭进程池"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+# 全局渲染进程池实例
+_render_pool: Optional[RenderPool] = None
+_render_pool_lock = threading.Lock()
+
+
+def get_render_pool() -> RenderPool:
+    """获取全局渲染进程池实例"""
+    global _render_pool
+    if _render_pool is None:
+        with _render_pool_lock:
+            if _render_pool is None:
+                _render_pool = RenderPool()
+                atexit.register(_render_pool.shutdown)
+    return _render_pool
@@ -13,6 +13,8 @@ from pathlib import Path
 from typing import Dict, Any, List, Optional, Tuple
 import math
 
+import numpy as np
+
 
 def get_drawing_bounds(
     file_path: str,
@@ -35,7 +37,7 @@ def get_drawing_bounds(
         - error: str (如果失败)
     """
     try:
-        import ezdxf
+        from .dxf_columnar import get_entity_store
 
         if not os.path.exists(file_path):
             return {
@@ -43,48 +45,26 @@ def get_drawing_bounds(
                 "error": f"文件不存在: {file_path}"
             }
 
-        # 读取 DXF 文件
-        doc = ezdxf.readfile(file_path)
-        msp = doc.modelspace()
+        # 列式实体存储（进程内缓存，每个文档版本只构建一次）
+        store = get_entity_store(file_path)
 
-        # 计算图纸边界
-        min_x, min_y = float('inf'), float('inf')
-        max_x, max_y = float('-inf'), float('-inf')
-
-        # 存储所有实体的位置信息
-        entity_positions = []
-
-        for entity in msp:
-            # 图层过滤
-            if layers and entity.dxf.layer not in layers:
-                continue
-
-            # 获取实体的边界框
-            try:
-                bbox = _get_entity_bbox(entity)
-                if bbox:
-                    min_x = min(min_x, bbox['min_x'])
-                    min_y = min(min_y, bbox['min_y'])
-                    max_x = max(max_x, bbox['max_x'])
-                    max_y = max(max_y, bbox['max_y'])
-
-                    # 记录实体位置（用于区域识别）
-                    entity_positions.append({
-                        'center_x': (bbox['min_x'] + bbox['max_x']) / 2,
-                        'center_y': (bbox['min_y'] + bbox['max_y']) / 2,
-                        'layer': entity.dxf.layer,
-                        'type': entity.dxftype()
-                    })
-            except:
-                continue
+        # 有包围盒的实体，按图层过滤
+        rows = np.nonzero(~np.isnan(store.bboxes).any(axis=1))[0]
+        if layers:
+            rows = rows[store.layer_mask(layers, rows)]
 
         # 如果没有找到任何实体
-        if min_x == float('inf'):
+        if len(rows) == 0:
             return {
                 "success": False,
                 "error": "图纸中没有找到有效实体"
             }
 
+        # 计算图纸边界
+        boxes = store.bboxes[rows]
+        min_x, min_y = float(boxes[:, 0].min()), float(boxes[:, 1].min())
+        max_x, max_y = float(boxes[:, 2].max()), float(boxes[:, 3].max())
+
         # 计算图纸尺寸
         width = max_x - min_x
         height = max_y - min_y
@@ -99,8 +79,11 @@ def get_drawing_bounds(
         }
 
         # 识别关键区域
+        centers = (boxes[:, :2] + boxes[:, 2:]) / 2
         regions = _identify_key_regions(
-            entity_positions,
+            centers,
+            store.layer_ids[rows],
+            store.layer_names,
             bounds,
             grid_size
         )
@@ -109,7 +92,7 @@ def get_drawing_bounds(
             "success": True,
             "bounds": bounds,
             "regions": regions,
-            "total_entities": len(entity_positions)
+            "total_entities": len(rows)
         }
 
     except ImportError:
@@ -124,91 +107,11 @@ def get_drawing_bounds(
         }
 
 
-def _get_entity_bbox(entity) -> Optional[Dict[str, float]]:
-    """
-    获取实体的边界框
-
-    Returns:
-        {min_x, min_y, max_x, max_y} 或 None
-    """
-    entity_type = entity.dxftype()
-
-    try:
-        if entity_type == "LINE":
-            return {
-                'min_x': min(entity.dxf.start.x, entity.dxf.end.x),
-                'min_y': min(entity.dxf.start.y, entity.dxf.end.y),
-                'max_x': max(entity.dxf.start.x, entity.dxf.end.x),
-                'max_y': max(entity.dxf.start.y, entity.dxf.end.y)
-            }
-
-        elif entity_type == "CIRCLE":
-            cx, cy, r = entity.dxf.center.x, entity.dxf.center.y, entity.dxf.radius
-            return {
-                'min_x': cx - r,
-                'min_y': cy - r,
-                'max_x': cx + r,
-                'max_y': cy + r
-            }
-
-        elif entity_type == "ARC":
-            cx, cy, r = entity.dxf.center.x, entity.dxf.center.y, entity.dxf.radius
-            return {
-                'min_x': cx - r,
-                'min_y': cy - r,
-                'max_x': cx + r,
-                'max_y': cy + r
-            }
-
-        elif entity_type in ["LWPOLYLINE", "POLYLINE"]:
-            if entity_type == "LWPOLYLINE":
-                points = list(entity.get_points())
-            else:
-                points = [(v.dxf.location.x, v.dxf.location.y) for v in entity.vertices]
-
-            if not points:
-                return None
-
-            xs = [p[0] for p in points]
-            ys = [p[1] for p in points]
-            return {
-                'min_x': min(xs),
-                'min_y': min(ys),
-                'max_x': max(xs),
-                'max_y': max(ys)
-            }
-
-        elif entity_type in ["TEXT", "MTEXT"]:
-            x = entity.dxf.insert.x
-            y = entity.dxf.insert.y
-            # 文字边界框估算（简化处理）
-            height = entity.dxf.height if entity_type == "TEXT" else entity.dxf.char_height
-            width = height * 10  # 粗略估算
-            return {
-                'min_x': x,
-                'min_y': y,
-                'max_x': x + width,
-                'max_y': y + height
-            }
-
-        elif entity_type == "INSERT":
-            x = entity.dxf.insert.x
-            y = entity.dxf.insert.y
-            # 块引用边界框估算
-            return {
-                'min_x': x - 100,
-                'min_y': y - 100,
-                'max_x': x + 100,
-                'max_y': y + 100
-            }
-
-    except:
-        pass
-
-    return None
-
-
-def _create_full_region(entity_positions: List[Dict], bounds: Dict[str, float]) -> Dict[str, Any]:
+def _create_full_region(
+    entity_count: int,
+    layer_names: List[str],
+    bounds: Dict[str, float]
+) -> Dict[str, Any]:
     """创建全图区域（作为后备方案）"""
     return {
         "name": "全图区域",
@@ -218,15 +121,17 @@ def _create_full_region(entity_positions: List[Dict], bounds: Dict[str, float])
             "width": bounds["width"],
             "height": bounds["height"]
         },
-        "entity_count": len(entity_positions),
-        "density": len(entity_positions) / (bounds["width"] * bounds["height"]) if bounds["width"] * bounds["height"] > 0 else 0,
-        "layers": list(set(e['layer'] for e in entity_positions)),
+        "entity_count": entity_count,
+        "density": entity_count / (bounds["width"] * bounds["height"]) if bounds["width"] * bounds["height"] > 0 else 0,
+        "layers": layer_names,
         "grid_count": 1
     }
 
 
 def _identify_key_regions(
-    entity_positions: List[Dict],
+    centers: np.ndarray,
+    layer_ids: np.ndarray,
+    layer_names: List[str],
     bounds: Dict[str, float],
     grid_size: int
 ) -> List[Dict[str, Any]]:
@@ -234,48 +139,51 @@ def _identify_key_regions(
     识别图纸中的关键区域
 
     使用网格密度分析识别实体集中的区域
+
+    Args:
+        centers: 实体包围盒中心 (N, 2)
+        layer_ids: 实体图层编号 (N,)
+        layer_names: 图层编号对应的名称
+        bounds: 图纸边界
+        grid_size: 网格大小（mm）
     """
-    if not entity_positions:
+    if len(centers) == 0:
         return []
 
-    # 步骤 1: 将实体分配到网格
-    grid_map = {}  # {(grid_x, grid_y): {"entities": [...], "layers": set()}}
-
-    for entity in entity_positions:
-        grid_x = int(entity['center_x'] // grid_size)
-        grid_y = int(entity['center_y'] // grid_size)
-        grid_key = (grid_x, grid_y)
-
-        if grid_key not in grid_map:
-            grid_map[grid_key] = {"entities": [], "layers": set()}
+    # 步骤 1: 将实体分配到网格（向量化计算网格坐标和每个网格的实体数）
+    grids = np.floor_divide(centers, grid_size).astype(np.int64)
+    grid_keys, inverse, entity_counts = np.unique(grids, axis=0, return_inverse=True, return_counts=True)
+    inverse = inverse.reshape(-1)
 
-        grid_map[grid_key]["entities"].append(entity)
-        grid_map[grid_key]["layers"].add(entity['layer'])
+    # 步骤 2: 计算密度阈值（使用 75 分位数作为高密度阈值）
+    sorted_counts = np.sort(entity_counts)
+    percentile_75_idx = int(len(sorted_counts) * 0.75)
+    density_threshold = sorted_counts[min(percentile_75_idx, len(sorted_counts) - 1)]
 
-    # 步骤 2: 计算密度阈值（使用中位数）
-    entity_counts = [len(g["entities"]) for g in grid_map.values()]
-    entity_counts.sort()
-
-    if len(entity_counts) == 0:
-        return []
+    # 至少要有 3 个实体才算高密度
+    density_threshold = max(int(density_threshold), 3)
 
-    # 使用 75 分位数作为高密度阈值
-    percentile_75_idx = int(len(entity_counts) * 0.75)
-    density_threshold = entity_counts[percentile_75_idx] if percentile_75_idx < len(entity_counts) else entity_counts[-1]
+    # 步骤 3: 筛选高密度网格，统计每个网格的图层
+    dense = entity_counts >= density_threshold
+    if not dense.any():
+        # 如果没有高密度区域，返回全图
+        used_layers = [layer_names[i] for i in np.unique(layer_ids)]
+        return [_create_full_region(len(centers), used_layers, bounds)]
 
-    # 至少要有 3 个实体才算高密度
-    density_threshold = max(density_threshold, 3)
+    grid_layers = {}
+    in_dense = dense[inverse]
+    pairs = np.unique(np.stack((inverse[in_dense], layer_ids[in_dense]), axis=1), axis=0)
+    for grid_index, layer_id in pairs:
+        grid_layers.setdefault(int(grid_index), set()).add(layer_names[layer_id])
 
-    # 步骤 3: 筛选高密度网格
     high_density_grids = {
-        k: v for k, v in grid_map.items()
-        if len(v["entities"]) >= density_threshold
+        (int(grid_keys[i][0]), int(grid_keys[i][1])): {
+            "entity_count": int(entity_counts[i]),
+            "layers": grid_layers[int(i)]
+        }
+        for i in np.nonzero(dense)[0]
     }
 
-    if not high_density_grids:
-        # 如果没有高密度区域，返回全图
-        return [_create_full_region(entity_positions, bounds)]
-
     # 步骤 4: 聚类相邻网格
     from services.region_utils import cluster_grids
     regions = cluster_grids(high_density_grids, grid_size)
@@ -283,7 +191,10 @@ def _identify_key_regions(
     # 步骤 5: 按密度排序
     regions.sort(key=lambda r: r['density'], reverse=True)
 
-    return regions if regions else [_create_full_region(entity_positions, bounds)]
+    if regions:
+        return regions
+    used_layers = [layer_names[i] for i in np.unique(layer_ids)]
+    return [_create_full_region(len(centers), used_layers, bounds)]
 
 
 # 工具定义
@@ -1,14 +1,72 @@
 """
 Search service with semantic search using pgvector.
+
+Task search uses the partial HNSW index idx_tasks_embedding_hnsw
+(migrations/add_vector_indexes.sql). Search quality/latency is tuned per query:
+- VECTOR_SEARCH_EF_SEARCH: hnsw.ef_search (candidate list size, raised to at least
+  the result limit); higher improves recall at the cost of latency
+- VECTOR_SEARCH_ITERATIVE_SCAN: hnsw.iterative_scan (pgvector >= 0.8, e.g.
+  "relaxed_order") so status/priority filters still return `limit` rows; empty disables
+
+Hybrid search (search_tasks) fuses a pg_trgm keyword ranking on title/description
+(migrations/add_task_trigram_indexes.sql) with the vector ranking using reciprocal
+rank fusion, in a single SQL statement. Clearly lexical queries (quoted phrases,
+task IDs) use the keyword ranking only and skip embedding generation:
+- HYBRID_SEARCH_CANDIDATES: candidates taken from each ranking before fusion
+- HYBRID_SEARCH_RRF_K: RRF constant k in 1 / (k + rank)
 """
-from typing import List, Optional
+import os
+import re
+from typing import List, Optional, Tuple
 from uuid import UUID
 
-from sqlalchemy import select, func
+from sqlalchemy import select, func, text, or_, case, literal, Float, cast
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.infrastructure.database.models import Task
-from src.core.memory.embedding_service import EmbeddingService
+from src.core.memory.embedding_service import get_embedding_service
+
+
+VECTOR_SEARCH_EF_SEARCH = int(os.getenv("VECTOR_SEARCH_EF_SEARCH", "100"))
+VECTOR_SEARCH_ITERATIVE_SCAN = os.getenv("VECTOR_SEARCH_ITERATIVE_SCAN", "")
+HYBRID_SEARCH_CANDIDATES = int(os.getenv("HYBRID_SEARCH_CANDIDATES", "50"))
+HYBRID_SEARCH_RRF_K = int(os.getenv("HYBRID_SEARCH_RRF_K", "60"))
+
+# Search modes
+MODE_AUTO = "auto"
+MODE_HYBRID = "hybrid"
+MODE_SEMANTIC = "semantic"
+MODE_KEYWORD = "keyword"
+SEARCH_MODES = (MODE_AUTO, MODE_HYBRID, MODE_SEMANTIC, MODE_KEYWORD)
+
+_QUOTED = re.compile(r"""^\s*["'“‘「『《](.+?)["'”’」』》]\s*$""")
+_UUID = re.compile(r"^[0-9a-fA-F]{8}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{12}$")
+
+
+def lexical_term(query: str) -> Optional[str]:
+    """
+    Return the literal search term if the query is clearly lexical.
+
+    Lexical queries are a quoted phrase ("周报", 「周报」) or a task ID.
+
+    Args:
+        query: Search query
+
+    Returns:
+        Term to match literally, or None for natural-language queries
+    """
+    stripped = query.strip()
+    quoted = _QUOTED.match(stripped)
+    if quoted:
+        return quoted.group(1).strip()
+    if _UUID.match(stripped):
+        return stripped
+    return None
+
+
+def _escape_like(term: str) -> str:
+    """Escape LIKE wildcards in a user-provided term."""
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
 
 
 class SearchService:
@@ -16,14 +74,15 @@ class SearchService:
 
     def __init__(self, db: AsyncSession):
         self.db = db
-        self.embedding_service = EmbeddingService()
+        self.embedding_service = get_embedding_service()
 
     async def search_tasks_semantic(
         self,
         query: str,
         limit: int = 20,
         status_filter: Optional[List[str]] = None,
-        priority_filter: Optional[List[str]] = None
+        priority_filter: Optional[List[str]] = None,
+        ef_search: Optional[int] = None
     ) -> List[Task]:
         """
         Search tasks using semantic similarity.
@@ -33,6 +92,7 @@ class SearchService:
             limit: Maximum number of results
             status_filter: Filter by task status
             priority_filter: Filter by task priority
+            ef_search: HNSW candidate list size (defaults to VECTOR_SEARCH_EF_SEARCH)
 
         Returns:
             List of tasks ordered by relevance
@@ -40,7 +100,14 @@ class SearchService:
         # Generate embedding for query
         query_embedding = await self.embedding_service.generate(query)
 
-        # Build query
+        # Tune the HNSW scan for this transaction only
+        await self._configure_vector_scan(
+            limit,
+            ef_search,
+            filtered=bool(status_filter or priority_filter)
+        )
+
+        # Build query (deleted_at IS NULL matches the partial HNSW index)
         stmt = select(Task).where(Task.deleted_at.is_(None))
 
         # Apply filters
@@ -56,3 +123,166 @@ class SearchService:
 
         result = await self.db.execute(stmt)
         return list(result.scalars().all())
+
+    async def search_tasks(
+        self,
+        query: str,
+        limit: int = 20,
+        status_filter: Optional[List[str]] = None,
+        priority_filter: Optional[List[str]] = None,
+        mode: str = MODE_AUTO,
+        ef_search: Optional[int] = None
+    ) -> Tuple[List[Task], str]:
+        """
+        Search tasks with keyword, vector or hybrid ranking.
+
+        Args:
+            query: Search query
+            limit: Maximum number of results
+            status_filter: Filter by task status
+            priority_filter: Filter by task priority
+            mode: auto (keyword for lexical queries, otherwise hybrid), hybrid, semantic or keyword
+            ef_search: HNSW candidate list size (vector ranking only)
+
+        Returns:
+            (tasks ordered by relevance, mode actually used)
+        """
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode: {mode}")
+
+        term = lexical_term(query)
+        if mode == MODE_AUTO:
+            mode = MODE_KEYWORD if term is not None else MODE_HYBRID
+
+        if mode == MODE_SEMANTIC:
+            tasks = await self.search_tasks_semantic(query, limit, status_filter, priority_filter, ef_search)
+            return tasks, mode
+
+        keyword = term if term is not None else query.strip()
+        conditions = self._task_filters(status_filter, priority_filter)
+
+        if mode == MODE_KEYWORD:
+            score = self._keyword_score(keyword)
+            stmt = (
+                select(Task)
+                .where(*conditions, self._keyword_match(keyword))
+                .order_by(score.desc(), Task.updated_at.desc())
+                .limit(limit)
+            )
+            result = await self.db.execute(stmt)
+            return list(result.scalars().all()), mode
+
+        # Hybrid: one statement, both rankings fused with RRF
+        query_embedding = await self.embedding_service.generate(query)
+        candidates = max(HYBRID_SEARCH_CANDIDATES, limit)
+        await self._configure_vector_scan(
+            candidates,
+            ef_search,
+            filtered=bool(status_filter or priority_filter)
+        )
+
+        distance = Task.embedding.cosine_distance(query_embedding)
+        vector_ranked = (
+            select(Task.id, func.row_number().over(order_by=distance).label("rank"))
+            .where(*conditions, Task.embedding.isnot(None))
+            .order_by(distance)
+            .limit(candidates)
+            .cte("vector_ranked")
+        )
+
+        score = self._keyword_score(keyword)
+        keyword_ranked = (
+            select(Task.id, func.row_number().over(order_by=score.desc()).label("rank"))
+            .where(*conditions, self._keyword_match(keyword))
+            .order_by(score.desc())
+            .limit(candidates)
+            .cte("keyword_ranked")
+        )
+
+        k = cast(HYBRID_SEARCH_RRF_K, Float)
+        fused_score = (
+            func.coalesce(1.0 / (k + vector_ranked.c.rank), 0.0)
+            + func.coalesce(1.0 / (k + keyword_ranked.c.rank), 0.0)
+        )
+        fused = (
+            select(
+                func.coalesce(vector_ranked.c.id, keyword_ranked.c.id).label("id"),
+                fused_score.label("score")
+            )
+            .select_from(
+                vector_ranked.join(
+                    keyword_ranked,
+                    vector_ranked.c.id == keyword_ranked.c.id,
+                    full=True
+                )
+            )
+            .subquery("fused")
+        )
+
+        stmt = (
+            select(Task)
+            .join(fused, Task.id == fused.c.id)
+            .order_by(fused.c.score.desc())
+            .limit(limit)
+        )
+        result = await self.db.execute(stmt)
+        return list(result.scalars().all()), mode
+
+    @staticmethod
+    def _task_filters(
+        status_filter: Optional[List[str]],
+        priority_filter: Optional[List[str]]
+    ) -> list:
+        """Common WHERE conditions (deleted_at IS NULL matches the partial indexes)."""
+        conditions = [Task.deleted_at.is_(None)]
+        if status_filter:
+            conditions.append(Task.status.in_(status_filter))
+        if priority_filter:
+            conditions.append(Task.priority.in_(priority_filter))
+        return conditions
+
+    @staticmethod
+    def _keyword_match(term: str):
+        """Keyword filter: substring match or trigram word similarity (pg_trgm index-backed)."""
+        if _UUID.match(term):
+            return Task.id == UUID(term)
+        pattern = f"%{_escape_like(term)}%"
+        return or_(
+            Task.title.ilike(pattern),
+            Task.description.ilike(pattern),
+            literal(term).op("<%")(Task.title),
+            literal(term).op("<%")(Task.description)
+        )
+
+    @staticmethod
+    def _keyword_score(term: str):
+        """Keyword relevance: title substring first, then trigram word similarity."""
+        if _UUID.match(term):
+            return cast(literal(1.0), Float)
+        pattern = f"%{_escape_like(term)}%"
+        return (
+            case((Task.title.ilike(pattern), 1.0), else_=0.0)
+            + func.word_similarity(term, Task.title)
+            + 0.5 * func.word_similarity(term, func.coalesce(Task.description, ""))
+        )
+
+    async def _configure_vector_scan(
+        self,
+        limit: int,
+        ef_search: Optional[int] = None,
+        filtered: bool = False
+    ) -> None:
+        """
+        Set HNSW search parameters for the current transaction (SET LOCAL).
+
+        Args:
+            limit: Number of results requested (ef_search is at least this)
+            ef_search: HNSW candidate list size
+            filtered: Whether the query has extra filters (enables iterative scan if configured)
+        """
+        ef = max(int(ef_search or VECTOR_SEARCH_EF_SEARCH), int(limit))
+        # SET does not accept bind parameters; ef is an int
+        await self.db.execute(text(f"SET LOCAL hnsw.ef_search = {ef}"))
+
+        if filtered and VECTOR_SEARCH_ITERATIVE_SCAN in ("relaxed_order", "strict_order"):
+            await self.db.execute(text(f"SET LOCAL hnsw.iterative_scan = {VECTOR_SEARCH_ITERATIVE_SCAN}"))
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+CAD 瓦片缓存 - 区域渲染的瓦片金字塔
+
+render_drawing_region 每次都从头渲染整个区域，Agent 反复查看重叠或相同区域时
+每次都要付出完整的 matplotlib 渲染代价。瓦片模式下：
+
+1. 以图纸范围为锚点建立金字塔：第 z 级把图纸边长等分为 2^z 块，每块渲染为
+   TILE_SIZE × TILE_SIZE 像素的瓦片；z 可以为负（一块瓦片是图纸边长的 2^-z 倍），
+   缩小到远大于图纸的 bbox 时仍只需少量瓦片
+2. 请求任意 bbox 时，选择分辨率不低于输出要求的最小层级，取覆盖 bbox 的瓦片
+   （缺失的瓦片按需渲染并写入磁盘），拼接后裁剪缩放到输出尺寸；图纸范围以外的
+   瓦片不渲染，直接填白底
+3. 瓦片按 (文件内容哈希, 图层, 配色, 层级, x, y) 缓存在磁盘上；总大小超过上限时
+   按最近使用时间（文件 mtime，命中时刷新）淘汰最旧的瓦片
+
+配置（环境变量）：
+- DXF_TILE_DIR: 瓦片目录，默认 workspace/.tiles
+- DXF_TILE_SIZE: 瓦片边长（像素），默认 512
+- DXF_TILE_CACHE_MAX_BYTES: 瓦片缓存总大小上限，默认 1GB
+- DXF_TILE_MAX_MOSAIC_PIXELS: 拼接图的像素上限，超过时改为直接渲染，默认 64M
+"""
+
+import hashlib
+import json
+import math
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+TILE_DIR = os.getenv("DXF_TILE_DIR", "workspace/.tiles")
+TILE_SIZE = int(os.getenv("DXF_TILE_SIZE", "512"))
+TILE_CACHE_MAX_BYTES = int(os.getenv("DXF_TILE_CACHE_MAX_BYTES", str(1024 ** 3)))
+TILE_MAX_MOSAIC_PIXELS = int(os.getenv("DXF_TILE_MAX_MOSAIC_PIXELS", str(64 * 1024 * 1024)))
+
+# 层级范围（第 z 级瓦片边长为图纸边长的 1/2^z，负层级的瓦片比图纸大）
+MIN_TILE_ZOOM = -24
+MAX_TILE_ZOOM = 24
+
+# 渲染样式版本：渲染逻辑变化时递增，旧瓦片自动失效
+TILE_STYLE_VERSION = 2
+
+# 淘汰时清理到上限的比例，避免每写一个瓦片都触发一次淘汰
+EVICT_TARGET_RATIO = 0.9
+
+
+class TileCache:
+    """磁盘瓦片缓存（线程安全，多进程共享同一目录）"""
+
+    def __init__(
+        self,
+        cache_dir: str = TILE_DIR,
+        tile_size: int = TILE_SIZE,
+        max_bytes: int = TILE_CACHE_MAX_BYTES
+    ):
+        """
+        Args:
+            cache_dir: 瓦片目录
+            tile_size: 瓦片边长（像素）
+            max_bytes: 瓦片缓存总大小上限（字节）
+        """
+        self.cache_dir = Path(cache_dir)
+        self.tile_size = tile_size
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        # 目录当前总大小，首次写入时扫描目录得到
+        self._current_bytes: Optional[int] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # ------------------------------------------------------------
+    # 金字塔坐标
+    # ------------------------------------------------------------
+
+    @staticmethod
+    def pyramid_origin(store, bbox: Dict[str, float]) -> Tuple[float, float, float]:
+        """
+        金字塔锚点 (origin_x, origin_y, 第 0 级瓦片边长)
+
+        以图纸实体范围为锚点，同一份图纸的所有请求共享同一套瓦片
+        """
+        extents = store.index_extents
+        if extents is None:
+            return bbox['x'], bbox['y'], max(bbox['width'], bbox['height'], 1.0)
+        min_x, min_y, max_x, max_y = extents
+        return min_x, min_y, max(max_x - min_x, max_y - min_y, 1.0)
+
+    def zoom_for(self, base_size: float, units_per_pixel: float) -> int:
+        """分辨率不低于 units_per_pixel 的最小层级"""
+        if units_per_pixel <= 0:
+            return MAX_TILE_ZOOM
+        zoom = math.ceil(math.log2(base_size / (self.tile_size * units_per_pixel)) - 1e-9)
+        return min(max(zoom, MIN_TILE_ZOOM), MAX_TILE_ZOOM)
+
+    @staticmethod
+    def _style_key(layers: Optional[List[str]], color_mode: str, tile_size: int) -> str:
+        """图层过滤、配色和瓦片尺寸决定的样式 key"""
+        style = json.dumps([sorted(layers) if layers else None, color_mode, tile_size, TILE_STYLE_VERSION])
+        return hashlib.sha1(style.encode("utf-8")).hexdigest()[:16]
+
+    def _tile_path(self, file_hash: str, style: str, zoom: int, tx: int, ty: int) -> Path:
+        return self.cache_dir / file_hash / style / str(zoom) / f"{tx}_{ty}.png"
+
+    # ------------------------------------------------------------
+    # 瓦片读写
+    # ------------------------------------------------------------
+
+    def get_tile(
+        self,
+        store,
+        path: Path,
+        tile_bbox: Dict[str, float],
+        layers: Optional[List[str]],
+        color_mode: str
+    ) -> Tuple[np.ndarray, bool]:
+        """
+        读取瓦片，缺失时渲染并写入磁盘
+
+        Returns:
+            (RGB 像素数组, 是否命中缓存)
+        """
+        from PIL import Image
+
+        try:
+            with Image.open(path) as image:
+                pixels = np.asarray(image.convert("RGB"))
+            # 刷新 mtime 作为最近使用时间
+            os.utime(path)
+            with self._lock:
+                self.hits += 1
+            return pixels, True
+        except (OSError, ValueError):
+            pass
+
+        from .cad_renderer import render_tile_image
+        pixels = render_tile_image(store, tile_bbox, self.tile_size, layers, color_mode)
+
+        # 临时文件不用 .png 后缀：容量扫描（rglob("*.png")）不会统计或淘汰写了一半的文件
+        tmp_path = path.with_name(f".{path.stem}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            Image.fromarray(pixels).save(tmp_path, "PNG")
+            os.replace(tmp_path, path)
+            written = path.stat().st_size
+        except OSError:
+            written = 0
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+
+        with self._lock:
+            self.misses += 1
+            if self._current_bytes is not None:
+                self._current_bytes += written
+        self._evict_if_needed()
+
+        return pixels, False
+
+    def render_region(
+        self,
+        file_path: str,
+        store,
+        bbox: Dict[str, float],
+        size: Tuple[int, int],
+        layers: Optional[List[str]],
+        color_mode: str,
+        output_path: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        由瓦片拼接出 bbox 区域的图片并保存到 output_path
+
+        Args:
+            file_path: DXF 文件路径
+            store: 列式实体存储
+            bbox: 区域 {"x","y","width","height"}
+            size: 输出尺寸 (宽, 高)，宽高比应与 bbox 一致
+            layers: 要渲染的图层列表
+            color_mode: "by_layer" 或 "monochrome"
+            output_path: 输出文件路径
+
+        Returns:
+            {"zoom": 层级, "tiles": 瓦片数, "rendered": 新渲染的瓦片数}；
+            拼接图超过 DXF_TILE_MAX_MOSAIC_PIXELS 时不渲染并返回 None（调用方改为直接渲染）
+        """
+        from PIL import Image
+        from .dxf_sidecar import file_digest
+
+        width, height = size
+        tile_size = self.tile_size
+        origin_x, origin_y, base_size = self.pyramid_origin(store, bbox)
+        zoom = self.zoom_for(base_size, bbox['width'] / width)
+        tile_world = math.ldexp(base_size, -zoom)
+        units_per_pixel = tile_world / tile_size
+        # 该层级金字塔每边的瓦片数（负层级时一块瓦片即覆盖整张图纸）
+        pyramid_tiles = 1 << max(zoom, 0)
+
+        # 覆盖 bbox 的瓦片范围（闭区间）
+        tx0 = math.floor((bbox['x'] - origin_x) / tile_world)
+        ty0 = math.floor((bbox['y'] - origin_y) / tile_world)
+        tx1 = max(math.ceil((bbox['x'] + bbox['width'] - origin_x) / tile_world) - 1, tx0)
+        ty1 = max(math.ceil((bbox['y'] + bbox['height'] - origin_y) / tile_world) - 1, ty0)
+
+        mosaic_shape = ((ty1 - ty0 + 1) * tile_size, (tx1 - tx0 + 1) * tile_size, 3)
+        if mosaic_shape[0] * mosaic_shape[1] > TILE_MAX_MOSAIC_PIXELS:
+            return None
+
+        # 只有金字塔范围内的瓦片有内容，范围外保持白底
+        ix0, ix1 = max(tx0, 0), min(tx1, pyramid_tiles - 1)
+        iy0, iy1 = max(ty0, 0), min(ty1, pyramid_tiles - 1)
+
+        file_hash = file_digest(file_path)
+        style = self._style_key(layers, color_mode, tile_size)
+
+        # 拼接：瓦片 y 向上递增，图片行向下递增
+        mosaic = np.full(mosaic_shape, 255, dtype=np.uint8)
+        rendered = 0
+        for ty in range(iy0, iy1 + 1):
+            for tx in range(ix0, ix1 + 1):
+                tile_bbox = {
+                    "x": origin_x + tx * tile_world,
+                    "y": origin_y + ty * tile_world,
+                    "width": tile_world,
+                    "height": tile_world
+                }
+                pixels, hit = self.get_tile(
+                    store, self._tile_path(file_hash, style, zoom, tx, ty),
+                    tile_bbox, layers, color_mode
+                )
+                rendered += not hit
+                row = (ty1 - ty) * tile_size
+                col = (tx - tx0) * tile_size
+                mosaic[row:row + tile_size, col:col + tile_size] = pixels
+
+        # 裁剪到 bbox 并缩放到输出尺寸
+        mosaic_left = origin_x + tx0 * tile_world
+        mosaic_top = origin_y + (ty1 + 1) * tile_world
+        crop = (
+            (bbox['x'] - mosaic_left) / units_per_pixel,
+            (mosaic_top - bbox['y'] - bbox['height']) / units_per_pixel,
+            (bbox['x'] + bbox['width'] - mosaic_left) / units_per_pixel,
+            (mosaic_top - bbox['y']) / units_per_pixel
+        )
+        image = Image.fromarray(mosaic).resize((width, height), Image.LANCZOS, box=crop)
+        image.save(output_path, "PNG")
+
+        return {
+            "zoom": zoom,
+            "tiles": max(ix1 - ix0 + 1, 0) * max(iy1 - iy0 + 1, 0),
+            "rendered": rendered
+        }
+
+    # ------------------------------------------------------------
+    # 容量管理
+    # ------------------------------------------------------------
+
+    def _scan(self) -> List[Tuple[float, int, Path]]:
+        """扫描目录中的所有瓦片：(mtime, 大小, 路径)"""
+        tiles = []
+        if not self.cache_dir.exists():
+            return tiles
+        for path in self.cache_dir.rglob("*.png"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            tiles.append((stat.st_mtime, stat.st_size, path))
+        return tiles
+
+    def _evict_if_needed(self) -> None:
+        """总大小超过上限时，按最近使用时间淘汰最旧的瓦片"""
+        with self._lock:
+            if self._current_bytes is None:
+                self._current_bytes = sum(size for _, size, _ in self._scan())
+            if self._current_bytes <= self.max_bytes:
+                return
+
+            # 其他进程也在写同一目录，淘汰前重新扫描
+            tiles = sorted(self._scan())
+            total = sum(size for _, size, _ in tiles)
+            target = int(self.max_bytes * EVICT_TARGET_RATIO)
+            for _, size, path in tiles:
+                if total <= target:
+                    break
+                try:
+                    path.unlink()
+                except OSError:
+                    continue
+                total -= size
+                self.evictions += 1
+            self._current_bytes = total
+
+    def clear(self, file_path: Optional[str] = None) -> int:
+        """
+        删除瓦片
+
+        Args:
+            file_path: 只删除该文件的瓦片，为空时删除全部
+
+        Returns:
+            删除的瓦片数
+        """
+        import shutil
+
+        if file_path is None:
+            root = self.cache_dir
+        else:
+            from .dxf_sidecar import file_digest
+            root = self.cache_dir / file_digest(file_path)
+
+        removed = sum(1 for _ in root.rglob("*.png")) if root.exists() else 0
+        shutil.rmtree(root, ignore_errors=True)
+        with self._lock:
+            self._current_bytes = None
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "current_bytes": self._current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0
+            }
+
+
+# 全局瓦片缓存实例
+_tile_cache: Optional[TileCache] = None
+_tile_cache_lock = threading.Lock()
+
+
+def get_tile_cache() -> TileCache:
+    """获取全局瓦片缓存实例"""
+    global _tile_cache
+    if _tile_cache is None:
+        with _tile_cache_lock:
+            if _tile_cache is None:
+                _tile_cache = TileCache()
+    return _tile_cache
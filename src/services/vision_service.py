@@ -10,22 +10,25 @@
 from typing import Dict, Any, Optional
 import os
 import base64
-from openai import OpenAI
 from dotenv import load_dotenv
 
 # 加载环境变量
 load_dotenv()
 
+# 区域模式默认最多渲染的区域数（区域在渲染进程池中并行渲染）
+MAX_RENDER_REGIONS = int(os.getenv("DXF_RENDER_MAX_REGIONS", "16"))
+
 
 def get_vision_client():
-    """获取视觉模型客户端"""
+    """获取视觉模型客户端（进程内共享，连接在多次调用间复用）"""
     base_url = os.getenv("VISION_MODEL_BASE_URL", "https://api.moonshot.cn/v1")
     api_key = os.getenv("VISION_MODEL_API_KEY")
 
     if not api_key:
         raise ValueError("未配置VISION_MODEL_API_KEY环境变量")
 
-    return OpenAI(base_url=base_url, api_key=api_key)
+    from src.infrastructure.llm.client_pool import get_llm_client_pool
+    return get_llm_client_pool().get_sync_client("vision", base_url=base_url, api_key=api_key)
 
 
 def convert_cad_to_image(
@@ -33,7 +36,7 @@ def convert_cad_to_image(
     output_format: str = "png",
     layers: Optional[list] = None,
     render_mode: str = "regions",
-    max_regions: int = 2
+    max_regions: Optional[int] = None
 ) -> Dict[str, Any]:
     """
     将CAD文件转换为图片
@@ -43,7 +46,7 @@ def convert_cad_to_image(
         output_format: 输出格式（png/jpg/pdf）
         layers: 要显示的图层列表（可选）
         render_mode: 渲染模式 - "regions"(多个高密度区域) 或 "overview"(全图概览)
-        max_regions: 最多渲染的区域数量（默认2，避免内存过载）
+        max_regions: 最多渲染的区域数量（默认 DXF_RENDER_MAX_REGIONS，区域在渲染进程池中并行渲染）
 
     Returns:
         Dict包含：
@@ -54,6 +57,7 @@ def convert_cad_to_image(
     try:
         from services.rendering_service import get_drawing_bounds
         from services.cad_renderer import render_drawing_region
+        from services.render_pool import get_render_pool
 
         if not os.path.exists(file_path):
             return {
@@ -98,17 +102,21 @@ def convert_cad_to_image(
                 })
 
         else:  # render_mode == "regions"
-            # 渲染前 max_regions 个高密度区域
+            # 高密度区域在渲染进程池中并行渲染
+            if max_regions is None:
+                max_regions = MAX_RENDER_REGIONS
             regions = bounds_result["regions"][:max_regions]
+            jobs = [
+                {
+                    "file_path": file_path,
+                    "bbox": region["bbox"],
+                    "output_size": (2048, 2048),
+                    "layers": layers
+                }
+                for region in regions
+            ]
 
-            for i, region in enumerate(regions, 1):
-                result = render_drawing_region(
-                    file_path,
-                    bbox=region["bbox"],
-                    output_size=(2048, 2048),
-                    layers=layers
-                )
-
+            for region, result in zip(regions, get_render_pool().render_many(jobs)):
                 if result["success"]:
                     image_paths.append(result["image_path"])
                     regions_info.append({
@@ -19,7 +19,8 @@ from src.services.kimi_agent_tools import (
     read_file,
     write_file,
     append_to_file,
-    KIMI_AGENT_TOOLS
+    KIMI_AGENT_TOOLS,
+    tool_scheduling
 )
 
 
@@ -115,7 +116,8 @@ def initialize_cost_tools():
                 name=tool_name,
                 schema=_convert_to_openai_schema(tool_def),
                 function=tool_functions[tool_name],
-                visualization=tool_visualizations.get(tool_name)
+                visualization=tool_visualizations.get(tool_name),
+                **tool_scheduling(tool_name)
             )
 
     print(f"[Cost Skill] 已注册 {len(tool_functions)} 个工具")
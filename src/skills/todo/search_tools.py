@@ -6,7 +6,7 @@
 from typing import Dict, Any, List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.services.search_service import SearchService
+from src.services.search_service import SearchService, SEARCH_MODES, MODE_AUTO
 
 
 # Visualization templates
@@ -22,13 +22,14 @@ SEARCH_SCHEMA = {
     "type": "function",
     "function": {
         "name": "search",
-        "description": """语义搜索工具。使用向量相似度搜索任务或对话历史。
+        "description": """搜索工具。结合关键词匹配和向量相似度搜索任务或对话历史。
 
 使用场景：
 - 搜索任务："帮我找关于学习的任务"
 - 搜索想法："搜索 brainstorm 状态的任务"
 - 搜索对话："我之前说过什么关于健身的？"
 - 清理重复："找出重复的任务"
+- 精确查找：用引号包裹任务标题，如 “周报”，只做关键词匹配（更快）
 
 注意：未来会升级为 Sub-Agent，支持更智能的检索策略。""",
         "parameters": {
@@ -44,6 +45,12 @@ SEARCH_SCHEMA = {
                     "description": "搜索类型",
                     "default": "tasks"
                 },
+                "search_mode": {
+                    "type": "string",
+                    "enum": list(SEARCH_MODES),
+                    "description": "检索方式：auto（引号短语或任务 ID 走关键词，其他走混合）、hybrid、semantic、keyword",
+                    "default": MODE_AUTO
+                },
                 "limit": {
                     "type": "integer",
                     "description": "返回结果数量",
@@ -72,7 +79,8 @@ async def search_tool(
     search_type: str = "tasks",
     limit: int = 10,
     status_filter: Optional[List[str]] = None,
-    priority_filter: Optional[List[str]] = None
+    priority_filter: Optional[List[str]] = None,
+    search_mode: str = MODE_AUTO
 ) -> Dict[str, Any]:
     """
     执行语义搜索
@@ -84,6 +92,7 @@ async def search_tool(
         limit: 结果数量
         status_filter: 状态过滤
         priority_filter: 优先级过滤
+        search_mode: 检索方式（auto / hybrid / semantic / keyword）
 
     Returns:
         搜索结果
@@ -94,11 +103,12 @@ async def search_tool(
         results = {}
 
         if search_type in ["tasks", "both"]:
-            tasks = await search_service.search_tasks_semantic(
+            tasks, search_mode = await search_service.search_tasks(
                 query=query,
                 limit=limit,
                 status_filter=status_filter,
-                priority_filter=priority_filter
+                priority_filter=priority_filter,
+                mode=search_mode
             )
 
             results["tasks"] = [
@@ -120,6 +130,7 @@ async def search_tool(
         return {
             "query": query,
             "search_type": search_type,
+            "search_mode": search_mode,
             "results": results,
             "count": len(results.get("tasks", [])) + len(results.get("conversations", []))
         }
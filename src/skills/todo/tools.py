@@ -3,16 +3,13 @@
 
 从 tools_simplified.py 提取
 """
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.repositories.task_repository import TaskRepository
 from src.repositories.tag_repository import TagRepository
-from src.core.memory.embedding_service import EmbeddingService
-
-def get_embedding_service():
-    return EmbeddingService()
+from src.core.memory.embedding_service import get_embedding_service
 
 
 # Visualization templates
@@ -27,6 +24,16 @@ DATABASE_OPERATION_VISUALIZATION = {
         "success": "【✓ 已更新：\"{title}\"】",
         "error": "【✗ 更新失败：{error}】"
     },
+    "create_tasks": {
+        "calling": "【批量创建任务】",
+        "success": "【✓ 任务已批量创建】",
+        "error": "【✗ 批量创建失败：{error}】"
+    },
+    "update_tasks": {
+        "calling": "【批量更新任务】",
+        "success": "【✓ 任务已批量更新】",
+        "error": "【✗ 批量更新失败：{error}】"
+    },
     "delete_task": {
         "calling": "【删除任务】",
         "success": "【✓ 已删除：\"{title}\"】",
@@ -35,6 +42,38 @@ DATABASE_OPERATION_VISUALIZATION = {
 }
 
 
+# 任务字段（task_data 和批量操作的 tasks 元素共用）
+TASK_PROPERTIES = {
+    "task_id": {"type": "string", "description": "任务 ID（更新时必需）"},
+    "title": {"type": "string", "description": "任务标题"},
+    "description": {"type": "string", "description": "任务描述"},
+    "status": {
+        "type": "string",
+        "enum": ["brainstorm", "inbox", "active", "waiting", "someday", "completed", "archived"],
+        "description": "任务状态"
+    },
+    "priority": {
+        "type": "string",
+        "enum": ["urgent", "high", "medium", "low", "none"],
+        "description": "优先级"
+    },
+    "tags": {
+        "type": "array",
+        "items": {"type": "string"},
+        "description": "标签列表"
+    },
+    "energy_level": {
+        "type": "string",
+        "enum": ["high", "medium", "low"],
+        "description": "所需精力"
+    },
+    "estimated_duration": {
+        "type": "integer",
+        "description": "预计耗时（分钟）"
+    }
+}
+
+
 # Tool Schema
 DATABASE_OPERATION_SCHEMA = {
     "type": "function",
@@ -47,46 +86,28 @@ DATABASE_OPERATION_SCHEMA = {
 - 创建任务：创建 status=inbox 的任务
 - 更新任务：修改任务状态、优先级、标签等
 - 删除任务：软删除任务
-- 管理标签：创建或获取标签""",
+- 管理标签：创建或获取标签
+- 批量操作：拆分子任务等一次创建/更新多个任务时，用 create_tasks / update_tasks
+  并在 tasks 中传入全部任务，不要逐个调用""",
         "parameters": {
             "type": "object",
             "properties": {
                 "operation": {
                     "type": "string",
-                    "enum": ["create_task", "update_task", "delete_task"],
+                    "enum": ["create_task", "update_task", "delete_task", "create_tasks", "update_tasks"],
                     "description": "操作类型"
                 },
                 "task_data": {
                     "type": "object",
                     "description": "任务数据（用于 create_task 和 update_task）",
-                    "properties": {
-                        "task_id": {"type": "string", "description": "任务 ID（更新时必需）"},
-                        "title": {"type": "string", "description": "任务标题"},
-                        "description": {"type": "string", "description": "任务描述"},
-                        "status": {
-                            "type": "string",
-                            "enum": ["brainstorm", "inbox", "active", "waiting", "someday", "completed", "archived"],
-                            "description": "任务状态"
-                        },
-                        "priority": {
-                            "type": "string",
-                            "enum": ["urgent", "high", "medium", "low", "none"],
-                            "description": "优先级"
-                        },
-                        "tags": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "标签列表"
-                        },
-                        "energy_level": {
-                            "type": "string",
-                            "enum": ["high", "medium", "low"],
-                            "description": "所需精力"
-                        },
-                        "estimated_duration": {
-                            "type": "integer",
-                            "description": "预计耗时（分钟）"
-                        }
+                    "properties": TASK_PROPERTIES
+                },
+                "tasks": {
+                    "type": "array",
+                    "description": "任务数据列表（用于 create_tasks 和 update_tasks）",
+                    "items": {
+                        "type": "object",
+                        "properties": TASK_PROPERTIES
                     }
                 }
             },
@@ -96,10 +117,140 @@ DATABASE_OPERATION_SCHEMA = {
 }
 
 
+# 可直接更新的任务字段
+TASK_FIELDS = ["title", "description", "status", "priority", "energy_level", "estimated_duration"]
+
+
+def _embedding_content(title: str, description: Optional[str]) -> str:
+    """用于生成任务 embedding 的文本"""
+    return f"{title}\n{description or ''}"
+
+
+async def _create_tasks(
+    task_repo: TaskRepository,
+    tag_repo: TagRepository,
+    embedding_service,
+    tasks: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """
+    批量创建任务
+
+    所有任务的 embedding 一次批量生成，任务用一条多行 INSERT 写入，
+    标签用 INSERT ... ON CONFLICT 批量创建，再用一条 INSERT 关联到任务。
+    """
+    missing = [i for i, item in enumerate(tasks) if not item.get("title")]
+    if missing:
+        return {"error": f"title is required for create_tasks (missing at index {missing})"}
+
+    embeddings = await embedding_service.generate_batch(
+        [_embedding_content(item["title"], item.get("description")) for item in tasks]
+    )
+
+    created = await task_repo.create_many([
+        {
+            "title": item["title"],
+            "description": item.get("description"),
+            "status": item.get("status", "brainstorm"),
+            "priority": item.get("priority"),
+            "energy_level": item.get("energy_level"),
+            "estimated_duration": item.get("estimated_duration"),
+            "embedding": embedding
+        }
+        for item, embedding in zip(tasks, embeddings)
+    ])
+
+    tags = await tag_repo.get_or_create_many([name for item in tasks for name in item.get("tags") or []])
+    await task_repo.add_tags_bulk(
+        (task.id, tags[name.strip()].id)
+        for task, item in zip(created, tasks)
+        for name in item.get("tags") or []
+        if name and name.strip() in tags
+    )
+
+    return {
+        "tasks": [
+            {
+                "task_id": str(task.id),
+                "title": task.title,
+                "status": task.status,
+                "created_at": task.created_at.isoformat()
+            }
+            for task in created
+        ],
+        "count": len(created)
+    }
+
+
+async def _update_tasks(
+    task_repo: TaskRepository,
+    tag_repo: TagRepository,
+    embedding_service,
+    tasks: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """
+    批量更新任务
+
+    一次查询读取所有任务，标题或描述变化的任务一次批量生成 embedding，
+    字段按主键批量 UPDATE；传入 tags 的任务用一条语句替换标签集合（只增删差异部分）。
+    """
+    missing = [i for i, item in enumerate(tasks) if not item.get("task_id")]
+    if missing:
+        return {"error": f"task_id is required for update_tasks (missing at index {missing})"}
+
+    task_ids = [UUID(item["task_id"]) for item in tasks]
+    existing = await task_repo.get_many(task_ids)
+    not_found = [str(task_id) for task_id in task_ids if task_id not in existing]
+    if not_found:
+        return {"error": f"Tasks not found: {', '.join(not_found)}"}
+
+    updates = []
+    reembed = []
+    for task_id, item in zip(task_ids, tasks):
+        values = {field: item[field] for field in TASK_FIELDS if field in item}
+        if "title" in values or "description" in values:
+            task = existing[task_id]
+            reembed.append((len(updates), _embedding_content(
+                values.get("title", task.title),
+                values.get("description", task.description)
+            )))
+        updates.append({"id": task_id, **values})
+
+    if reembed:
+        embeddings = await embedding_service.generate_batch([content for _, content in reembed])
+        for (index, _), embedding in zip(reembed, embeddings):
+            updates[index]["embedding"] = embedding
+
+    await task_repo.update_many([values for values in updates if len(values) > 1])
+
+    # 更新标签（只处理传入了 tags 的任务）
+    retagged = [(task_id, item["tags"] or []) for task_id, item in zip(task_ids, tasks) if "tags" in item]
+    if retagged:
+        tags = await tag_repo.get_or_create_many([name for _, names in retagged for name in names])
+        await task_repo.replace_tags_bulk({
+            task_id: [tags[name.strip()].id for name in names if name and name.strip() in tags]
+            for task_id, names in retagged
+        })
+
+    updated = await task_repo.get_many(task_ids, refresh=True)
+    return {
+        "tasks": [
+            {
+                "task_id": str(task_id),
+                "title": updated[task_id].title,
+                "status": updated[task_id].status,
+                "updated_at": updated[task_id].updated_at.isoformat()
+            }
+            for task_id in dict.fromkeys(task_ids)
+        ],
+        "count": len(updated)
+    }
+
+
 async def database_operation_tool(
     db: AsyncSession,
     operation: str,
-    task_data: Optional[Dict[str, Any]] = None
+    task_data: Optional[Dict[str, Any]] = None,
+    tasks: Optional[List[Dict[str, Any]]] = None
 ) -> Dict[str, Any]:
     """
     执行数据库操作
@@ -108,6 +259,7 @@ async def database_operation_tool(
         db: 数据库会话
         operation: 操作类型
         task_data: 任务数据
+        tasks: 任务数据列表（批量操作）
 
     Returns:
         操作结果
@@ -136,11 +288,10 @@ async def database_operation_tool(
                 embedding=embedding
             )
 
-            # 添加标签
+            # 添加标签（批量创建标签 + 一次关联）
             if task_data.get("tags"):
-                for tag_name in task_data["tags"]:
-                    tag = await tag_repo.get_or_create(tag_name)
-                    await task_repo.add_tag(task.id, tag.id)
+                tags = await tag_repo.get_or_create_many(task_data["tags"])
+                await task_repo.add_tags_bulk((task.id, tag.id) for tag in tags.values())
 
             return {
                 "task_id": str(task.id),
@@ -161,7 +312,7 @@ async def database_operation_tool(
 
             # 更新字段
             update_data = {}
-            for field in ["title", "description", "status", "priority", "energy_level", "estimated_duration"]:
+            for field in TASK_FIELDS:
                 if field in task_data:
                     update_data[field] = task_data[field]
 
@@ -174,10 +325,8 @@ async def database_operation_tool(
 
             # 更新标签
             if "tags" in task_data:
-                await task_repo.remove_all_tags(task_id)
-                for tag_name in task_data["tags"]:
-                    tag = await tag_repo.get_or_create(tag_name)
-                    await task_repo.add_tag(task_id, tag.id)
+                tags = await tag_repo.get_or_create_many(task_data["tags"] or [])
+                await task_repo.replace_tags(task_id, [tag.id for tag in tags.values()])
 
             return {
                 "task_id": str(updated_task.id),
@@ -186,6 +335,14 @@ async def database_operation_tool(
                 "updated_at": updated_task.updated_at.isoformat()
             }
 
+        elif operation in ("create_tasks", "update_tasks"):
+            if not tasks:
+                return {"error": f"tasks is required for {operation}"}
+
+            if operation == "create_tasks":
+                return await _create_tasks(task_repo, tag_repo, embedding_service, tasks)
+            return await _update_tasks(task_repo, tag_repo, embedding_service, tasks)
+
         elif operation == "delete_task":
             if not task_data or "task_id" not in task_data:
                 return {"error": "task_id is required for delete_task"}